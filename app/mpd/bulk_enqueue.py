@@ -0,0 +1,78 @@
+# app/mpd/bulk_enqueue.py
+import threading
+
+from PySide6.QtCore import QObject, Signal
+
+
+class BulkEnqueueJob(QObject):
+    """
+    Ajoute de nombreux éléments à la playlist active en quelques allers-retours :
+    les dossiers sont envoyés tels quels (`add <dossier>`, récursion côté serveur),
+    les fichiers sont regroupés par blocs `command_list_ok_begin` de `addid`.
+    Chaque bloc est une commande distincte du worker MPD : la progression est publiée
+    entre deux blocs et l'annulation y est prise en compte.
+    """
+    progress = Signal(int, int)  # éléments envoyés, total
+    finished = Signal(int)  # nombre d'éléments envoyés
+    cancelled = Signal(int)  # nombre d'éléments envoyés avant l'annulation
+    failed = Signal(str)
+
+    def __init__(self, mpd_client, entries, batch_size=500, parent=None):
+        """
+        :param mpd_client: Instance de MPDClientWrapper.
+        :param entries: Liste de tuples (chemin, est_un_dossier), dans l'ordre d'ajout voulu.
+        :param batch_size: Nombre de commandes par liste de commandes.
+        """
+        super().__init__(parent)
+        self.mpd_client = mpd_client
+        self.entries = list(entries)
+        self.batch_size = batch_size
+        self.sent = 0
+        self._cancel_event = threading.Event()
+
+    def start(self):
+        """Lance l'envoi du premier bloc."""
+        if not self.entries:
+            self.finished.emit(0)
+            return
+        self._submit_next()
+
+    def cancel(self):
+        """Demande l'arrêt : aucun nouveau bloc n'est envoyé après celui en cours."""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def _submit_next(self):
+        batch = self.entries[self.sent:self.sent + self.batch_size]
+        future = self.mpd_client.executor.submit_call(send_batch, batch)
+        future.add_done_callback(lambda fut, count=len(batch): self._on_batch_done(fut, count))
+
+    def _on_batch_done(self, future, count):
+        # Exécuté dans le worker MPD : les signaux sont livrés en file d'attente au thread GUI
+        try:
+            future.result()
+        except Exception as e:
+            print(f"Erreur lors de l'ajout à la playlist active : {e}")
+            self.failed.emit(str(e))
+            return
+        self.sent += count
+        self.progress.emit(self.sent, len(self.entries))
+        if self.sent >= len(self.entries):
+            self.finished.emit(self.sent)
+        elif self.is_cancelled():
+            self.cancelled.emit(self.sent)
+        else:
+            self._submit_next()
+
+
+def send_batch(client, batch):
+    """Envoie un bloc d'ajouts dans une seule liste de commandes MPD."""
+    client.command_list_ok_begin()
+    for path, is_directory in batch:
+        if is_directory:
+            client.add(path)  # MPD ajoute tout le dossier récursivement
+        else:
+            client.addid(path)
+    return client.command_list_end()
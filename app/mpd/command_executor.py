@@ -0,0 +1,164 @@
+# app/mpd/command_executor.py
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from mpd import MPDClient, ConnectionError as MPDConnectionError
+from PySide6.QtCore import QObject, Signal, Slot
+
+# Commandes sans effet sur le serveur : les rejouer après une coupure ne change rien
+READ_ONLY_COMMANDS = frozenset({
+    "status", "stats", "currentsong", "playlistinfo", "playlistid", "playlistfind", "playlistsearch",
+    "plchanges", "plchangesposid", "lsinfo", "listall", "listallinfo", "listfiles", "listplaylists",
+    "listplaylist", "listplaylistinfo", "find", "search", "list", "count", "albumart", "readpicture",
+    "outputs", "replay_gain_status", "ping",
+})
+
+
+class _CallbackRelay(QObject):
+    """Relais créé dans le thread GUI : les résultats émis depuis le worker y sont livrés en file d'attente Qt."""
+    delivered = Signal(object, object)
+
+    def __init__(self):
+        super().__init__()
+        self.delivered.connect(self._invoke)
+
+    @Slot(object, object)
+    def _invoke(self, callback, value):
+        try:
+            callback(value)
+        except Exception as e:
+            print(f"Erreur dans le callback MPD : {e}")
+
+
+class SyncClientProxy:
+    """
+    Façade synchrone qui imite `MPDClient` : `proxy.status()` envoie la commande au worker
+    et attend le résultat. Permet aux appelants existants (`mpd_client.client.xxx()`) de continuer à fonctionner.
+    """
+
+    def __init__(self, executor):
+        self._executor = executor
+
+    def __getattr__(self, command):
+        if command.startswith("_"):
+            raise AttributeError(command)
+        return lambda *args: self._executor.call(command, *args)
+
+
+class MPDCommandExecutor:
+    """
+    Possède la connexion de commande MPD sur un thread dédié.
+    Toutes les commandes y sont sérialisées ; les appelants reçoivent un `Future`
+    ou un callback exécuté dans le thread GUI.
+    """
+
+    def __init__(self, host="localhost", port=6600):
+        self.host = host
+        self.port = port
+        self._client = MPDClient()
+        self._connected = False
+        self._worker_thread = None
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mpd-command",
+                                        initializer=self._register_worker)
+        self._relay = _CallbackRelay()
+        self.client = SyncClientProxy(self)
+
+    def _register_worker(self):
+        self._worker_thread = threading.current_thread()
+
+    def in_worker(self):
+        """Indique si l'appel courant s'exécute déjà dans le thread de la connexion."""
+        return threading.current_thread() is self._worker_thread
+
+    # Exécution dans le worker
+    def _ensure_connected(self):
+        if not self._connected:
+            self._client.connect(self.host, self.port)
+            self._connected = True
+
+    def _drop_connection(self):
+        self._connected = False
+        try:
+            self._client.disconnect()
+        except Exception:
+            pass
+
+    def _run(self, func, retry=False):
+        """
+        Exécute `func(client)`. Si la connexion tombe pendant l'appel, elle est abandonnée ;
+        l'appel n'est rejoué sur une nouvelle connexion que si `retry` est vrai (lecture seule) :
+        une commande comme `next` ou `add` a pu être prise en compte avant la coupure.
+        """
+        self._ensure_connected()
+        try:
+            return func(self._client)
+        except (MPDConnectionError, OSError):
+            self._drop_connection()
+            if not retry:
+                raise
+        self._ensure_connected()
+        return func(self._client)
+
+    # API publique
+    def is_connected(self):
+        """Indique si la connexion de commande est actuellement ouverte."""
+        return self._connected
+
+    def connect(self):
+        """Ouvre la connexion dans le worker, sans bloquer l'appelant."""
+        return self._pool.submit(self._ensure_connected)
+
+    def submit_call(self, func, *args, retry=False):
+        """
+        Planifie `func(client, *args)` dans le worker et retourne un `Future`.
+        `retry=True` n'est à passer que pour une fonction en lecture seule (rejouée après une coupure).
+        """
+        if self.in_worker():
+            future = Future()
+            try:
+                future.set_result(self._run(lambda client: func(client, *args), retry))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self._pool.submit(self._run, lambda client: func(client, *args), retry)
+
+    def submit(self, command, *args):
+        """Planifie une commande MPD (par son nom python-mpd2) et retourne un `Future`."""
+        return self.submit_call(lambda client, *a: getattr(client, command)(*a), *args,
+                                retry=command in READ_ONLY_COMMANDS)
+
+    def call(self, command, *args, timeout=None):
+        """Façade synchrone : exécute la commande dans le worker et attend son résultat."""
+        return self.submit(command, *args).result(timeout)
+
+    def call_async(self, command, *args, callback=None, error_callback=None):
+        """Exécute la commande dans le worker ; `callback(résultat)` est appelé dans le thread GUI."""
+        return self.deliver(self.submit(command, *args), callback, error_callback)
+
+    def call_func_async(self, func, *args, callback=None, error_callback=None, retry=False):
+        """Comme `call_async` pour une fonction `func(client, *args)` (listes de commandes, enchaînements)."""
+        return self.deliver(self.submit_call(func, *args, retry=retry), callback, error_callback)
+
+    def deliver(self, future, callback=None, error_callback=None):
+        """Achemine le résultat d'un `Future` vers le thread GUI."""
+        def done(fut):
+            try:
+                result = fut.result()
+            except Exception as e:
+                if error_callback is not None:
+                    self._relay.delivered.emit(error_callback, e)
+                else:
+                    print(f"Erreur de commande MPD : {e}")
+                return
+            if callback is not None:
+                self._relay.delivered.emit(callback, result)
+        future.add_done_callback(done)
+        return future
+
+    def shutdown(self):
+        """Ferme la connexion et arrête le worker après les commandes en attente."""
+        try:
+            self._pool.submit(self._drop_connection)
+        except RuntimeError:
+            pass
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,148 @@
+# app/mpd/idle_watcher.py
+import asyncio
+
+from mpd.asyncio import MPDClient
+from PySide6.QtCore import QThread, Signal
+
+# Sous-systèmes MPD surveillés par la connexion `idle`
+IDLE_SUBSYSTEMS = ("player", "mixer", "playlist", "options", "database", "stored_playlist")
+
+
+class MPDIdleWatcher(QThread):
+    """
+    Garde une connexion MPD dédiée bloquée en `idle` et émet des signaux Qt
+    uniquement quand MPD signale un changement (aucun aller-retour quand le lecteur est inactif).
+    La connexion est pilotée par une boucle asyncio propre au thread : le client asyncio de python-mpd2 envoie
+    lui-même `noidle` avant chaque commande, et `stop()` réveille la boucle (`call_soon_threadsafe`) au lieu
+    d'écrire sur la socket depuis un autre thread.
+    """
+    subsystems_changed = Signal(list)  # Liste brute des sous-systèmes renvoyés par `idle`
+    status_changed = Signal(dict)  # Nouveau `status` après un changement player/mixer/options/playlist
+    player_changed = Signal(dict)  # Changement d'état de lecture (play/pause/stop/seek)
+    song_changed = Signal(dict)  # Nouveau morceau (réponse brute de `currentsong`), détecté par `songid`
+    mixer_changed = Signal(int)  # Nouveau volume
+    options_changed = Signal(dict)  # repeat/random/single/consume
+    playlist_changed = Signal(int)  # Nouvelle version de la playlist active
+    database_changed = Signal()
+    stored_playlist_changed = Signal()
+    connection_lost = Signal(str)
+
+    def __init__(self, host="localhost", port=6600, subsystems=IDLE_SUBSYSTEMS, parent=None):
+        super().__init__(parent)
+        self.host = host
+        self.port = port
+        self.subsystems = tuple(subsystems)
+        self.client = MPDClient()
+        self.status = {}  # Dernier status connu
+        self.current_song = {}  # Dernier morceau connu
+        self._running = False
+        self._connected = False  # Vrai entre `_connect` et `_disconnect` (pas pendant l'attente de reconnexion)
+        self._reconnect_delay = 1.0
+        self._loop = None  # Boucle asyncio du thread, tant qu'il tourne
+        self._task = None  # Tâche de surveillance, annulée par `stop()`
+
+    def start(self, *args):
+        """Démarre le thread ; `_running` est levé ici pour qu'un `stop()` appelé avant `run()` ne soit pas écrasé."""
+        self._running = True
+        super().start(*args)
+
+    def stop(self):
+        """Sort de la boucle `idle` et attend la fin du thread."""
+        self._running = False
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._cancel)
+            except RuntimeError:
+                pass  # Boucle déjà fermée
+        self.wait()
+
+    def is_connected(self):
+        """Indique si la connexion idle est actuellement ouverte."""
+        return self._connected
+
+    def _cancel(self):
+        """Exécuté dans la boucle : interrompt l'attente en cours (idle, reconnexion)."""
+        if self._task is not None:
+            self._task.cancel()
+
+    def run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._watch())
+        finally:
+            # Tâches internes du client et fermeture des transports terminées avant de fermer la boucle
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            self._loop = None
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    async def _watch(self):
+        self._task = asyncio.current_task()
+        while self._running:
+            try:
+                await self._connect()
+                await self._refresh(("player", "mixer", "options", "playlist"), initial=True)
+                async for changes in self.client.idle(self.subsystems):
+                    if changes:
+                        await self._dispatch(changes)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                if not self._running:
+                    break
+                print(f"Erreur de la connexion idle MPD : {e}")
+                self.connection_lost.emit(str(e))
+                try:
+                    await asyncio.sleep(self._reconnect_delay)
+                except asyncio.CancelledError:
+                    break
+                self._reconnect_delay = min(self._reconnect_delay * 2, 30.0)
+            finally:
+                self._disconnect()
+
+    async def _connect(self):
+        await self.client.connect(self.host, self.port)
+        self._connected = True
+        self._reconnect_delay = 1.0
+
+    def _disconnect(self):
+        self._connected = False
+        try:
+            self.client.disconnect()
+        except Exception:
+            pass
+
+    async def _dispatch(self, changes):
+        self.subsystems_changed.emit(list(changes))
+        await self._refresh(changes)
+        if "database" in changes:
+            self.database_changed.emit()
+        if "stored_playlist" in changes:
+            self.stored_playlist_changed.emit()
+
+    async def _refresh(self, changes, initial=False):
+        """Relit le status une seule fois par réveil et émet les signaux correspondants."""
+        if not {"player", "mixer", "options", "playlist"} & set(changes):
+            return
+        previous = self.status
+        self.status = await self.client.status()
+        self.status_changed.emit(self.status)
+
+        if "player" in changes:
+            if initial or self.status.get("songid") != previous.get("songid"):
+                self.current_song = await self.client.currentsong() if "songid" in self.status else {}
+                self.song_changed.emit(self.current_song)
+            self.player_changed.emit(self.status)
+        if "mixer" in changes:
+            self.mixer_changed.emit(int(self.status.get("volume", 0)))
+        if "options" in changes:
+            self.options_changed.emit(self.status)
+        if "playlist" in changes:
+            self.playlist_changed.emit(int(self.status.get("playlist", 0)))
@@ -1,98 +1,127 @@
 # app/mpd/mpd_client.py
 import os
-from mpd import MPDClient
+from .session import acquire_session, release_session, open_connection_count
 
 class MPDClientWrapper:
     def __init__(self, host="localhost", port=6600):
-        self.client = MPDClient()
         self.host = host
         self.port = port
+        self.MUSIC_DIRECTORY = "/home/bull/Musique"
+        # Tous les wrappers d'un même serveur partagent une session : une connexion de commande + une connexion idle
+        self.session = acquire_session(self.host, self.port)
+        # Toutes les commandes passent par le worker de l'exécuteur ; `client` en est la façade synchrone
+        self.executor = self.session.executor
+        self.client = self.executor.client
+        self.player_status = self.session.player_status
         self.connect()
 
     def connect(self):
-        """Connecte au serveur MPD."""
-        try:
-            self.client.connect(self.host, self.port)
-        except Exception as e:
-            print(f"Erreur de connexion à MPD : {e}")
+        """Connecte au serveur MPD (dans le worker, sans bloquer l'interface)."""
+        if self.executor.is_connected():
+            return
+        self.executor.deliver(self.executor.connect(),
+                              error_callback=lambda e: print(f"Erreur de connexion à MPD : {e}"))
 
     def disconnect(self):
-        """Déconnecte du serveur MPD."""
+        """Libère la session partagée ; les connexions sont fermées quand plus aucun wrapper ne l'utilise."""
+        if self.session is None:
+            return
         try:
-            self.client.close()
-            self.client.disconnect()
+            release_session(self.session)
         except Exception as e:
             print(f"Erreur de déconnexion de MPD : {e}")
+        self.session = None
+
+    def idle_watcher(self):
+        """Retourne la connexion `idle` de la session partagée, démarrée au premier appel."""
+        return self.session.idle_watcher()
+
+    def connection_count(self):
+        """Nombre de connexions MPD ouvertes par toute l'application."""
+        return open_connection_count()
+
+    def _send(self, error_message, command, *args):
+        """
+        Envoie une commande qui modifie l'état du lecteur sans attendre sa réponse ;
+        l'erreur éventuelle est seulement affichée.
+        """
+        future = self.executor.call_async(command, *args,
+                                          error_callback=lambda e: print(f"{error_message} : {e}"))
+        self.player_status.invalidate()
+        return future
 
     # Fonctions de lecture de base
     def play(self):
         """Démarre la lecture."""
-        try:
-            self.client.play()
-        except Exception as e:
-            print(f"Erreur en lecture : {e}")
+        self._send("Erreur en lecture", "play")
 
     def pause(self):
         """Met en pause la lecture."""
-        try:
-            self.client.pause()
-        except Exception as e:
-            print(f"Erreur en pause : {e}")
+        self._send("Erreur en pause", "pause")
 
     def stop(self):
         """Arrête la lecture."""
-        try:
-            self.client.stop()
-        except Exception as e:
-            print(f"Erreur en stop : {e}")
+        self._send("Erreur en stop", "stop")
 
     def next_track(self):
         """Passe à la piste suivante."""
-        try:
-            self.client.next()
-        except Exception as e:
-            print(f"Erreur en passant à la piste suivante : {e}")
+        self._send("Erreur en passant à la piste suivante", "next")
 
     def previous_track(self):
         """Revient à la piste précédente."""
-        try:
-            self.client.previous()
-        except Exception as e:
-            print(f"Erreur en revenant à la piste précédente : {e}")
+        self._send("Erreur en revenant à la piste précédente", "previous")
 
     def shuffle(self):
         """Passe en mode aléatoire."""
-        try:
-            self.client.shuffle()
-        except Exception as e :
-            print(f"Erreur en Shuffle : {e}")
+        self._send("Erreur en Shuffle", "shuffle")
 
     def set_volume(self, volume):
         """Définit le volume en fonction d'une valeur entre 0 et 100."""
-        try:
-            self.client.setvol(volume)
-        except Exception as e:
-            print(f"Erreur de réglage du volume : {e}")
+        self._send("Erreur de réglage du volume", "setvol", volume)
+
+    # Variantes asynchrones : le callback reçoit le résultat dans le thread GUI
+    def get_status_async(self, callback):
+        """Récupère le statut de MPD (instantané partagé) sans bloquer l'interface."""
+        return self.player_status.get_async(lambda snapshot: callback(snapshot.raw),
+                                            error_callback=lambda e: print(f"Erreur de récupération du statut : {e}"))
+
+    def get_player_status(self):
+        """Retourne l'instantané PlayerStatus partagé (un seul `status` par intervalle de cache)."""
+        return self.player_status.get()
+
+    def get_current_song_async(self, callback):
+        """Récupère le morceau en cours (format de `get_current_song`) sans bloquer l'interface."""
+        return self.executor.call_func_async(lambda client: format_song_info(client.currentsong()),
+                                             callback=callback,
+                                             error_callback=lambda e: print(f"Erreur lors de la récupération du morceau actuel : {e}"),
+                                             retry=True)
+
+    def get_current_playlist_async(self, callback):
+        """Récupère la playlist active (format de `get_current_playlist`) sans bloquer l'interface."""
+        return self.executor.call_func_async(lambda client: format_playlist(client.playlistinfo()),
+                                             callback=callback,
+                                             error_callback=lambda e: print(f"Erreur lors de la récupération de la playlist : {e}"),
+                                             retry=True)
+
+    def list_info_async(self, path, callback):
+        """Liste le contenu d'un dossier sans bloquer l'interface."""
+        return self.executor.call_async("lsinfo", path, callback=callback,
+                                        error_callback=lambda e: print(f"Erreur lors de la récupération des informations de {path}: {e}"))
 
     def get_status(self):
         """Récupère le statut actuel de MPD."""
         try:
-            return self.client.status()
+            return self.player_status.get().raw
         except Exception as e:
             print(f"Erreur de récupération du statut : {e}")
             return {}
 
     def get_elapsed(self):
-        status = self.client.status()
-        elapsed = float(status.get("elapsed", 0))
-        return elapsed
+        return self.player_status.get().elapsed
 
     def get_duration(self):
         try:
-            status = self.client.status()
-            print("status : ",status)
-            duration = int(status.get("time", "0:0").split(":")[1])  # Durée totale en secondes
-            return duration
+            return int(self.player_status.get().duration)  # Durée totale en secondes
         except Exception as e:
             print(f"Erreur lors de la récupération de la durée : {e}")
 
@@ -104,25 +133,14 @@ class MPDClientWrapper:
             float: Valeur de la progression entre 0 et 1, représentant le pourcentage de lecture du morceau.
         """
         try:
-            status = self.client.status()
-            elapsed = float(status.get("elapsed", 0))  # Temps écoulé en secondes
-            duration = float(status.get("duration", status["time"].split(":")[1]))  # Durée totale en secondes
-            # Calcul de la progression en fraction (0 à 1)
-            progress = elapsed / duration if duration > 0 else 0
-            return progress
+            return self.player_status.get().progress
         except Exception as e:
             print(f"Erreur lors de la récupération de la progression : {e}")
             return 0.0
 
     def set_progress(self, new_position):
         # Envoyer la position à MPD
-
-        print("new_position : ",new_position)
-        try:
-            self.client.seekcur(new_position)
-            print(f"Position de lecture mise à jour : {new_position}s")
-        except Exception as e:
-            print(f"Erreur lors de la mise à jour de la position de lecture : {e}")
+        self._send("Erreur lors de la mise à jour de la position de lecture", "seekcur", new_position)
 
     def get_current_song(self):
         """
@@ -130,24 +148,16 @@ class MPDClientWrapper:
         """
         try:
             song_info = self.client.currentsong()  # Utilise la commande currentsong de MPD
-            title = resolve_song_title(song_info)  # Résout le titre final
-            artist = song_info.get("artist", "Inconnu")
-            album = song_info.get("album", "Inconnu")
-            file_path = song_info.get("file", "")
-
-            return {
-                "title": title,
-                "artist": artist,
-                "album": album,
-                "file": file_path
-            }
+            return format_song_info(song_info)
         except Exception as e:
             print(f"Erreur lors de la récupération du morceau actuel : {e}")
             return {
                 "title": "Inconnu",
                 "artist": "Inconnu",
                 "album": "Inconnu",
-                "file": ""
+                "file": "",
+                "id": None,
+                "pos": None
             }
 
     def get_current_file(self):
@@ -158,7 +168,6 @@ class MPDClientWrapper:
             str: Chemin complet du fichier audio en cours de lecture, ou None si le fichier n'est pas trouvé.
         """
 
-        self.MUSIC_DIRECTORY = "/home/bull/Musique"
         try:
             # Utiliser MPD pour obtenir les informations de la chanson actuelle
             current_song = self.get_current_song()
@@ -168,7 +177,7 @@ class MPDClientWrapper:
             file_path = current_song.get("file")
             if file_path:
                 # Construire le chemin complet en combinant avec le répertoire de musique
-                full_path = os.path.join(self.MUSIC_DIRECTORY, file_path)
+                full_path = self.get_full_path(file_path)
                 print("Chemin complet du fichier audio :", full_path)
                 return full_path
             else:
@@ -178,27 +187,17 @@ class MPDClientWrapper:
             print(f"Erreur lors de la récupération du fichier audio : {e}")
             return None
 
+    def get_full_path(self, file_path):
+        """Chemin local d'un fichier de la bibliothèque MPD (chemin relatif au répertoire de musique)."""
+        return os.path.join(self.MUSIC_DIRECTORY, file_path)
+
     def get_current_playlist(self):
         """
         Récupère la playlist active actuelle depuis MPD, avec gestion des titres vides.
         """
         try:
             playlist = self.client.playlistinfo()  # Récupère la playlist active
-            print("playlist : ", playlist)
-            formatted_playlist = []
-            for song in playlist:
-                title = resolve_song_title(song)  # Résout le titre pour chaque chanson
-                formatted_playlist.append({
-                    'track': song.get('track', ''),
-                    'title': title,
-                    'artist': song.get('artist', 'Artiste inconnu'),
-                    'album': song.get('album', 'Album inconnu'),
-                    'time': song.get('time', 'Durée inconnue'),
-                    'pos': song.get('pos', 'Position inconnue'),
-                    'id': song.get('id', 'ID inconnu')
-                })
-            print("formatted_playlist : ", formatted_playlist)
-            return formatted_playlist
+            return format_playlist(playlist)
         except Exception as e:
             print(f"Erreur lors de la récupération de la playlist : {e}")
             return []
@@ -216,6 +215,7 @@ class MPDClientWrapper:
         """Ajoute un fichier ou un dossier à la playlist active."""
         try:
             self.client.add(path)
+            self.player_status.invalidate()
         except Exception as e:
             print(f"Erreur lors de l'ajout à la playlist active : {e}")
 
@@ -223,20 +223,19 @@ class MPDClientWrapper:
         """Vide la playlist active """
         try:
             self.client.clear()
+            self.player_status.invalidate()
         except Exception as e:
             print(f"Erreur lors de la suppréssion de la playlist active : {e}")
 
     def play_song_at(self, position):
         """Joue la chanson à une position donnée dans la playlist."""
-        try:
-            self.client.play(position)
-        except Exception as e:
-            print(f"Erreur lors de la lecture de la chanson à la position {position}: {e}")
+        self._send(f"Erreur lors de la lecture de la chanson à la position {position}", "play", position)
 
     def load_playlist(self, playlist_name):
         """Charge une playlist MPD."""
         try:
             self.client.load(playlist_name)
+            self.player_status.invalidate()
         except Exception as e:
             print(f"Erreur lors du chargement de la playlist {playlist_name}: {e}")
 
@@ -257,3 +256,40 @@ def resolve_song_title(song_info):
         title = os.path.splitext(title)[0]  # Retirer l'extension du fichier
 
     return title
+
+
+def format_playlist(playlist):
+    """
+    Formate la réponse de `playlistinfo` pour les vues de playlist, avec gestion des titres vides.
+    :param playlist: Liste de dictionnaires renvoyée par MPD.
+    :return: Liste de dictionnaires (track, title, artist, album, time, pos, id).
+    """
+    formatted_playlist = []
+    for song in playlist:
+        title = resolve_song_title(song)  # Résout le titre pour chaque chanson
+        formatted_playlist.append({
+            'track': song.get('track', ''),
+            'title': title,
+            'artist': song.get('artist', 'Artiste inconnu'),
+            'album': song.get('album', 'Album inconnu'),
+            'time': song.get('time', 'Durée inconnue'),
+            'pos': song.get('pos', 'Position inconnue'),
+            'id': song.get('id', 'ID inconnu')
+        })
+    return formatted_playlist
+
+
+def format_song_info(song_info):
+    """
+    Normalise la réponse brute de `currentsong` pour l'affichage.
+    :param song_info: Dictionnaire renvoyé par MPD (vide si aucun morceau).
+    :return: Dictionnaire avec titre résolu, artiste, album, fichier et identifiants MPD.
+    """
+    return {
+        "title": resolve_song_title(song_info),  # Résout le titre final
+        "artist": song_info.get("artist", "Inconnu"),
+        "album": song_info.get("album", "Inconnu"),
+        "file": song_info.get("file", ""),
+        "id": song_info.get("id"),
+        "pos": song_info.get("pos")
+    }
@@ -1,35 +1,48 @@
-from PySide6.QtCore import QObject, Signal, QTimer
+from PySide6.QtCore import QObject, Signal
+
+from .mpd_client import format_song_info
+
 
 class MusicStateManager(QObject):
     song_changed = Signal(dict)  # Signal émis quand la chanson change, transmet un dictionnaire avec les infos de la chanson
 
-    def __init__(self, mpd_client, poll_interval=1000):
+    def __init__(self, mpd_client):
         """
         Initialise le gestionnaire d'état musical.
+        Les changements arrivent de la connexion `idle` partagée du client : aucune requête n'est
+        envoyée tant que MPD ne signale rien.
         :param mpd_client: Instance de MPDClientWrapper.
-        :param poll_interval: Intervalle (en ms) pour vérifier les changements de musique.
         """
         super().__init__()
         self.mpd_client = mpd_client
         self.current_song = {}
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_song_state)
-        self.poll_interval = poll_interval
+        self.watcher = None
 
     def start_monitoring(self):
-        """Démarre le timer pour surveiller les changements de musique."""
-        self.timer.start(self.poll_interval)
+        """Abonne le gestionnaire aux événements `player` de la connexion idle."""
+        if self.watcher is None:
+            self.watcher = self.mpd_client.idle_watcher()
+            self.watcher.song_changed.connect(self.on_song_changed)
 
     def stop_monitoring(self):
-        """Arrête le timer."""
-        self.timer.stop()
+        """Se désabonne des événements de la connexion idle."""
+        if self.watcher is not None:
+            self.watcher.song_changed.disconnect(self.on_song_changed)
+            self.watcher = None
+
+    def on_song_changed(self, song_info):
+        """Reçoit le `currentsong` brut du watcher et émet le signal si l'id du morceau a changé."""
+        new_song = format_song_info(song_info)
+        if new_song.get("id") != self.current_song.get("id"):
+            self.current_song = new_song
+            self.song_changed.emit(self.current_song)  # Émet le signal avec les infos de la chanson
 
     def update_song_state(self):
-        """Vérifie si la chanson a changé et émet un signal si c'est le cas."""
+        """Vérifie à la demande si la chanson a changé (comparaison par id) et émet un signal si c'est le cas."""
         try:
             new_song = self.mpd_client.get_current_song()  # Récupère les infos de la chanson actuelle
-            if new_song.get("title") != self.current_song.get("title"):
+            if new_song.get("id") != self.current_song.get("id"):
                 self.current_song = new_song
-                self.song_changed.emit(self.current_song)  # Émet le signal avec les infos de la chanson
+                self.song_changed.emit(self.current_song)
         except Exception as e:
             print(f"Erreur lors de la mise à jour de l'état musical : {e}")
@@ -0,0 +1,133 @@
+# app/mpd/player_status.py
+import threading
+import time
+from concurrent.futures import Future
+
+
+class PlayerStatus:
+    """Instantané immuable d'une réponse `status` de MPD, horodaté avec une horloge monotone."""
+
+    def __init__(self, raw=None, timestamp=None):
+        self.raw = raw or {}
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+
+    def get(self, key, default=None):
+        return self.raw.get(key, default)
+
+    @property
+    def state(self):
+        return self.raw.get("state", "stop")
+
+    @property
+    def elapsed(self):
+        return float(self.raw.get("elapsed", 0))
+
+    @property
+    def duration(self):
+        """Durée en secondes (`duration`, sinon second champ de `time`)."""
+        if "duration" in self.raw:
+            return float(self.raw["duration"])
+        return float(self.raw.get("time", "0:0").split(":")[1])
+
+    @property
+    def progress(self):
+        duration = self.duration
+        return self.elapsed / duration if duration > 0 else 0.0
+
+    @property
+    def volume(self):
+        return int(self.raw.get("volume", 0))
+
+    @property
+    def song(self):
+        """Position du morceau courant dans la playlist, ou None."""
+        song = self.raw.get("song")
+        return int(song) if song is not None else None
+
+    @property
+    def songid(self):
+        return self.raw.get("songid")
+
+    def age(self):
+        return time.monotonic() - self.timestamp
+
+
+class PlayerStatusCache:
+    """
+    Partage un seul `status` MPD entre tous les widgets :
+    - l'instantané est réutilisé tant qu'il a moins de `ttl` secondes ;
+    - les lecteurs simultanés attendent la même requête en cours ;
+    - il est invalidé par les commandes qui changent l'état et rafraîchi gratuitement par la connexion idle.
+    """
+
+    def __init__(self, executor, ttl=0.2):
+        self.executor = executor
+        self.ttl = ttl
+        self._lock = threading.RLock()  # Réentrant : `future()` peut s'exécuter directement dans le worker
+        self._snapshot = None
+        self._last_snapshot = None  # Dernier instantané reçu, conservé même après invalidation
+        self._inflight = None  # Future de la requête `status` en cours
+        self._generation = 0  # Incrémenté à chaque invalidation pour ignorer les réponses périmées
+
+    def _fresh_snapshot(self):
+        if self._snapshot is not None and self._snapshot.age() < self.ttl:
+            return self._snapshot
+        return None
+
+    def future(self):
+        """Retourne un Future résolu par un instantané frais (requête partagée si elle est déjà en cours)."""
+        with self._lock:
+            snapshot = self._fresh_snapshot()
+            if snapshot is not None:
+                future = Future()
+                future.set_result(snapshot)
+                return future
+            if self._inflight is not None:
+                return self._inflight
+            inflight = self.executor.submit_call(self._fetch, self._generation, retry=True)
+            if not inflight.done():
+                # Appelé depuis le worker, `_fetch` s'est déjà exécuté (et a vidé `_inflight`)
+                self._inflight = inflight
+        return inflight
+
+    def _fetch(self, client, generation):
+        """Exécuté dans le worker : lit `status` et le conserve s'il n'a pas été invalidé entre-temps."""
+        try:
+            snapshot = PlayerStatus(client.status())
+        except Exception:
+            with self._lock:
+                if generation == self._generation:
+                    self._inflight = None
+            raise
+        with self._lock:
+            self._last_snapshot = snapshot
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._inflight = None
+        return snapshot
+
+    def get(self):
+        """Retourne l'instantané courant (bloquant seulement si le cache est périmé)."""
+        return self.future().result()
+
+    def get_async(self, callback, error_callback=None):
+        """Appelle `callback(PlayerStatus)` dans le thread GUI."""
+        return self.executor.deliver(self.future(), callback, error_callback)
+
+    def peek(self):
+        """Dernier instantané connu, même périmé, sans aucune requête (None si jamais lu)."""
+        return self._last_snapshot
+
+    def invalidate(self):
+        """Marque l'instantané comme périmé après une commande qui change l'état du lecteur."""
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+            self._inflight = None
+
+    def update(self, raw_status):
+        """Remplace l'instantané par un `status` reçu d'ailleurs (connexion idle)."""
+        with self._lock:
+            self._generation += 1
+            self._snapshot = self._last_snapshot = PlayerStatus(raw_status)
+            self._inflight = None
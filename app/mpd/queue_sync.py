@@ -0,0 +1,184 @@
+# app/mpd/queue_sync.py
+from PySide6.QtCore import QObject, Signal
+
+from .mpd_client import format_playlist
+
+
+class QueueSync(QObject):
+    """
+    Synchronise la playlist active par deltas.
+    La version `playlist` de `status` est mémorisée ; à chaque changement seules les positions modifiées
+    sont demandées (`plchangesposid`), puis les infos des morceaux réellement nouveaux (`playlistid`).
+    Les morceaux déjà connus (simplement déplacés) sont réutilisés sans les redemander.
+    En mode paginé (`load_paged`), seules la version et la longueur sont suivies : les positions modifiées
+    sont transmises sans les morceaux, que la vue relira par fenêtres.
+    """
+    reset = Signal(list)  # Playlist complète formatée (premier chargement ou resynchronisation)
+    length_reset = Signal(int)  # Nouvelle longueur (resynchronisation en mode paginé)
+    changes_ready = Signal(int, list)  # Nouvelle longueur, [(position, id, morceau formaté ou None, ancienne position)]
+
+    def __init__(self, mpd_client, parent=None):
+        super().__init__(parent)
+        self.mpd_client = mpd_client
+        self.version = None  # Version de la playlist correspondant aux données affichées
+        self.length = 0
+        self.ids = []  # Id MPD par position
+        self.position_by_id = {}  # Id MPD -> position
+        self._pending = False  # Une synchronisation est en cours
+        self._again = False  # Un changement est arrivé pendant la synchronisation
+        self.paged = False  # Vue lue par fenêtres : id et morceaux ne sont pas gardés
+
+    def load(self):
+        """Chargement complet synchrone ; retourne la playlist formatée."""
+        self.paged = False
+        version, playlist = self.mpd_client.executor.submit_call(fetch_snapshot, retry=True).result()
+        return self._set_snapshot(version, playlist)
+
+    def load_paged(self):
+        """Mode paginé : lit seulement la version et la longueur de la playlist ; retourne la longueur."""
+        self.paged = True
+        self.ids = []
+        self.position_by_id = {}
+        self.version, self.length = self.mpd_client.executor.submit_call(fetch_length, retry=True).result()
+        return self.length
+
+    def _set_snapshot(self, version, playlist):
+        self.version = version
+        self.length = len(playlist)
+        self.ids = [song.get("id") for song in playlist]
+        self.position_by_id = {song_id: pos for pos, song_id in enumerate(self.ids)}
+        return format_playlist(playlist)
+
+    def resync(self):
+        """Recharge toute la playlist (après une erreur de synchronisation)."""
+        if self.paged:
+            self.mpd_client.executor.call_func_async(fetch_length, callback=self._on_length,
+                                                     error_callback=self._on_error, retry=True)
+            return
+        self.mpd_client.executor.call_func_async(fetch_snapshot, callback=self._on_snapshot,
+                                                 error_callback=self._on_error, retry=True)
+
+    def _on_length(self, result):
+        self.version, self.length = result
+        self.length_reset.emit(self.length)
+        self._finish()
+
+    def _on_snapshot(self, result):
+        version, playlist = result
+        self.reset.emit(self._set_snapshot(version, playlist))
+        self._finish()
+
+    def refresh(self, *args):
+        """Demande les changements depuis la version connue (appelé sur l'événement idle `playlist`)."""
+        if self._pending:
+            self._again = True
+            return
+        self._pending = True
+        if self.version is None:
+            self.resync()
+            return
+        self.mpd_client.executor.call_func_async(fetch_position_changes, self.version,
+                                                 callback=self._on_position_changes,
+                                                 error_callback=self._on_error, retry=True)
+
+    def _on_position_changes(self, result):
+        version, length, posids = result
+        if version == self.version:
+            self._finish()
+            return
+        if self.paged:
+            self.version, self.length = version, length
+            self.changes_ready.emit(length, [(int(entry["cpos"]), entry["id"], None, None) for entry in posids])
+            self._finish()
+            return
+        missing = [entry["id"] for entry in posids if entry["id"] not in self.position_by_id]
+        if missing:
+            self.mpd_client.executor.call_func_async(
+                fetch_songs_by_id, missing,
+                callback=lambda songs: self._apply(version, length, posids, songs),
+                error_callback=self._on_error, retry=True)
+        else:
+            self._apply(version, length, posids, {})
+
+    def _apply(self, version, length, posids, songs_by_id):
+        if any(entry["id"] not in songs_by_id and entry["id"] not in self.position_by_id for entry in posids):
+            # Un morceau a disparu entre les deux requêtes : on recharge tout
+            self._pending = False
+            self.version = None
+            self.refresh()
+            return
+        changes = []
+        for entry in posids:
+            pos = int(entry["cpos"])
+            song_id = entry["id"]
+            song = songs_by_id.get(song_id)
+            formatted = format_playlist([dict(song, pos=str(pos))])[0] if song is not None else None
+            changes.append((pos, song_id, formatted, self.position_by_id.get(song_id)))
+
+        # Mise à jour de l'état local (coût proportionnel au nombre de changements)
+        for song_id in self.ids[length:]:
+            if self.position_by_id.get(song_id, -1) >= length:
+                del self.position_by_id[song_id]
+        del self.ids[length:]
+        self.ids.extend([None] * (length - len(self.ids)))
+        for pos, song_id, _, _ in changes:
+            previous_id = self.ids[pos]
+            if previous_id is not None and self.position_by_id.get(previous_id) == pos:
+                del self.position_by_id[previous_id]
+            self.ids[pos] = song_id
+        for pos, song_id, _, _ in changes:
+            self.position_by_id[song_id] = pos
+        self.version = version
+        self.length = length
+
+        self.changes_ready.emit(length, changes)
+        self._finish()
+
+    def _on_error(self, error):
+        print(f"Erreur de synchronisation de la playlist : {error}")
+        self.version = None  # La prochaine synchronisation recharge tout
+        self._finish()
+
+    def _finish(self):
+        self._pending = False
+        if self._again:
+            self._again = False
+            self.refresh()
+
+
+def fetch_snapshot(client):
+    """Lit version et playlist dans une seule liste de commandes (état cohérent)."""
+    client.command_list_ok_begin()
+    client.status()
+    client.playlistinfo()
+    status, playlist = client.command_list_end()
+    return int(status.get("playlist", 0)), playlist
+
+
+def fetch_length(client):
+    """Lit la version et la longueur de la playlist (`status`), sans aucun morceau."""
+    status = client.status()
+    return int(status.get("playlist", 0)), int(status.get("playlistlength", 0))
+
+
+def fetch_range(client, start, end):
+    """Lit et formate les morceaux des positions [start, end) (`playlistinfo start:end`)."""
+    return format_playlist(client.playlistinfo((start, end)))
+
+
+def fetch_position_changes(client, version):
+    """Lit la nouvelle version, la longueur et les couples (position, id) modifiés depuis `version`."""
+    client.command_list_ok_begin()
+    client.status()
+    client.plchangesposid(version)
+    status, posids = client.command_list_end()
+    return int(status.get("playlist", 0)), int(status.get("playlistlength", 0)), posids
+
+
+def fetch_songs_by_id(client, song_ids):
+    """Lit les informations des morceaux par leur id, en une seule liste de commandes."""
+    client.command_list_ok_begin()
+    for song_id in song_ids:
+        client.playlistid(song_id)
+    results = client.command_list_end()
+    return {song["id"]: song for result in results for song in result}
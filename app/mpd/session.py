@@ -0,0 +1,89 @@
+# app/mpd/session.py
+import threading
+
+from PySide6.QtCore import Qt
+
+from .command_executor import MPDCommandExecutor
+from .idle_watcher import MPDIdleWatcher
+from .player_status import PlayerStatusCache
+
+
+class MPDSession:
+    """
+    Session MPD logique partagée par tous les consommateurs d'un même serveur :
+    une connexion de commande (MPDCommandExecutor) et une connexion idle (MPDIdleWatcher).
+    Les deux se reconnectent d'elles-mêmes si le serveur coupe la connexion.
+    """
+
+    def __init__(self, host="localhost", port=6600):
+        self.host = host
+        self.port = port
+        self.executor = MPDCommandExecutor(host, port)
+        self.player_status = PlayerStatusCache(self.executor)  # `status` partagé par tous les widgets
+        self._idle_watcher = None  # Créée à la demande
+        self.ref_count = 0
+
+    def idle_watcher(self):
+        """Retourne la connexion idle de la session, en la démarrant au premier appel."""
+        if self._idle_watcher is None:
+            self._idle_watcher = MPDIdleWatcher(self.host, self.port)
+            # Chaque réveil idle relit déjà `status` : le cache est rafraîchi sans requête supplémentaire
+            self._idle_watcher.status_changed.connect(self.player_status.update, Qt.DirectConnection)
+            self._idle_watcher.start()
+        return self._idle_watcher
+
+    def connection_count(self):
+        """Nombre de connexions TCP ouvertes par cette session (0 à 2)."""
+        count = 1 if self.executor.is_connected() else 0
+        if self._idle_watcher is not None and self._idle_watcher.is_connected():
+            count += 1
+        return count
+
+    def close(self):
+        """Ferme la connexion idle puis la connexion de commande."""
+        if self._idle_watcher is not None:
+            self._idle_watcher.stop()
+            self._idle_watcher = None
+        self.executor.shutdown()
+
+
+_sessions = {}  # (host, port) -> MPDSession
+_sessions_lock = threading.Lock()
+
+
+def acquire_session(host="localhost", port=6600):
+    """Retourne la session partagée pour ce serveur (créée si besoin) et incrémente son compteur de références."""
+    with _sessions_lock:
+        session = _sessions.get((host, port))
+        if session is None:
+            session = MPDSession(host, port)
+            _sessions[(host, port)] = session
+        session.ref_count += 1
+        return session
+
+
+def release_session(session):
+    """Décrémente le compteur de références ; la session est fermée quand plus personne ne l'utilise."""
+    with _sessions_lock:
+        session.ref_count -= 1
+        if session.ref_count > 0:
+            return
+        if _sessions.get((session.host, session.port)) is session:
+            del _sessions[(session.host, session.port)]
+    session.close()
+
+
+def close_all_sessions():
+    """Ferme toutes les sessions, quel que soit leur compteur (fermeture de l'application)."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.ref_count = 0
+        session.close()
+
+
+def open_connection_count():
+    """Nombre total de connexions MPD ouvertes par l'application."""
+    with _sessions_lock:
+        return sum(session.connection_count() for session in _sessions.values())
@@ -9,16 +9,12 @@ class VolumeControl:
 
     def set_volume(self, volume):
         """Définit le volume en fonction d'une valeur entre 0 et 100."""
-        try:
-            self.mpd_client.client.setvol(volume)
-        except Exception as e:
-            print(f"Erreur de réglage du volume : {e}")
+        self.mpd_client.set_volume(volume)
 
     def get_volume(self):
         """Récupère le volume actuel."""
         try:
-            status = self.mpd_client.client.status()
-            return int(status.get("volume", 0))
+            return self.mpd_client.get_player_status().volume
         except Exception as e:
             print(f"Erreur en récupérant le volume : {e}")
             return 0
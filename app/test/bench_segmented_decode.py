@@ -0,0 +1,59 @@
+# app/test/bench_segmented_decode.py
+"""
+Banc d'essai du décodage segmenté parallèle (app/waveform/segmented.py).
+
+    python -m app.test.bench_segmented_decode [fichier.flac] [--segments 1 2 4 8] [--points 8192]
+
+Sans fichier, un FLAC stéréo 44,1 kHz d'une heure (sinus + bruit) est généré dans un dossier temporaire.
+Pour chaque K, affiche la durée du calcul, l'accélération par rapport à K = 1
+et vérifie que l'enveloppe est identique au bit près à celle du décodage en une passe.
+"""
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+from app.waveform.decoder import ffmpeg_executable
+from app.waveform.segmented import segmented_envelope, get_segment_pool
+
+
+def generate_flac(path, seconds=3600):
+    """FLAC de test : sinus 220 Hz à gauche, bruit rose à droite."""
+    subprocess.run([ffmpeg_executable(), "-nostdin", "-v", "error", "-y",
+                    "-f", "lavfi", "-i", f"sine=f=220:d={seconds},volume=0.5",
+                    "-f", "lavfi", "-i", f"anoisesrc=d={seconds}:c=pink:a=0.3",
+                    "-filter_complex", "[0][1]amerge=inputs=2", "-ar", "44100", path], check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesure le décodage exact segmenté d'un long morceau.")
+    parser.add_argument("audio_file", nargs="?")
+    parser.add_argument("--segments", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--points", type=int, default=8192)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        audio_file = args.audio_file
+        if audio_file is None:
+            audio_file = os.path.join(directory, "une_heure.flac")
+            print("Génération d'un FLAC d'une heure...")
+            generate_flac(audio_file)
+
+        get_segment_pool(max(args.segments))  # Pool dimensionné pour le plus grand K
+        reference = reference_time = None
+        for segments in sorted(set(args.segments) | {1}):  # K = 1 : référence en une passe
+            started = time.monotonic()
+            envelope = segmented_envelope(audio_file, args.points, segments)
+            elapsed = time.monotonic() - started
+            if reference is None:
+                reference, reference_time = envelope, elapsed
+            identical = all(np.array_equal(a, b) for a, b in zip(envelope, reference))
+            print(f"K={segments:2d} : {elapsed:6.2f} s  accélération x{reference_time / elapsed:4.2f}  "
+                  f"{'identique' if identical else 'DIFFÉRENT'} au décodage en une passe")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# app/test/fifo_wav_writer.py
+"""
+Remplace MPD pour essayer le visualiseur : écrit un fichier WAV dans le tube nommé, en temps réel.
+
+    python -m app.test.fifo_wav_writer [fichier.wav] [--fifo /tmp/mpd.fifo] [--format 44100:16:2] [--loop]
+
+Le tube est créé s'il n'existe pas. Le WAV doit avoir la fréquence et le nombre de canaux du format ;
+les échantillons sont convertis au format de bits demandé. Sans fichier, un balayage sinusoïdal
+de 20 Hz à 20 kHz (10 s) est généré. Les trames sont écrites par blocs de 1024 au rythme de la lecture.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from app.utils.config_loader import config_instance
+from app.waveform.live import parse_format
+from app.waveform.pcm_file import open_pcm_file
+
+BLOCK_FRAMES = 1024
+
+
+def sweep(sample_rate, channels, seconds=10.0):
+    """Balayage logarithmique 20 Hz - 20 kHz à -6 dBFS, identique sur tous les canaux."""
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    rate = np.log(1000.0) / seconds
+    signal = 0.5 * np.sin(2 * np.pi * 20.0 * (np.exp(rate * t) - 1.0) / rate)
+    return np.repeat(signal[:, None], channels, axis=1).astype(np.float32)
+
+
+def encode(frames, dtype, full_scale):
+    if dtype == "<f4":
+        return frames.astype("<f4").tobytes()
+    values = np.round(frames.astype(np.float64) * full_scale)
+    return np.clip(values, -full_scale, full_scale - 1).astype(dtype).tobytes()
+
+
+def main():
+    settings = config_instance.data.get("visualizer") or {}
+    parser = argparse.ArgumentParser(description="Écrit un WAV dans un tube nommé comme la sortie fifo de MPD.")
+    parser.add_argument("wav_file", nargs="?")
+    parser.add_argument("--fifo", default=settings.get("fifo", "/tmp/mpd.fifo"))
+    parser.add_argument("--format", default=settings.get("format", "44100:16:2"))
+    parser.add_argument("--loop", action="store_true")
+    args = parser.parse_args()
+
+    sample_rate, dtype, full_scale, channels = parse_format(args.format)
+    if args.wav_file is None:
+        frames = sweep(sample_rate, channels)
+    else:
+        pcm = open_pcm_file(args.wav_file)
+        if pcm is None or pcm.sample_rate != sample_rate or pcm.channels != channels:
+            print(f"Le fichier doit être un WAV {sample_rate} Hz, {channels} canaux.")
+            return
+        frames = pcm.samples(0, pcm.frames)
+
+    path = os.path.expanduser(args.fifo)
+    if not os.path.exists(path):
+        os.mkfifo(path)
+    print(f"En attente d'un lecteur sur {path}...")
+    with open(path, "wb", buffering=0) as fifo:  # Bloque jusqu'à l'ouverture du tube par le visualiseur
+        print("Lecture...")
+        while True:
+            started = time.monotonic()
+            for index, start in enumerate(range(0, len(frames), BLOCK_FRAMES)):
+                fifo.write(encode(frames[start:start + BLOCK_FRAMES], dtype, full_scale))
+                delay = started + (index + 1) * BLOCK_FRAMES / sample_rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            if not args.loop:
+                break
+
+
+if __name__ == "__main__":
+    main()
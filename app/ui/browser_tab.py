@@ -1,8 +1,9 @@
 # app/ui/browser_tab.py
-from PySide6.QtWidgets import QTreeView, QVBoxLayout, QWidget, QMenu
+from PySide6.QtWidgets import QTreeView, QVBoxLayout, QWidget, QMenu, QProgressDialog
 from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt
 from PySide6.QtGui import QKeySequence, QShortcut
 from app.mpd.mpd_client import MPDClientWrapper
+from app.mpd.bulk_enqueue import BulkEnqueueJob
 
 
 class FileNode:
@@ -15,6 +16,7 @@ class FileNode:
         self.parent = parent  # Parent du nœud
         self.children = []  # Liste des enfants
         self.loaded = False  # Indique si les enfants ont été chargés
+        self.loading = False  # Indique qu'une requête lsinfo asynchrone est en cours
 
     def add_child(self, child):
         self.children.append(child)
@@ -39,8 +41,8 @@ class FileSystemModel(QAbstractItemModel):
         self.mpd_client = mpd_client
         self.root_node = FileNode("Bibliothèque musicale", root_path, True)  # Racine de l'arbre
 
-        # Charger les éléments racine
-        self.load_children(self.root_node)
+        # Charger les éléments racine (de façon asynchrone)
+        self.fetchMore(QModelIndex())
 
     def rowCount(self, parent):
         node = parent.internalPointer() if parent.isValid() else self.root_node
@@ -77,46 +79,68 @@ class FileSystemModel(QAbstractItemModel):
         node = parent.internalPointer() if parent.isValid() else self.root_node
         return node.is_directory
 
+    def build_children(self, parent_node, items):
+        """Construit les nœuds enfants à partir d'une réponse lsinfo."""
+        children = []
+        for item in items:
+            if 'directory' in item:
+                children.append(FileNode(
+                    name=item['directory'].split("/")[-1],
+                    path=item['directory'],  # Chemin relatif
+                    is_directory=True,
+                    parent=parent_node
+                ))
+            elif 'file' in item and self.is_audio_file(item['file']):
+                children.append(FileNode(
+                    name=item['file'].split("/")[-1],
+                    path=item['file'],  # Chemin relatif
+                    is_directory=False,
+                    parent=parent_node
+                ))
+        return children
+
     def load_children(self, parent_node):
-        """Charge les enfants d'un nœud."""
+        """Charge les enfants d'un nœud (appel synchrone)."""
         if not parent_node.is_directory or parent_node.loaded:
             return
         try:
             # Utiliser uniquement le chemin relatif pour MPD
             items = self.mpd_client.client.lsinfo(parent_node.path)
-            for item in items:
-                if 'directory' in item:
-                    child_node = FileNode(
-                        name=item['directory'].split("/")[-1],
-                        path=item['directory'],  # Chemin relatif
-                        is_directory=True,
-                        parent=parent_node
-                    )
-                    parent_node.add_child(child_node)
-                elif 'file' in item and self.is_audio_file(item['file']):
-                    child_node = FileNode(
-                        name=item['file'].split("/")[-1],
-                        path=item['file'],  # Chemin relatif
-                        is_directory=False,
-                        parent=parent_node
-                    )
-                    parent_node.add_child(child_node)
+            for child_node in self.build_children(parent_node, items):
+                parent_node.add_child(child_node)
             parent_node.loaded = True
         except Exception as e:
             print(f"Erreur lors du chargement des enfants : {e}")
 
+    def node_index(self, node):
+        """Retourne l'index Qt d'un nœud (index invalide pour la racine)."""
+        if node is self.root_node or node is None:
+            return QModelIndex()
+        return self.createIndex(node.row(), 0, node)
+
     def canFetchMore(self, parent):
         """Indique si le nœud peut charger plus de données."""
         node = parent.internalPointer() if parent.isValid() else self.root_node
-        return node.is_directory and not node.loaded
+        return node.is_directory and not node.loaded and not node.loading
 
     def fetchMore(self, parent):
-        """Charge plus de données pour un nœud."""
+        """Demande les enfants d'un nœud à MPD sans bloquer l'interface ; ils sont insérés à la réception."""
         node = parent.internalPointer() if parent.isValid() else self.root_node
-        if node.is_directory and not node.loaded:
-            self.beginInsertRows(parent, 0, len(node.children) - 1)
-            self.load_children(node)
+        if node.is_directory and not node.loaded and not node.loading:
+            node.loading = True
+            self.mpd_client.list_info_async(node.path, lambda items, node=node: self.insert_children(node, items))
+
+    def insert_children(self, node, items):
+        """Insère dans le modèle les enfants reçus pour un nœud."""
+        node.loading = False
+        if node.loaded:  # Déjà chargé entre-temps par un appel synchrone
+            return
+        children = self.build_children(node, items)
+        if children:
+            self.beginInsertRows(self.node_index(node), 0, len(children) - 1)
+            node.children.extend(children)
             self.endInsertRows()
+        node.loaded = True
 
     def is_audio_file(self, filename):
         """Vérifie si le fichier a une extension audio valide."""
@@ -132,6 +156,7 @@ class BrowserTab(QWidget):
         self.mpd_client = mpd_client
         self.root_path = ""  # Chemin racine relatif pour MPD (vide pour la racine)
         self.playlist_ac_tab = playlist_ac_tab  # Référence à PlaylistAcTab
+        self.enqueue_job = None  # Ajout en masse en cours
         self.setup_ui()
 
     def setup_ui(self):
@@ -234,6 +259,8 @@ class BrowserTab(QWidget):
     def add_selected_to_playlist(self):
         """
         Ajoute les éléments sélectionnés (fichiers et dossiers) à la playlist.
+        Les dossiers sont ajoutés côté serveur en une commande, les fichiers par listes de commandes ;
+        l'envoi ne bloque pas l'interface, affiche sa progression et peut être annulé.
         """
         selected_indexes = self.tree_view.selectionModel().selectedIndexes()
 
@@ -241,37 +268,54 @@ class BrowserTab(QWidget):
             print("Le modèle actuel n'est pas un FileSystemModel.")
             return
 
-        def add_files_recursively(node: FileNode):
-            """Ajoute tous les fichiers audio d’un nœud (récursivement)."""
-            if not node:
-                return
-
-            if node.is_directory:
-                # Charger les enfants s’ils ne sont pas encore chargés
-                if not node.loaded:
-                    self.tree_view.model().load_children(node)
-
-                for child in node.children:
-                    add_files_recursively(child)
-            else:
-                # C’est un fichier : on l’ajoute
-                try:
-                    self.mpd_client.add_to_playlist_active(node.path)
-                    print(f"Ajouté à la playlist : {node.path}")
-                except Exception as e:
-                    print(f"Erreur lors de l'ajout à la playlist : {e}")
-
-        for index in selected_indexes:
-            node = index.internalPointer()
-            add_files_recursively(node)
-
-        self.playlist_ac_tab.update_playlist()
+        nodes = [index.internalPointer() for index in selected_indexes if index.internalPointer()]
+        selected = set(map(id, nodes))
+
+        def has_selected_ancestor(node):
+            parent = node.parent
+            while parent is not None:
+                if id(parent) in selected:
+                    return True
+                parent = parent.parent
+            return False
+
+        # Un élément déjà couvert par un dossier sélectionné n'est pas renvoyé
+        entries = []
+        for node in nodes:
+            if not has_selected_ancestor(node):
+                entries.append((node.path, node.is_directory))
+
+        self.start_bulk_enqueue(entries)
+
+    def start_bulk_enqueue(self, entries):
+        """Envoie les ajouts à MPD en tâche de fond avec une boîte de progression annulable."""
+        if self.enqueue_job is not None:
+            self.enqueue_job.cancel()
+
+        job = BulkEnqueueJob(self.mpd_client, entries, parent=self)
+        progress_dialog = QProgressDialog("Ajout à la playlist…", "Annuler", 0, len(entries), self)
+        progress_dialog.setWindowModality(Qt.WindowModal)
+        progress_dialog.setMinimumDuration(300)
+        progress_dialog.canceled.connect(job.cancel)
+        job.progress.connect(lambda done, total: progress_dialog.setValue(done))
+
+        def on_done(count):
+            progress_dialog.reset()
+            if self.enqueue_job is job:
+                self.enqueue_job = None
+            print(f"Ajouté à la playlist : {count} élément(s)")
+            self.playlist_ac_tab.update_playlist()
+
+        job.finished.connect(on_done)
+        job.cancelled.connect(on_done)
+        job.failed.connect(lambda message: on_done(job.sent))
+        self.enqueue_job = job
+        job.start()
 
     def replace_playlist_with_selected(self):
         """Remplace la playlist active avec les éléments sélectionnés."""
         print("replace playlist début")
         try:
-            print(self.mpd_client.get_current_playlist())
             self.mpd_client.clear_to_playlist_active()  # Vider la playlist active
             print("Playlist active effacée.")
             self.add_selected_to_playlist()  # Ajouter les nouveaux fichiers
@@ -15,6 +15,7 @@ from app.mpd.volume import VolumeControl
 from app.utils.config_loader import config_instance
 from app.ui.waveform_widget import WaveformProgressBar
 from app.ui.volume_widget import VolumeWidget
+from app.ui.visualizer_widget import VisualizerWidget
 from app.mpd.music_state_manager import MusicStateManager
 
 import os
@@ -66,6 +67,8 @@ class ControlBar(QWidget):
 
         # Démarrer la surveillance
         self.music_manager.start_monitoring()
+        # Icône Play/Pause synchronisée sur les événements `player` (y compris ceux venant d'autres clients)
+        self.music_manager.watcher.player_changed.connect(self.apply_play_state)
 
         # Init font image
         QFontDatabase.addApplicationFont("app/assets/images/Untitled1.ttf")
@@ -182,6 +185,14 @@ class ControlBar(QWidget):
         self.waveform_bar.setFixedHeight(50)  # Hauteur ajustable pour assurer la visibilité
         main_layout.addWidget(self.waveform_bar)
         main_layout.addSpacing(5)
+
+        # Visualiseur en direct (sortie fifo de MPD), seulement s'il est activé dans config.yaml
+        self.visualizer = None
+        if (config_instance.data.get("visualizer") or {}).get("enabled", False):
+            self.visualizer = VisualizerWidget()
+            self.visualizer.setFixedHeight(40)
+            main_layout.addWidget(self.visualizer)
+            main_layout.addSpacing(5)
         # else:
         #     print("Erreur : fichier audio introuvable ou invalide.")
 
@@ -241,12 +252,18 @@ class ControlBar(QWidget):
         popup_layout = QVBoxLayout()
         self.volume_slider = QSlider(Qt.Orientation.Vertical)
         self.volume_slider.setRange(0, 100)
-        self.volume_slider.setValue(self.volume_control.get_volume())
+        self.mpd_client.get_status_async(self.init_volume_slider)
         self.volume_slider.valueChanged.connect(self.update_volume)
 
         popup_layout.addWidget(self.volume_slider)
         self.volume_popup.setLayout(popup_layout)
 
+    def init_volume_slider(self, status):
+        """Positionne le slider sur le volume lu dans MPD sans renvoyer de `setvol`."""
+        self.volume_slider.blockSignals(True)
+        self.volume_slider.setValue(int(status.get("volume", 0)))
+        self.volume_slider.blockSignals(False)
+
     def show_volume_popup(self):
         """Affiche le popup de contrôle de volume sous le bouton de volume."""
         # Calculer la position pour afficher le popup sous le bouton
@@ -259,9 +276,12 @@ class ControlBar(QWidget):
         self.volume_control.set_volume(value)
         self.volume_button.setText(f"Volume: {value}%")
 
-    def update_song_title(self):
-        """Met à jour le titre de la chanson en lecture depuis MPD."""
-        song_info = self.mpd_client.get_current_song()
+    def update_song_title(self, song_info=None):
+        """Met à jour le titre de la chanson en lecture (transmis par MusicStateManager ou lu depuis MPD)."""
+        if song_info is None:
+            # Lecture asynchrone : la méthode est rappelée avec le résultat dans le thread GUI
+            self.mpd_client.get_current_song_async(self.update_song_title)
+            return None
         if song_info:
             title = song_info.get("title", "Titre inconnu")
             artist = song_info.get("artist", "Artiste inconnu")
@@ -277,7 +297,11 @@ class ControlBar(QWidget):
         self.switch_icon()
 
     def switch_icon(self):
-        state = self.mpd_client.get_status().get("state")
+        """Relit l'état de lecture sans bloquer l'interface puis met à jour l'icône."""
+        self.mpd_client.get_status_async(self.apply_play_state)
+
+    def apply_play_state(self, status):
+        state = status.get("state")
         if state == "play":
             glyph = "\u0041"
         else:
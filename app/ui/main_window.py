@@ -15,12 +15,14 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QTabWidget, QWidget,
 from PySide6.QtGui import QScreen, QKeySequence, QShortcut, QIcon, QFontDatabase, QFont
 from PySide6.QtCore import QSize, Qt
 from app.mpd.mpd_client import MPDClientWrapper
+from app.mpd.session import close_all_sessions
 # from app.ui.player_tab import PlayerTab
 from app.ui.playlist_tab import PlaylistTab
 from app.ui.browser_tab import BrowserTab
 from app.ui.control_bar import ControlBar
 from app.ui.playlist_ac_tab import PlaylistAcTab
 from app.utils.config_loader import config_instance
+from app.waveform.precompute import LibraryPrecomputeService
 # app/ui/main_window.py
 
 from app.ui.custom_title_bar import CustomTitleBar  # Importer la barre d'en-tête personnalisée
@@ -32,6 +34,11 @@ class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.mpd_client = MPDClientWrapper()
+        # Précalcul des formes d'onde de la bibliothèque en arrière-plan (optionnel)
+        self.precompute_service = None
+        if (config_instance.data.get("waveform", {}) or {}).get("precompute_library", False):
+            self.precompute_service = LibraryPrecomputeService(self.mpd_client, self)
+            self.precompute_service.start()
 
         QFontDatabase.addApplicationFont("app/assets/images/Untitled1.ttf")
         background_color = config_instance.data["colors"]["background"]
@@ -79,8 +86,8 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(title_bar)
 
         # Initialiser et ajouter la barre de contrôle
-        control_bar = ControlBar(self.mpd_client)
-        main_layout.addWidget(control_bar)
+        self.control_bar = ControlBar(self.mpd_client)
+        main_layout.addWidget(self.control_bar)
 
         # Bouton toggle
 
@@ -213,6 +220,16 @@ class MainWindow(QMainWindow):
         y = (screen_geometry.height() - self.height()) // 2
         self.move(screen_geometry.x() + x, screen_geometry.y() + y)
 
+    def closeEvent(self, event):
+        """Ferme proprement toutes les connexions MPD (et leurs threads) à la fermeture de la fenêtre."""
+        if self.precompute_service is not None:
+            self.precompute_service.stop()
+        if self.control_bar.visualizer is not None:
+            self.control_bar.visualizer.stop()
+        self.mpd_client.disconnect()
+        close_all_sessions()
+        super().closeEvent(event)
+
     def load_shortcuts(self):
         """Charge les raccourcis depuis un fichier YAML."""
         config_path = Path("app/assets/config/shortcuts.yaml")
@@ -5,6 +5,8 @@ from PySide6.QtCore import Qt, QTimer, Slot
 from PySide6.QtGui import QKeyEvent
 from app.mpd.mpd_client import MPDClientWrapper
 from app.mpd.music_state_manager import MusicStateManager
+from app.mpd.queue_sync import QueueSync
+from app.utils.config_loader import config_instance
 from app.utils.playlist_table_view import StyledPlaylistTableView
 import sys
 
@@ -14,12 +16,18 @@ class PlaylistAcTab(QWidget):
         super().__init__()
         self.mpd_client = mpd_client
         self.music_manager = MusicStateManager(self.mpd_client)
+        self.queue_sync = QueueSync(self.mpd_client, self)
 
         # Configuration de la mise en page
         self.layout = QVBoxLayout()
 
-        # Liste de la playlist
-        self.playlist_view = StyledPlaylistTableView(self.init_playlist())
+        # Liste de la playlist : lue par fenêtres au-delà de `queue.paged_threshold` morceaux
+        settings = config_instance.data.get("queue") or {}
+        length = int(self.mpd_client.get_status().get("playlistlength", 0))
+        if length >= int(settings.get("paged_threshold", 5000)):
+            self.playlist_view = StyledPlaylistTableView(None, paged_length=self.queue_sync.load_paged())
+        else:
+            self.playlist_view = StyledPlaylistTableView(self.init_playlist())
         self.layout.addWidget(self.playlist_view)
 
         # Connecter le signal de double-clic à la méthode de lecture
@@ -28,7 +36,12 @@ class PlaylistAcTab(QWidget):
         self.music_manager.song_changed.connect(self.update_current_song)
         # Démarrer la surveillance
         self.music_manager.start_monitoring()
-        print(self.playlist_data)
+
+        # Synchronisation incrémentale de la playlist sur les événements idle `playlist`
+        self.queue_sync.changes_ready.connect(self.playlist_view.apply_playlist_changes)
+        self.queue_sync.reset.connect(self.playlist_view.update_playlist_view)
+        self.queue_sync.length_reset.connect(self.playlist_view.reset_playlist_length)
+        self.music_manager.watcher.playlist_changed.connect(self.queue_sync.refresh)
         self.setLayout(self.layout)
 
     def init_playlist(self):
@@ -36,7 +49,7 @@ class PlaylistAcTab(QWidget):
         self.playlist_data = []
         # self.playlist_view.clear()
         try:
-            self.playlist_data = self.mpd_client.get_current_playlist()  # Méthode à définir dans MPDClient
+            self.playlist_data = self.queue_sync.load()  # Mémorise aussi la version de la playlist
 
             return self.playlist_data
             # for song in playlist:
@@ -50,10 +63,8 @@ class PlaylistAcTab(QWidget):
         self.playlist_view.update_current_song_view()
 
     def update_playlist(self):
-        # self.playlist_view.clear()
-
-        self.playlist_data = self.mpd_client.get_current_playlist()
-        self.playlist_view.update_playlist_view(self.playlist_data)
+        """Demande les changements de la playlist depuis la dernière version connue."""
+        self.queue_sync.refresh()
 
     def play_selected_song(self, index):
         """Joue la chanson sélectionnée."""
@@ -0,0 +1,89 @@
+# app/ui/visualizer_widget.py
+import time
+
+from PySide6.QtWidgets import QWidget
+from PySide6.QtGui import QPainter, QColor
+from PySide6.QtCore import Qt, QTimer, QRectF
+
+from app.utils.config_loader import config_instance
+from app.waveform.live import FifoReader, LiveSpectrum
+
+
+class VisualizerWidget(QWidget):
+    """
+    Spectre et VU-mètres en direct, lus sur la sortie fifo de MPD (section `visualizer` de config.yaml).
+    Le tube est lu dans un thread (FifoReader) ; à chaque image, seule la dernière fenêtre est analysée :
+    si l'interface prend du retard, les trames intermédiaires sont abandonnées au lieu de s'accumuler.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        settings = config_instance.data.get("visualizer") or {}
+        self.reader = FifoReader(settings.get("fifo", "/tmp/mpd.fifo"), settings.get("format", "44100:16:2"))
+        fps = max(1, min(60, int(settings.get("fps", 30))))
+        self.spectrum = LiveSpectrum(self.reader.sample_rate, self.reader.channels,
+                                     bands=int(settings.get("bands", 32)),
+                                     fft_size=int(settings.get("fft_size", 2048)))
+        self.vu_frames = max(1, self.reader.sample_rate // fps)  # Le VU couvre le signal d'une image
+        self.color_bars = QColor(config_instance.data["colors"]["progress_bar"])
+        self.color_vu = QColor(config_instance.data["colors"]["volume"])
+        self.color_vu_fond = QColor(config_instance.data["colors"]["volume_fond"])
+        self.color_background = QColor(config_instance.data["colors"]["background"])
+        # Fond peint par le widget : une image ne fait pas repeindre la barre de contrôle et la fenêtre dessous
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.last_written = 0
+        self.last_tick = time.monotonic()
+
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setInterval(1000 // fps)
+        self.frame_timer.timeout.connect(self.next_frame)
+        self.reader.start()
+
+    def stop(self):
+        """Arrête la lecture du tube (à la fermeture de la fenêtre)."""
+        self.frame_timer.stop()
+        self.reader.stop()
+
+    def showEvent(self, event):
+        self.last_tick = time.monotonic()
+        self.frame_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.frame_timer.stop()  # Le thread continue de vider le tube, mais plus aucune analyse
+        super().hideEvent(event)
+
+    def next_frame(self):
+        now = time.monotonic()
+        elapsed, self.last_tick = now - self.last_tick, now
+        written = self.reader.ring.written
+        if written != self.last_written:
+            self.last_written = written
+            self.spectrum.update(self.reader.ring.latest(self.spectrum.fft_size), self.vu_frames, elapsed)
+        elif self.spectrum.is_silent():
+            return  # Rien de neuf et barres au repos : aucune image à redessiner
+        else:
+            self.spectrum.decay(elapsed)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        width, height = self.width(), self.height()
+        painter.fillRect(self.rect(), self.color_background)
+        channels = len(self.spectrum.rms)
+        vu_width = 6 * channels + 4  # VU-mètres verticaux à droite
+        bands = self.spectrum.bands
+        step = max(1.0, (width - vu_width) / len(bands))
+        for index, level in enumerate(bands):
+            bar_height = float(level) * height
+            if bar_height >= 1.0:
+                painter.fillRect(QRectF(index * step + 1, height - bar_height, step - 2, bar_height), self.color_bars)
+
+        for channel in range(channels):
+            x = width - vu_width + 4 + channel * 6
+            painter.fillRect(QRectF(x, 0, 4, height), self.color_vu_fond)
+            rms_height = float(self.spectrum.rms[channel]) * height
+            painter.fillRect(QRectF(x, height - rms_height, 4, rms_height), self.color_vu)
+            peak_y = height - float(self.spectrum.peak[channel]) * height
+            painter.fillRect(QRectF(x, min(peak_y, height - 1), 4, 1), Qt.white)
+        painter.end()
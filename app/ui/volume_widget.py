@@ -1,8 +1,8 @@
 # app/ui/volume_widget.py
 
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
-from PySide6.QtGui import QPainter, QMouseEvent, QWheelEvent, QColor
-from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QPainter, QMouseEvent, QWheelEvent, QColor, QPixmap
+from PySide6.QtCore import Qt, QRect, QRectF
 from app.mpd.mpd_client import MPDClientWrapper
 from app.mpd.volume import VolumeControl
 from app.utils.config_loader import config_instance
@@ -13,11 +13,19 @@ class VolumeWidget(QWidget):
         super().__init__(parent)
         self.mpd_client = mpd_client  # Client MPD pour gérer le volume
         self.volume_control = VolumeControl(self.mpd_client)
-        self.volume = self.volume_control.get_volume() # Volume initial
+        self.volume = 0  # Volume initial, lu de façon asynchrone
         self.bar_count = 20  # Nombre de barres pour représenter le volume
         self.is_dragging = False  # Indique si la souris est maintenue enfoncée
         self.color_volume_fond = config_instance.data["colors"]["volume_fond"]
         self.color_volume = config_instance.data["colors"]["volume"]
+        self.bar_width = 5
+        # Barres pré-rendues en couleur active et inactive, refaites seulement si la taille change
+        self.layers = None
+        self.layers_key = None
+        if self.mpd_client:
+            self.mpd_client.get_status_async(lambda status: self.show_volume(int(status.get("volume", 0))))
+            # Suit aussi les changements de volume faits par d'autres clients MPD
+            self.mpd_client.idle_watcher().mixer_changed.connect(self.show_volume)
 
 
 
@@ -26,38 +34,65 @@ class VolumeWidget(QWidget):
 
     def set_volume(self, volume):
         """Définit le volume et met à jour l'affichage."""
-        self.volume = max(0, min(100, volume))  # Limiter entre 0 et 100
+        self.show_volume(volume)
         if self.mpd_client:
             self.volume_control.set_volume(self.volume)  # Envoyer à MPD
-        self.update()  # Redessiner le widget
-
-    def paintEvent(self, event):
-        """Dessine le widget."""
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
 
+    def show_volume(self, volume):
+        """Affiche un volume reçu de MPD sans le renvoyer au serveur."""
+        previous = self.split_x()
+        self.volume = max(0, min(100, volume))  # Limiter entre 0 et 100
+        current = self.split_x()
+        if current != previous:
+            # Seules les barres qui changent de couleur sont redessinées
+            left, right = sorted((previous, current))
+            self.update(QRect(left, 0, right - left + 1, self.height()))
+
+    def split_x(self):
+        """Abscisse de la limite entre barres actives et inactives."""
+        return int(self.volume / 100 * self.bar_count) * self.bar_width
+
+    def render_layers(self):
+        """Dessine une fois toutes les barres dans la couleur active et dans la couleur inactive."""
+        ratio = self.devicePixelRatioF()
+        key = (self.width(), self.height(), ratio)
+        if self.layers is not None and self.layers_key == key:
+            return self.layers
         # Taille et position des barres
-        bar_width = 5 # self.width() / self.bar_count
         spacing = 2
-        base_height =  1#self.height() - 20  # Réserver de la place pour le texte
-        active_bars = int(self.volume / 100 * self.bar_count)
-
-        # Dessiner chaque barre
-        for i in range(self.bar_count):
-            x = i * bar_width
-            y = 22
-            height = base_height *i
-            rect = QRectF(x + spacing, y, bar_width - spacing, -height)
-            if i < active_bars:
-                painter.setBrush(QColor(self.color_volume))  # Barres actives
-            else:
-                painter.setBrush(QColor(self.color_volume_fond))  # Barres inactives
+        base_height = 1  # self.height() - 20  # Réserver de la place pour le texte
+        layers = []
+        for color in (self.color_volume, self.color_volume_fond):
+            pixmap = QPixmap(max(1, int(self.width() * ratio)), max(1, int(self.height() * ratio)))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
             painter.setPen(Qt.NoPen)
-            painter.drawRect(rect)
-
-
-
+            painter.setBrush(QColor(color))
+            for i in range(self.bar_count):
+                x = i * self.bar_width
+                y = 22
+                height = base_height * i
+                painter.drawRect(QRectF(x + spacing, y, self.bar_width - spacing, -height))
+            painter.end()
+            layers.append(pixmap)
+        self.layers, self.layers_key = tuple(layers), key
+        return self.layers
 
+    def paintEvent(self, event):
+        """Dessine le widget : barres actives à gauche de la limite, inactives à droite."""
+        painter = QPainter(self)
+        active, inactive = self.render_layers()
+        split = self.split_x()
+        for pixmap, area in ((active, QRect(0, 0, split, self.height())),
+                             (inactive, QRect(split, 0, self.width() - split, self.height()))):
+            area = area.intersected(event.rect())
+            if not area.isEmpty():
+                ratio = pixmap.devicePixelRatio()
+                painter.drawPixmap(QRectF(area), pixmap, QRectF(area.x() * ratio, area.y() * ratio,
+                                                                area.width() * ratio, area.height() * ratio))
+        painter.end()
 
     def mousePressEvent(self, event: QMouseEvent):
         """Gère le clic de la souris pour définir le volume."""
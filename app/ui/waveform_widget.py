@@ -1,56 +1,27 @@
 import os
+import time
 import multiprocessing
-from time import sleep
 
 import numpy as np
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import QTimer, Qt, QThread, Signal, Slot
-from PySide6.QtGui import QPainter, QColor, QPen, QMouseEvent
+from PySide6.QtCore import QTimer, Qt, QThread, Signal, Slot, QPointF, QLineF, QRect, QRectF
+from PySide6.QtGui import QPainter, QColor, QPen, QMouseEvent, QWheelEvent, QPixmap, QImage
 # from networkx import config
-from pydub import AudioSegment
 from app.mpd.mpd_client import MPDClientWrapper
 from app.mpd.volume import VolumeControl
 from app.utils.config_loader import config_instance
 from app.mpd.music_state_manager import MusicStateManager
+from app.waveform.analysis import describe_analysis, spectrogram
+from app.waveform.cache import get_prewarm_cache
+from app.waveform.prewarm import TrackPrewarmer
+from app.waveform.store import local_file_key
+from app.waveform.worker import get_waveform_scheduler, PRIORITY_CURRENT
+
+BAR_PITCH = 3  # Largeur d'une barre + espace, en pixels physiques
+MIN_ZOOM_SPAN = 1 / 256  # Fraction minimale du morceau affichée en zoom
 
 timer = QTimer
 # TODO : verifié quand il n'y as pas de music, si sa mouline dans le vent.
-class WaveformWorker(QThread):
-    """Worker QThread qui calcule la forme d'onde et l'émet via un signal."""
-    waveformReady = Signal(object)  # émetera un array numpy (ou liste)
-
-    def __init__(self, audio_file: str, num_bars: int, parent=None):
-        super().__init__(parent)
-        self.audio_file = audio_file
-        self.num_bars = num_bars
-
-    def run(self):
-        try:
-            audio = AudioSegment.from_file(self.audio_file)
-            audio = audio.set_frame_rate(audio.frame_rate // 8)
-            if audio.channels > 1:
-                audio = audio.set_channels(1)
-
-            y = np.array(audio.get_array_of_samples(), dtype=np.float32)
-            hop_length = 512
-            y2 = y ** 2
-            cs = np.cumsum(y2, dtype=np.float32)
-            rms = np.sqrt((cs[hop_length:] - cs[:-hop_length]) / hop_length)
-            rms = np.nan_to_num(rms, nan=0.0, posinf=0.0, neginf=0.0)
-            if rms.max() > 0:
-                rms /= rms.max()
-
-            waveform_resized = np.interp(
-                np.linspace(0, len(rms) - 1, self.num_bars),
-                np.arange(len(rms)),
-                rms
-            )
-            self.waveformReady.emit(waveform_resized)
-        except Exception as e:
-            print(f"Erreur lors de WaveformWorker: {e}")
-            self.waveformReady.emit(np.zeros(self.num_bars, dtype=np.float32))
-
-
 class WaveformProgressBar(QWidget):
     def __init__(self, mpd_client:MPDClientWrapper, audio_file, parent=None):
         super().__init__(parent)
@@ -60,14 +31,28 @@ class WaveformProgressBar(QWidget):
         self.mpd_client = mpd_client
         self.volume = VolumeControl(self.mpd_client)
         self.audio_file = audio_file
-        self.name_play = self.mpd_client.get_current_song().get("title")
+        current_song = self.mpd_client.get_current_song()
+        self.song_id = current_song.get("id")
+        self.song_file = current_song.get("file")  # Chemin MPD du morceau (clé du cache de formes d'onde)
+        self.cache_key = None
         self.progress = 0
         self.progress_0 = 0
-        self.num_bars = 80
-        self.waveform_resized = []  # Stockage de l'onde générée
+        self.num_bars = 80  # Recalculé d'après la largeur réelle du widget
+        self.waveform_resized = []  # Hauteur des barres au-dessus de l'axe (0..1)
+        self.waveform_lower = []  # Hauteur des barres sous l'axe (0..1)
+        self.pyramid = None  # WaveformPyramid du morceau courant
+        self.preview = None  # Aperçu rapide (pyramide approximative) en attendant la pyramide exacte
+        self.view_start = 0.0  # Plage affichée (fractions du morceau), modifiée par le zoom
+        self.view_end = 1.0
         self.previous_position = 0
         self.progress_bar_fond = config_instance.data["colors"]["progress_bar_fond"]
         self.progress_bar = config_instance.data["colors"]["progress_bar"]
+        # Onde pré-rendue dans les deux couleurs (partie lue, partie à lire), refaite seulement
+        # quand les barres, la taille ou la densité de pixels changent
+        self.layers = None  # (pixmap partie lue, pixmap partie à lire)
+        self.layers_key = None  # (largeur, hauteur, devicePixelRatio) des pixmaps
+        # Affichage : barres RMS ou spectrogramme (si l'analyseur `spectrogram` l'a calculé) ; clic du milieu pour changer
+        self.view_mode = (config_instance.data.get("waveform", {}) or {}).get("view", "bars")
 
         self.music_manager = MusicStateManager(self.mpd_client)
         self.music_manager.song_changed.connect(self.check_name)
@@ -75,95 +60,354 @@ class WaveformProgressBar(QWidget):
         # Démarrer la surveillance
         self.music_manager.start_monitoring()
 
+        # Progression interpolée localement à partir d'un seul `status` :
+        # elapsed + (maintenant - horodatage de la réponse), recalé sur les événements `player`
+        self.playback = None  # Dernier PlayerStatus reçu
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setTimerType(Qt.PreciseTimer)
+        self.frame_timer.timeout.connect(self.update_progress)
+        self.drift_timer = QTimer(self)
+        self.drift_timer.timeout.connect(self.resync_progress)
+        self.drift_timer.start(5000)  # Vérification lente de la dérive
+        self.music_manager.watcher.player_changed.connect(self.on_player_changed)
+        self.resync_progress()
+
+        self.job = None  # WaveformJob du morceau courant
+        self.set_flat_waveform(0.01)
+        self.prewarmer = TrackPrewarmer(self.mpd_client, self)  # Prépare le morceau suivant
         if audio_file and os.path.exists(audio_file):
-            # Initialisation de la forme
-            self.waveform_resized = np.linspace(0.01, 0.01, self.num_bars)
-            self.worker = None
-
-            # Timer pour mettre à jour la progression de la lecture
-            self.progress_update_timer = QTimer(self)
-            self.progress_update_timer.timeout.connect(self.update_progress)
-            self.progress_update_timer.start(500)  # Mise à jour chaque seconde
-
             # Lancer le calcul de waveform dans un QThread
             self.start_waveform_generation()
-        else:
-            self.waveform_resized = np.linspace(0.01, 0.01, self.num_bars)
 
 
-    def update_progress(self):
-        """Met à jour la progression en fonction de la position actuelle du morceau."""
+    def resync_progress(self):
+        """Relit la position de lecture dans MPD (instantané partagé) sans bloquer l'interface."""
+        self.mpd_client.player_status.get_async(self.apply_playback)
 
-        progress = self.mpd_client.get_progress()  # Obtenir la progression de 0 à 1.
+    def on_player_changed(self, status):
+        """Événement `player` : la connexion idle a déjà rafraîchi l'instantané, aucune requête n'est envoyée."""
+        snapshot = self.mpd_client.player_status.peek()
+        if snapshot is not None:
+            self.apply_playback(snapshot)
+        else:
+            self.resync_progress()
+
+    def apply_playback(self, snapshot):
+        """Recale l'interpolation sur un instantané et n'anime la barre que pendant la lecture."""
+        self.playback = snapshot
+        if snapshot.state == "play":
+            if not self.frame_timer.isActive():
+                self.frame_timer.start(self.frame_interval())
+        else:
+            self.frame_timer.stop()
+        self.update_progress()
+
+    def frame_interval(self):
+        """Intervalle d'animation calé sur la fréquence de l'écran (60 Hz par défaut)."""
+        screen = self.screen()
+        refresh_rate = screen.refreshRate() if screen is not None else 60
+        return max(4, int(1000 / (refresh_rate or 60)))
+
+    def interpolated_elapsed(self):
+        """Position estimée en secondes, sans aller-retour MPD."""
+        if self.playback is None:
+            return 0.0
+        elapsed = self.playback.elapsed
+        if self.playback.state == "play":
+            elapsed += time.monotonic() - self.playback.timestamp
+        return min(elapsed, self.playback.duration)
 
+    def update_progress(self):
+        """Met à jour la progression en fonction de la position interpolée du morceau."""
+        if self.playback is None:
+            return
+        duration = self.playback.duration
+        progress = self.interpolated_elapsed() / duration if duration > 0 else 0
         self.set_progress(progress)
 
     def set_progress(self, position):
-        """Met à jour la progression en fonction de la position du morceau."""
-        # self.check_name()
-        if self.progress != position:# TODO: vérifier le fonctionnement en détail
-            print("position : ", position, "progress : ", self.progress)
-            self.progress = position
-            self.update()  # Redessiner la barre d'onde
-
-    @ Slot(object)
-    def on_waveform_ready(self, waveform):
+        """
+        Met à jour la progression ; seule la bande entre l'ancienne et la nouvelle limite lu / à lire
+        est redessinée, et rien du tout tant que cette limite ne change pas de barre.
+        """
+        if self.progress == position:
+            return
+        previous = self.split_x()
+        self.progress = position
+        current = self.split_x()
+        if current != previous:
+            left, right = sorted((previous, current))
+            self.update(QRect(int(left) - 1, 0, int(right - left) + 3, self.height()))
+
+    def split_x(self):
+        """Abscisse de la limite entre barres lues et barres à lire (bord de barre, en pixels logiques)."""
+        bar_count = len(self.waveform_resized)
+        if bar_count == 0 or self.width() <= 0:
+            return 0.0
+        span = self.view_end - self.view_start
+        # Une barre est lue quand son centre est avant la position de lecture
+        played = int(np.floor((self.progress - self.view_start) / span * bar_count + 0.5))
+        return min(max(played, 0), bar_count) * self.width() / bar_count
+
+    def bars_changed(self):
+        """Les barres ont changé : les pixmaps seront refaites au prochain affichage."""
+        self.layers = None
+        self.update()
+
+    @ Slot(str, object)
+    def on_waveform_ready(self, cache_key, pyramid):
         """Slot appelé quand WaveformWorker a fini de calculer."""
+        if pyramid is None:
+            if cache_key == (self.cache_key or ""):
+                self.set_flat_waveform(0.0)
+            return
+        if cache_key != (self.cache_key or ""):
+            return  # Résultat d'un morceau précédent : mis en cache par le planificateur, mais pas affiché
+        self.set_pyramid(pyramid)
+
+    @ Slot(str, object)
+    def on_waveform_preview(self, cache_key, preview):
+        """Aperçu rapide d'un long morceau : affiché sur toute la largeur en attendant le décodage complet."""
+        if cache_key != self.cache_key or self.pyramid is not None:
+            return
+        self.preview = preview
+        self.on_waveform_progress(cache_key, None, 0.0)
 
-        self.waveform_resized = np.array(waveform, dtype=np.float32)
-        self.update()
+    @ Slot(str, object, float)
+    def on_waveform_progress(self, cache_key, partial, fraction):
+        """Résultat partiel : la partie déjà décodée est dessinée, le reste vient de l'aperçu ou reste plat."""
+        if cache_key != self.cache_key or self.pyramid is not None:
+            return
+        self.num_bars = self.bar_count()
+        filled = min(self.num_bars, int(round(self.num_bars * fraction))) if partial is not None else 0
+        bars = np.full(self.num_bars, 0.01, dtype=np.float32)
+        peaks = [pyramid.rms_peak for pyramid in (partial, self.preview) if pyramid is not None]
+        scale = max(peaks, default=0.0) or 1.0
+        if self.preview is not None and filled < self.num_bars:
+            _, _, rms = self.preview.columns(self.num_bars - filled, filled / self.num_bars, 1.0)
+            bars[filled:] = np.clip(rms / scale, 0.0, 1.0)
+        if filled > 0:
+            _, _, rms = partial.columns(filled)
+            bars[:filled] = np.clip(rms / scale, 0.0, 1.0)
+        self.waveform_resized = self.waveform_lower = bars
+        self.bars_changed()
+
+    def set_pyramid(self, pyramid):
+        """Affiche la pyramide d'un nouveau morceau (vue complète)."""
+        self.pyramid = pyramid
+        self.preview = None
+        self.setToolTip(describe_analysis(pyramid))  # Intensité, attaques... si elles ont été analysées
+        self.view_start, self.view_end = 0.0, 1.0
+        self.refresh_bars()
+
+    def set_flat_waveform(self, level):
+        """Affiche une onde plate (calcul en cours ou impossible)."""
+        self.pyramid = None
+        self.preview = None
+        self.setToolTip("")
+        self.view_start, self.view_end = 0.0, 1.0
+        self.num_bars = self.bar_count()
+        self.waveform_resized = np.full(self.num_bars, level, dtype=np.float32)
+        self.waveform_lower = self.waveform_resized
+        self.bars_changed()
+
+    def bar_count(self):
+        """Nombre de barres pour la largeur réelle du widget (en pixels physiques)."""
+        return max(16, int(self.width() * self.devicePixelRatioF()) // BAR_PITCH)
+
+    def refresh_bars(self):
+        """
+        Recalcule les barres depuis la pyramide pour la largeur et la plage affichées (aucun décodage).
+        Vue complète : RMS symétrique ; vue zoomée : vrais minimum et maximum du signal.
+        """
+        if self.pyramid is None and self.preview is not None:
+            self.on_waveform_progress(self.cache_key, None, 0.0)  # La partie exacte revient au prochain résultat partiel
+            return
+        if self.pyramid is None:
+            self.set_flat_waveform(self.waveform_resized[0] if len(self.waveform_resized) else 0.01)
+            return
+        self.num_bars = self.bar_count()
+        minimum, maximum, rms = self.pyramid.columns(self.num_bars, self.view_start, self.view_end)
+        if self.is_zoomed():
+            scale = self.pyramid.peak or 1.0
+            self.waveform_resized = np.clip(maximum / scale, 0.0, 1.0)
+            self.waveform_lower = np.clip(-minimum / scale, 0.0, 1.0)
+        else:
+            scale = self.pyramid.rms_peak or 1.0
+            self.waveform_resized = np.clip(rms / scale, 0.0, 1.0)
+            self.waveform_lower = self.waveform_resized
+        self.bars_changed()
 
-    def start_waveform_generation(self):
-        # Si un worker tournait déjà, on l'arrête proprement
-        if hasattr(self, 'worker') and self.worker is not None:
-            if self.worker.isRunning():
-                self.worker.quit()
-                self.worker.wait()
+    def spectrogram_shown(self):
+        return self.view_mode == "spectrogram" and spectrogram(self.pyramid) is not None
 
-        # Réinitialisation visuelle
-        self.waveform_resized = np.linspace(0.01, 0.01, self.num_bars)
+    def is_zoomed(self):
+        return self.view_end - self.view_start < 1.0
 
-        # Création et lancement du QThread
-        self.worker = WaveformWorker(self.audio_file, self.num_bars)
-        self.worker.waveformReady.connect(self.on_waveform_ready)
-        self.worker.start()
+    def start_waveform_generation(self):
+        if self.cache_key is None and self.song_file:
+            self.cache_key = local_file_key(self.song_file, self.audio_file)
+        # Le calcul du morceau précédent est annulé sans attendre : il s'arrête au prochain bloc décodé
+        if self.job is not None:
+            self.job.preview.disconnect(self.on_waveform_preview)
+            self.job.progress.disconnect(self.on_waveform_progress)
+            self.job.finished.disconnect(self.on_waveform_ready)
+            if self.job.cache_key != self.cache_key:
+                get_waveform_scheduler().cancel(self.job)
+            self.job = None
+
+        # Forme d'onde déjà calculée (préchargée ou en cache disque) pour ce fichier : affichage immédiat
+        pyramid = get_prewarm_cache().pyramid(self.cache_key)
+        if pyramid is not None:
+            self.set_pyramid(pyramid)
+            return
 
-    def check_name(self):
-        """Vérifie si le morceau a changé et regénère l'onde si nécessaire."""
-        current_name = self.mpd_client.get_current_song().get("title")
-        if self.name_play != current_name:
+        # Réinitialisation visuelle
+        self.set_flat_waveform(0.01)
+        if self.cache_key is None:
+            return  # Fichier introuvable localement : pas de forme d'onde
+
+        # Calcul prioritaire (réutilise le calcul de préchargement s'il est déjà en cours)
+        self.job = get_waveform_scheduler().submit(self.cache_key, self.audio_file, PRIORITY_CURRENT,
+                                                   self.current_duration())
+        self.job.preview.connect(self.on_waveform_preview)
+        self.job.progress.connect(self.on_waveform_progress)
+        self.job.finished.connect(self.on_waveform_ready)
+        if self.job.quick_look is not None:
+            self.on_waveform_preview(self.cache_key, self.job.quick_look)  # Aperçu déjà émis (préchargement)
+
+    def current_duration(self):
+        """Durée du morceau courant d'après le dernier `status` (None si elle n'est pas encore connue)."""
+        snapshot = self.mpd_client.player_status.peek()
+        if snapshot is not None and snapshot.songid == self.song_id and snapshot.duration > 0:
+            return snapshot.duration
+        return None
+
+    def check_name(self, song_info=None):
+        """Vérifie si le morceau a changé (par son id MPD) et regénère l'onde si nécessaire."""
+        if song_info is None:
+            song_info = self.mpd_client.get_current_song()
+        current_id = song_info.get("id")
+        if self.song_id != current_id:
             print("Nouveau morceau détecté. Mise à jour de la forme d'onde.")
-            self.name_play = current_name
-            self.audio_file = self.mpd_client.get_current_file()  # Met à jour le fichier audio actuel
+            self.song_id = current_id
+            self.song_file = song_info.get("file")
+            # Chemin local et clé de cache : préparés par le préchargement, sinon déduits du chemin MPD
+            track = get_prewarm_cache().track(current_id)
+            if track is not None and track["info"].get("file") == self.song_file:
+                self.audio_file, self.cache_key = track["full_path"], track["cache_key"]
+            else:
+                self.audio_file = self.mpd_client.get_full_path(self.song_file) if self.song_file else None
+                self.cache_key = None
             self.start_waveform_generation()  # Recalcule l'onde pour le nouveau fichier
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-
+    def render_layers(self):
+        """Dessine une fois toutes les barres dans chacune des deux couleurs."""
+        ratio = self.devicePixelRatioF()
+        key = (self.width(), self.height(), ratio)
+        if self.layers is not None and self.layers_key == key:
+            return self.layers
+        if self.spectrogram_shown():
+            self.layers, self.layers_key = self.render_spectrogram(ratio), key
+            return self.layers
         width = self.width()
         height = self.height() // 2
+        bar_count = len(self.waveform_resized)
+        pitch = width / bar_count
+        lines = []
+        for i in range(bar_count):
+            x = (i + 0.5) * pitch
+            lines.append(QLineF(x, height, x, height - self.waveform_resized[i] * height))
+            lines.append(QLineF(x, height, x, height + self.waveform_lower[i] * height))
+        layers = []
+        for color in (self.progress_bar, self.progress_bar_fond):
+            pixmap = QPixmap(max(1, int(width * ratio)), max(1, int(self.height() * ratio)))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            pen = QPen(QColor(color))
+            pen.setWidthF(2 / ratio)
+            painter.setPen(pen)
+            painter.drawLines(lines)
+            painter.end()
+            layers.append(pixmap)
+        self.layers, self.layers_key = tuple(layers), key
+        return self.layers
+
+    def render_spectrogram(self, ratio):
+        """
+        Spectrogramme de la plage affichée en deux pixmaps (partie lue en couleur pleine, partie à lire atténuée) :
+        une image indexée construite directement sur le tableau uint8, étirée en une seule copie par pixmap.
+        """
+        values = spectrogram(self.pyramid)
+        columns = len(values)
+        first = min(int(self.view_start * columns), columns - 1)
+        last = max(first + 1, min(columns, int(np.ceil(self.view_end * columns))))
+        # Une ligne d'image par bande, aiguës en haut ; une colonne par trame de temps
+        data = np.ascontiguousarray(values[first:last, ::-1].T)
+        image = QImage(data.data, data.shape[1], data.shape[0], data.strides[0], QImage.Format_Indexed8)
+        layers = []
+        for color, strength in ((QColor(self.progress_bar), 1.0), (QColor(self.progress_bar_fond), 0.45)):
+            # Palette : transparent pour le silence, puis la couleur de plus en plus opaque
+            image.setColorTable([QColor(color.red(), color.green(), color.blue(), int(level * strength)).rgba()
+                                 for level in range(256)])
+            pixmap = QPixmap(max(1, int(self.width() * ratio)), max(1, int(self.height() * ratio)))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.drawImage(QRectF(0, 0, self.width(), self.height()), image)
+            painter.end()
+            layers.append(pixmap)
+        return tuple(layers)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
 
         if len(self.waveform_resized) == 0:
             painter.drawText(self.rect(), Qt.AlignCenter, "Forme d'onde non disponible")
             return
 
-        bar_width = 2
-        space_between_bars = (width - (self.num_bars * bar_width)) / (self.num_bars - 1)
-
-        for i, value in enumerate(self.waveform_resized):
-            x = int(i * (bar_width + space_between_bars))
-            bar_height = int(value * height)
-            color = QColor(self.progress_bar) if i / self.num_bars <= self.progress else QColor(self.progress_bar_fond)
-            pen = QPen(color)
-            pen.setWidth(bar_width)
-            painter.setPen(pen)
-
-            painter.drawLine(x, height, x, height - bar_height)
-            painter.drawLine(x, height, x, height + bar_height)
+        # Partie lue à gauche de la limite, partie à lire à droite, limitées à la zone à redessiner
+        played, unplayed = self.render_layers()
+        split = self.split_x()
+        dirty = QRectF(event.rect())
+        for pixmap, area in ((played, QRectF(0, 0, split, self.height())),
+                             (unplayed, QRectF(split, 0, self.width() - split, self.height()))):
+            area = area.intersected(dirty)
+            if not area.isEmpty():
+                ratio = pixmap.devicePixelRatio()
+                painter.drawPixmap(area, pixmap, QRectF(area.x() * ratio, area.y() * ratio,
+                                                        area.width() * ratio, area.height() * ratio))
 
         painter.end()
 
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.refresh_bars()
+
+    def wheelEvent(self, event: QWheelEvent):
+        """Molette : zoom autour du curseur ; Maj + molette : déplacement dans le morceau."""
+        if self.pyramid is None or self.width() <= 0:
+            return
+        steps = event.angleDelta().y() / 120
+        span = self.view_end - self.view_start
+        if event.modifiers() & Qt.ShiftModifier:
+            start = self.view_start - steps * span * 0.1
+        else:
+            anchor = self.view_start + event.position().x() / self.width() * span
+            new_span = min(1.0, max(MIN_ZOOM_SPAN, span * 0.8 ** steps))
+            start = anchor - (anchor - self.view_start) * new_span / span
+            span = new_span
+        self.view_start = min(max(0.0, start), 1.0 - span)
+        self.view_end = self.view_start + span
+        self.refresh_bars()
+        event.accept()
+
+    def reset_zoom(self):
+        self.view_start, self.view_end = 0.0, 1.0
+        self.refresh_bars()
 
     # def mousePressEvent(self, event: QMouseEvent):
     #     """Gère le clic de la souris pour définir la position de lecture."""
@@ -176,17 +420,29 @@ class WaveformProgressBar(QWidget):
     #     if self.is_dragging:  # Si on est en train de cliquer
     #         self.update_position_from_mouse(event.x())
 
+    def toggle_view_mode(self):
+        """Bascule entre les barres et le spectrogramme."""
+        self.view_mode = "bars" if self.view_mode == "spectrogram" else "spectrogram"
+        self.bars_changed()
+
     def mouseReleaseEvent(self, event: QMouseEvent):
-        """Arrête le suivi lorsque le clic est relâché."""
-        if event.button() == Qt.LeftButton:
+        """
+        Arrête le suivi lorsque le clic est relâché ; clic droit : retour à la vue complète ;
+        clic du milieu : barres / spectrogramme.
+        """
+        if event.button() == Qt.RightButton:
+            self.reset_zoom()
+        elif event.button() == Qt.MiddleButton:
+            self.toggle_view_mode()
+        elif event.button() == Qt.LeftButton:
             self.update_position_from_mouse(event.x())
             self.is_dragging = False  # Désactiver le suivi du clic
 
     def update_position_from_mouse(self, x):
         """Met à jour la position de lecture en fonction de la position de la souris."""
         # Calculer la progression en fonction de la position de la souris
-        duration = self.mpd_client.get_duration()
-        relative_position = x / self.width()
+        duration = self.playback.duration if self.playback is not None else self.mpd_client.get_duration()
+        relative_position = self.view_start + x / self.width() * (self.view_end - self.view_start)
         print("relative_position : ",relative_position)
         relative_position = max(0, min(1, relative_position))  # Limiter entre 0 et 1.
         print("relative_position111 : ", relative_position)
@@ -0,0 +1,76 @@
+# app/utils/column_sizer.py
+import time
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtWidgets import QHeaderView
+
+SIZE_BUDGET = 0.004  # Secondes de mesure au plus par passage de la boucle d'événements
+
+
+class ColumnSizer(QObject):
+    """
+    Largeur « au contenu » des colonnes d'une vue de playlist, à la place de QHeaderView.ResizeToContents
+    qui mesure le texte de chaque ligne à chaque mise en page.
+    Le modèle tient l'histogramme des textes de ces colonnes (TextTally) : seuls les textes apparus depuis
+    le passage précédent sont mesurés, au plus SIZE_BUDGET par passage (le reste au passage suivant,
+    la largeur n'étant appliquée qu'une fois tout mesuré). La largeur retenue est celle du texte le plus
+    large encore présent, et au moins celle de l'en-tête ; tous les textes ne sont repris que lorsque
+    le plus large disparaît.
+    """
+
+    def __init__(self, header, model, columns, metrics, margin):
+        super().__init__(header)
+        self.header = header
+        self.columns = list(columns)
+        self.metrics = metrics
+        self.margin = margin
+        self.widths = {column: {} for column in self.columns}  # Par colonne : texte présent -> largeur
+        self.waiting = {column: set() for column in self.columns}  # Textes présents pas encore mesurés
+        self.widest = {column: (0, None) for column in self.columns}  # (largeur, texte) ou None à recalculer
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.update_widths)
+
+        for column in self.columns:
+            header.setSectionResizeMode(column, QHeaderView.Fixed)
+        self.tally = model.track_texts(self.columns)
+        for signal in (model.rowsInserted, model.rowsRemoved, model.dataChanged, model.modelReset):
+            signal.connect(self.schedule)
+        self.schedule()
+
+    def schedule(self, *args):
+        """Regroupe les changements du modèle en un seul passage à la prochaine boucle d'événements."""
+        if not self.timer.isActive():
+            self.timer.start(0)
+
+    def update_widths(self):
+        deadline = time.monotonic() + SIZE_BUDGET
+        unfinished = False
+        for column in self.columns:
+            widths, waiting = self.widths[column], self.waiting[column]
+            appeared, vanished = self.tally.take_changes(column)
+            waiting |= appeared
+            waiting -= vanished
+            for text in vanished:
+                widths.pop(text, None)
+            widest = self.widest[column]
+            if widest is not None and widest[1] in vanished:
+                widest = None  # Le plus large a disparu : maximum à reprendre sur tous les textes
+            while waiting and time.monotonic() < deadline:
+                text = waiting.pop()
+                width = widths[text] = self.metrics.horizontalAdvance(text) + 2 * self.margin
+                if widest is not None and width > widest[0]:
+                    widest = (width, text)
+            self.widest[column] = widest
+            unfinished = unfinished or bool(waiting)
+        if unfinished:
+            self.timer.start(0)  # Largeurs appliquées une fois tout mesuré : une seule remise en page
+            return
+
+        for column in self.columns:
+            if self.widest[column] is None:
+                self.widest[column] = max(((width, text) for text, width in self.widths[column].items()),
+                                          default=(0, None))
+            width = max(self.widest[column][0], self.header.sectionSizeFromContents(column).width())
+            if self.header.sectionSize(column) != width:
+                self.header.resizeSection(column, width)
@@ -1,18 +1,39 @@
 # playlist_table.py
 import sys
+import time
+from collections import deque
 from pathlib import Path
 from time import sleep
 
+import numpy as np
 import yaml
 # from networkx import config
 from yaml import safe_load
-from PySide6.QtWidgets import QTableView, QHeaderView, QAbstractItemView, QProxyStyle, QStyleOptionHeader, QStyle
-from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex
-from PySide6.QtGui import QColor, QBrush, QFont
+from PySide6.QtWidgets import (QTableView, QHeaderView, QAbstractItemView, QProxyStyle, QStyleOptionHeader, QStyle,
+                               QStyledItemDelegate)
+from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex, QTimer, QSize
+from PySide6.QtGui import QColor, QBrush, QFont, QFontMetrics, QStaticText, QTransform
 from .config_loader import config_instance
+from .queue_store import QueueStore, PagedQueueStore, TextTally, column_key, position_text
+from .queue_diff import diff_ids
+from .column_sizer import ColumnSizer
 from app.mpd.mpd_client import MPDClientWrapper
+from app.mpd.queue_sync import fetch_range
 from app.mpd.music_state_manager import MusicStateManager
 
+# Rôles en entiers : `Qt.DisplayRole` coûte une recherche d'attribut d'enum à chaque appel de `data()`
+DISPLAY_ROLE = int(Qt.DisplayRole)
+FOREGROUND_ROLE = int(Qt.ForegroundRole)
+ALIGNMENT_ROLE = int(Qt.TextAlignmentRole)
+FONT_ROLE = int(Qt.FontRole)
+
+SELECTED_STATE = QStyle.State_Selected.value  # Entier : un test sur le drapeau d'enum coûte bien plus cher
+TEXT_MARGIN = 4  # Marge horizontale du texte dans une cellule (comme le délégué par défaut)
+LAYOUT_CACHE_SIZE = 20000  # Textes mis en page gardés au plus par le délégué
+
+FILL_ROWS = 100  # Lignes rangées d'un coup quand une page arrive
+FILL_BUDGET = 0.004  # Secondes de remplissage au plus par passage de la boucle d'événements
+
 
 class CustomHeaderView(QHeaderView):
     def __init__(self, orientation, header, background_color, header_background, text_color,
@@ -24,56 +45,143 @@ class CustomHeaderView(QHeaderView):
         self.text_color = text_color
         self.colonne_text_colors = colonne_text_colors
         self.font = font
+        # Objets de peinture construits une seule fois (et non à chaque section peinte)
+        self.qbackground = QColor(self.background_color)
+        self.qfont = QFont(self.font)
+        self.qfont.setBold(True)
+        self.line_color = QColor("#c9cb28")
+        self.sections = {}  # Section -> (texte, couleur, alignement)
+
+    def _section(self, logicalIndex):
+        section = self.sections.get(logicalIndex)
+        if section is None:
+            header_text = str(self.model().headerData(logicalIndex, self.orientation(), Qt.DisplayRole))
+            # Couleur de la colonne, couleur par défaut si absente
+            text_color = QColor(self.colonne_text_colors.get(header_text.lower(), self.text_color))
+            alignment = Qt.AlignCenter if header_text == "Time" else Qt.AlignLeft | Qt.AlignTop
+            section = self.sections[logicalIndex] = (header_text, text_color, alignment)
+        return section
+
+    def setModel(self, model):
+        self.sections.clear()
+        super().setModel(model)
 
     def paintSection(self, painter, rect, logicalIndex):
+        header_text, text_color, alignment = self._section(logicalIndex)
         painter.save()
 
-        # Utiliser la couleur de fond définie dans la configuration
-        background_color = QColor(self.background_color)
-        text_color = QColor(self.colonne_text_colors.get(
-            self.model().headerData(logicalIndex, self.orientation(), Qt.DisplayRole).lower(),
-            self.text_color  # Couleur par défaut si absente
-        ))
-
         # Appliquer la couleur de fond
-        painter.fillRect(rect, background_color)
-
-        # Définir la police et la couleur du texte
-        fontz = QFont(self.font)
-        fontz.setBold(True)
-        painter.setFont(fontz)
-        painter.setPen(text_color)
+        painter.fillRect(rect, self.qbackground)
 
         # Dessiner le texte de l'en-tête
-        header_text = self.model().headerData(logicalIndex, self.orientation(), Qt.DisplayRole)
-        if header_text == "Time":
-            painter.drawText(rect, Qt.AlignCenter ,str(header_text))
-        else:
-            painter.drawText(rect, str(header_text))
+        painter.setFont(self.qfont)
+        painter.setPen(text_color)
+        painter.drawText(rect, alignment, header_text)
 
         # Dessiner la bordure inférieure
-        painter.setPen(QColor("#c9cb28"))
+        painter.setPen(self.line_color)
         painter.drawLine(rect.bottomLeft(), rect.bottomRight())
 
         painter.restore()
 
 
+class PlaylistRowDelegate(QStyledItemDelegate):
+    """
+    Peint les cellules des vues de playlist sans passer par le style ni par les rôles de `data()` :
+    le texte est lu directement dans le modèle (`display_text`), les couleurs par colonne sont résolues
+    une fois depuis config.yaml et chaque texte élidé n'est mis en page qu'une fois par largeur de colonne
+    (QStaticText), puis redessiné tel quel au défilement.
+    """
+
+    def __init__(self, headers, text_color, colonne_text_colors, selected_playlist, selected_text,
+                 playlist_current_song, font, parent=None):
+        super().__init__(parent)
+        self.qfont = QFont(font)
+        self.metrics = QFontMetrics(self.qfont)
+        self.line_height = self.metrics.height()
+        self.column_colors = [QColor(colonne_text_colors.get(header.lower(), text_color)) for header in headers]
+        self.centered = [column_key(header) in ("time", "track") for header in headers]
+        self.selection_color = QColor(selected_playlist)
+        self.selected_text_color = QColor(selected_text)
+        self.current_color = QColor(playlist_current_song)
+        self.layouts = {}  # (texte, largeur disponible) -> (QStaticText du texte élidé, largeur de ce texte)
+        self.widths = {}  # Texte -> largeur en pixels
+
+    def text_width(self, text):
+        width = self.widths.get(text)
+        if width is None:
+            if len(self.widths) >= LAYOUT_CACHE_SIZE:
+                self.widths.clear()
+            width = self.widths[text] = self.metrics.horizontalAdvance(text)
+        return width
+
+    def _layout(self, text, width):
+        key = (text, width)
+        layout = self.layouts.get(key)
+        if layout is None:
+            if len(self.layouts) >= LAYOUT_CACHE_SIZE:
+                self.layouts.clear()  # Largeurs de colonne changées ou très longue file : on repart de zéro
+            if self.text_width(text) > width:
+                text = self.metrics.elidedText(text, Qt.ElideRight, width)
+            static_text = QStaticText(text)
+            static_text.setTextFormat(Qt.PlainText)
+            static_text.prepare(QTransform(), self.qfont)
+            layout = self.layouts[key] = (static_text, self.text_width(text))
+        return layout
+
+    def paint(self, painter, option, index):
+        model = index.model()
+        row, column = index.row(), index.column()
+        rect = option.rect
+        if option.state.value & SELECTED_STATE:
+            painter.fillRect(rect, self.selection_color)
+            color = self.selected_text_color
+        elif row == model.current_track:
+            color = self.current_color
+        else:
+            color = self.column_colors[column]
+        text = model.display_text(row, column)
+        width = rect.width() - 2 * TEXT_MARGIN
+        if not text or width <= 0:
+            return
+        static_text, text_width = self._layout(text, width)
+        x = rect.x() + TEXT_MARGIN
+        if self.centered[column]:
+            x += (width - text_width) // 2
+        painter.setFont(self.qfont)
+        painter.setPen(color)
+        painter.drawStaticText(x, rect.y() + (rect.height() - self.line_height) // 2, static_text)
+
+    def sizeHint(self, option, index):
+        text = index.model().display_text(index.row(), index.column())
+        return QSize(self.text_width(text) + 2 * TEXT_MARGIN, self.line_height)
+
+
 class PlaylistTableModel(QAbstractTableModel):
     def __init__(self, playlist_data, headers,  background_color, header_background,
                                         text_color,selected_playlist, selected_text,
-                                        colonne_text_colors,playlist_header_line, font, playlist_current_song):
+                                        colonne_text_colors,playlist_header_line, font, playlist_current_song,
+                                        mpd_client=None):
         super().__init__()
         self.headers = headers
-        self.playlist_data = self.transform_data(playlist_data, headers)  # Transformation des données
+        self.store = QueueStore(headers, playlist_data)  # Colonnes de chaînes déjà formatées, durées et id
         self.font = font
         self.text_color = text_color
         self.colonne_text_colors = colonne_text_colors
-        self.mpd_client = MPDClientWrapper()
-        print(self.mpd_client.get_status().get("song"))
+        # Handle sur la session MPD partagée (aucune connexion supplémentaire)
+        self.mpd_client = mpd_client if mpd_client is not None else MPDClientWrapper()
 
         self.current_track = self._fetch_current_index()  # Position ou ID du morceau joué
         self.playlist_current_song = playlist_current_song
 
+        # Tout ce que `data()` retourne hors texte est construit une seule fois
+        self.qfont = QFont(self.font)
+        self.column_brushes = [QBrush(QColor(self.colonne_text_colors.get(header.lower(), self.text_color)))
+                               for header in headers]
+        self.current_brush = QBrush(QColor(self.playlist_current_song))
+        self.alignments = [Qt.AlignCenter if key in ("time", "track") else None for key in self.store.keys]
+        self.position_column = self.store.position_column
+
 
     def _fetch_current_index(self) -> int:
         song = self.mpd_client.get_status().get("song")
@@ -83,91 +191,51 @@ class PlaylistTableModel(QAbstractTableModel):
         # except (TypeError, ValueError):
         #     return -1
 
-
-    def transform_data(self, playlist_data, headers):
-        """Transforme playlist_data pour ne conserver que les colonnes spécifiées dans headers."""
-        transformed_data = []
-        for item in playlist_data:
-            transformed_item = {header.lower().replace(" ", "_"): item.get(header.lower().replace(" ", "_"), "N/A")
-                                for header in headers}
-            transformed_data.append(transformed_item)
-        # print("transformed_data : ", transformed_data)
-        return transformed_data
+    @property
+    def playlist_data(self):
+        """Lignes sous forme de dictionnaires (construites à la demande, pour les sauvegardes de playlist)."""
+        return self.store.as_dicts()
 
     def rowCount(self, parent=QModelIndex()):
-        return len(self.playlist_data)
+        return len(self.store)
 
     def columnCount(self, parent=QModelIndex()):
         return len(self.headers)
 
-    def data(self, index, role=Qt.DisplayRole):
-
+    def data(self, index, role=DISPLAY_ROLE):
         if not index.isValid():
             return None
-
         row = index.row()
         col = index.column()
-        # Vérifie que l'index de colonne est dans la plage de headers
-        if col >= len(self.headers):
-            return None
-        column_key = self.headers[col].lower().replace(" ", "_")  # Convertir l'en-tête en clé
-        track = self.playlist_data[row]
-
-        # print(f"Traitement de la cellule - Ligne: {row}, Colonne: {col}, Clé: {column_key}")
-
-
-
-        # Texte de chaque cellule
-        if role == Qt.DisplayRole:
-            value = track.get(column_key, "N/A")  # "N/A" si la clé est absente
-            if column_key == "time":
-                if value == "Durée inconnue": #TODO: corection en amont du problème , comme enlevé la piste
-                    value = 0
-                # print(" value : ",value)
-                seconds = int(value)
-                minutes = seconds // 60  # Calculate minutes
-                remaining_seconds = seconds % 60  # Calculate remaining seconds
-                value =  f"{minutes}:{remaining_seconds:02d}"
-
-            # print(f"Valeur affichée: {value}")
-            return value
-
-        # # Style personnalisé pour la piste en cours
-        # if role == Qt.BackgroundRole and row == self.current_track:
-        #     value = track.get(column_key, "N/A")
-        #     print("row + role: ", value)
-        #     return QBrush(QColor("#FFD700"))  # Jaune doré
-
-
-        # Personnalisation des couleurs par colonne
-        if role == Qt.ForegroundRole:
-            if row == self.current_track:
-                color = self.playlist_current_song
-            else:
-                # Obtenez le titre de la colonne en fonction de l'index de la colonne
-                column_title = self.headers[col].lower()
-                # Récupérez la couleur associée à ce titre dans `colonne_text_colors`
-                color = self.colonne_text_colors.get(column_title, self.text_color)  # Couleur par défaut noire si absente
-            return QBrush(QColor(color))
-
-        # Fond alterné pour les lignes, mais avec une couleur de fond par défaut cohérente
-        # if role == Qt.BackgroundRole:
-        #     return QBrush(QColor(self.background_color)) if row % 2 == 0 else QBrush(QColor("#282828"))
-
-        # Alignement centré
-        if role == Qt.TextAlignmentRole:
-            if column_key == "time":
-                return Qt.AlignCenter
-            elif column_key == "track":
-                return Qt.AlignCenter
+
+        # Texte de chaque cellule (durée déjà formatée en m:ss)
+        if role == DISPLAY_ROLE:
+            return self.display_text(row, col)
+
+        # Couleur par colonne, ou couleur de la piste en cours
+        if role == FOREGROUND_ROLE:
+            return self.current_brush if row == self.current_track else self.column_brushes[col]
+
+        # Alignement centré pour la durée et le numéro de piste
+        if role == ALIGNMENT_ROLE:
+            return self.alignments[col]
 
         # Police personnalisée
-        if role == Qt.FontRole:
-            fontz = QFont(self.font)
-            return fontz
+        if role == FONT_ROLE:
+            return self.qfont
 
         return None
 
+    def display_text(self, row, column):
+        """Texte affiché d'une cellule (lu aussi directement par PlaylistRowDelegate)."""
+        return position_text(self.store.positions[row]) if column == self.position_column else self.store.texts[column][row]
+
+    def track_texts(self, columns):
+        """Histogramme des textes de `columns`, tenu à jour à chaque modification (voir ColumnSizer)."""
+        tally = TextTally(columns)
+        self.store.track_texts(tally)
+        return tally
+
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         if role == Qt.DisplayRole and orientation == Qt.Horizontal:
             return self.headers[section]
@@ -189,13 +257,252 @@ class PlaylistTableModel(QAbstractTableModel):
 
 
     def update_playlist(self, new_playlist_data):
-        """Mise à jour du modèle avec de nouvelles données."""
+        """
+        Mise à jour du modèle avec une playlist complète : comparée par id aux lignes affichées,
+        elle ne produit que les insertions, retraits, déplacements et dataChanged nécessaires
+        (la sélection et la position de défilement sont conservées).
+        """
+        rows = [self.store.make_row(song) for song in new_playlist_data]
+        new_ids = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+        if not (_diffable(self.store.ids) and _diffable(new_ids)):
+            # Id absents ou répétés (autre chose que la playlist active) : rien à quoi se raccrocher
+            self.beginResetModel()
+            self.store.reset(new_playlist_data)
+            self.endResetModel()
+            return
+        self._apply_ids(new_ids, {row[2]: row for row in rows})
+        changed_rows = [pos for pos, row in enumerate(rows) if self.store.row(pos) != row]
+        for pos in changed_rows:
+            self.store.set_row(pos, rows[pos])  # Même morceau, étiquettes modifiées
+        self._emit_changed(changed_rows)
+
+    def apply_changes(self, length, changes):
+        """
+        Applique un delta de la playlist active (voir QueueSync) sans réinitialiser le modèle.
+        La nouvelle suite d'id est reconstituée à partir des positions modifiées, puis comparée à l'ancienne :
+        un ajout, un retrait ou un déplacement au milieu d'une grande file ne touche que les lignes concernées.
+        :param length: Nouvelle longueur de la playlist.
+        :param changes: Liste de (position, id, morceau formaté ou None si déjà connu, ancienne position).
+        """
+        new_ids = np.full(length, -1, dtype=np.int64)
+        kept = min(length, len(self.store))
+        new_ids[:kept] = self.store.ids[:kept]
+        if changes:
+            positions = np.array([change[0] for change in changes], dtype=np.intp)
+            new_ids[positions] = np.array([change[1] for change in changes], dtype=np.int64)  # Id MPD numériques
+        rows = {pos: self.store.make_row(song) for pos, song_id, song, old_pos in changes if song is not None}
+        inserted = self._apply_ids(new_ids, {row[2]: row for row in rows.values()})
+        # Morceaux déjà présents mais relus (étiquettes modifiées) : réécrits en place
+        changed_rows = [pos for pos, row in rows.items() if row[2] not in inserted]
+        for pos in changed_rows:
+            self.store.set_row(pos, rows[pos])
+        self._emit_changed(changed_rows)
+
+    def _apply_ids(self, new_ids, rows_by_id):
+        """
+        Amène le modèle à la suite d'id `new_ids` ; `rows_by_id` fournit les lignes des morceaux nouveaux.
+        Retourne les id insérés.
+        """
+        current_id = int(self.store.ids[self.current_track]) if 0 <= self.current_track < len(self.store) else None
+        operations = diff_ids(self.store.ids, new_ids)
+        if operations is None:
+            inserted = self._rewrite(new_ids, rows_by_id)
+        else:
+            inserted = set()
+            for operation in operations:
+                if operation[0] == "remove":
+                    _, row, count = operation
+                    self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+                    self.store.remove(row, count)
+                    self.endRemoveRows()
+                elif operation[0] == "move":
+                    _, row, count, destination = operation
+                    # Qt attend la ligne devant laquelle le bloc est inséré, comptée avant le déplacement
+                    before = destination if destination < row else destination + count
+                    self.beginMoveRows(QModelIndex(), row, row + count - 1, QModelIndex(), before)
+                    self.store.move(row, count, destination)
+                    self.endMoveRows()
+                else:
+                    _, row, count = operation
+                    song_ids = new_ids[row:row + count].tolist()
+                    self.beginInsertRows(QModelIndex(), row, row + count - 1)
+                    self.store.insert(row, [rows_by_id[song_id] for song_id in song_ids])
+                    self.endInsertRows()
+                    inserted.update(song_ids)
+        shifted = self.store.renumber()
+        if shifted is not None and self.position_column is not None:
+            # Les positions ont suivi leurs lignes pendant les opérations ; leur renumérotation est annoncée ici
+            first, last = shifted
+            self.dataChanged.emit(self.index(first, self.position_column), self.index(last, self.position_column),
+                                  [DISPLAY_ROLE])
+        if current_id is not None:
+            self._follow_current(current_id)
+        return inserted
+
+    def _rewrite(self, new_ids, rows_by_id):
+        """Zone trop réordonnée pour des déplacements (mélange d'une grande file) : réécrite en place."""
+        old_rows = {song_id: row for row, song_id in enumerate(self.store.ids.tolist())}
+        common = min(len(self.store), len(new_ids))
+        differing = np.flatnonzero(self.store.ids[:common] != new_ids[:common]).tolist()
+        rows = [rows_by_id.get(song_id) or self.store.row(old_rows[song_id])
+                for song_id in new_ids[differing].tolist()]
+        appended = [rows_by_id.get(song_id) or self.store.row(old_rows[song_id])
+                    for song_id in new_ids[common:].tolist()]
+        for pos, row in zip(differing, rows):
+            self.store.set_row(pos, row)
+        self._emit_changed(differing)
+        if len(self.store) > common:
+            self.beginRemoveRows(QModelIndex(), common, len(self.store) - 1)
+            self.store.truncate(common)
+            self.endRemoveRows()
+        if appended:
+            self.beginInsertRows(QModelIndex(), common, common + len(appended) - 1)
+            self.store.extend(appended)
+            self.endInsertRows()
+        return {song_id for song_id in new_ids.tolist() if song_id not in old_rows}
+
+    def _follow_current(self, current_id):
+        """La surbrillance suit le morceau joué s'il a changé de position."""
+        rows = np.flatnonzero(self.store.ids == current_id)
+        new_idx = int(rows[0]) if len(rows) else -1
+        if new_idx != self.current_track:
+            old_idx, self.current_track = self.current_track, new_idx
+            self._emit_changed([row for row in (old_idx, new_idx) if 0 <= row < len(self.store)],
+                               [FOREGROUND_ROLE])
+
+    def _emit_changed(self, changed_rows, roles=()):
+        """dataChanged regroupé par plages contiguës de lignes (triées)."""
+        last_column = self.columnCount() - 1
+        start = previous = None
+        for row in sorted(changed_rows) + [None]:
+            if start is not None and (row is None or row != previous + 1):
+                self.dataChanged.emit(self.index(start, 0), self.index(previous, last_column), list(roles))
+                start = None
+            if row is not None and start is None:
+                start = row
+            previous = row
+
+
+def _diffable(ids):
+    """Des id MPD valides et uniques : la liste peut être comparée par id."""
+    return len(ids) == 0 or (ids.min() >= 0 and len(np.unique(ids)) == len(ids))
+
+
+class PagedPlaylistTableModel(PlaylistTableModel):
+    """
+    Playlist active lue par fenêtres : la longueur vient de `status.playlistlength`, les lignes sont demandées
+    page par page (`playlistinfo start:end`) quand la vue les affiche, puis rangées par petits lots
+    sans jamais occuper la boucle d'événements plus de FILL_BUDGET. Une cellule pas encore chargée est vide.
+    """
+
+    def __init__(self, length, headers, *style, mpd_client=None):
+        super().__init__([], headers, *style, mpd_client=mpd_client)
+        settings = config_instance.data.get("queue") or {}
+        self.pages = PagedQueueStore(headers, length, int(settings.get("page_rows", 500)),
+                                     int(settings.get("max_cached_rows", 100000)))
+        self.fill_queue = deque()  # (indice de page, page, morceaux formatés restant à ranger)
+        self.fill_timer = QTimer(self)
+        self.fill_timer.setSingleShot(True)
+        self.fill_timer.timeout.connect(self._fill)
+        # Première page demandée tout de suite : elle arrive pendant la construction de la vue
+        self.request_page(0)
+
+    @property
+    def playlist_data(self):
+        """Lignes déjà chargées seulement (la file complète n'est jamais lue d'un coup)."""
+        return [row for page_index, page in sorted(self.pages.pages.items())
+                for row in page.as_dicts(page_index * self.pages.page_rows)]
+
+    def rowCount(self, parent=QModelIndex()):
+        return self.pages.length
+
+    def track_texts(self, columns):
+        """Textes des pages en cache seulement : la largeur suit les parties de la file déjà affichées."""
+        tally = TextTally(columns)
+        self.pages.track_texts(tally)
+        return tally
+
+    def display_text(self, row, column):
+        text = self.pages.text(row, column)
+        if text is None:
+            self.request_page(row // self.pages.page_rows)
+            return ""
+        return position_text(row) if column == self.position_column else text
+
+    def request_page(self, page_index):
+        token = self.pages.request(page_index)
+        if token is None:
+            return
+        start, end = self.pages.page_range(page_index)
+        self.mpd_client.executor.call_func_async(
+            fetch_range, start, end,
+            callback=lambda songs: self._on_page(page_index, token, songs),
+            error_callback=lambda error: self._on_page_error(page_index, token, error), retry=True)
+
+    def _on_page(self, page_index, token, songs):
+        page = self.pages.begin(page_index, token)
+        if page is None:
+            return  # Page invalidée ou file rechargée depuis la demande
+        self.fill_queue.append((page_index, page, deque(songs)))
+        if not self.fill_timer.isActive():
+            self.fill_timer.start(0)
+
+    def _on_page_error(self, page_index, token, error):
+        print(f"Erreur de lecture de la playlist (page {page_index}) : {error}")
+        if self.pages.requests.get(page_index) == token:
+            del self.pages.requests[page_index]  # Redemandée au prochain affichage
+
+    def _fill(self):
+        """Range les pages reçues par lots de FILL_ROWS lignes, dans la limite de FILL_BUDGET par passage."""
+        deadline = time.monotonic() + FILL_BUDGET
+        last_column = self.columnCount() - 1
+        while self.fill_queue and time.monotonic() < deadline:
+            page_index, page, songs = self.fill_queue[0]
+            start, end = self.pages.page_range(page_index)
+            if not self.pages.is_current(page_index, page) or start + len(page) >= end or not songs:
+                self.fill_queue.popleft()
+                continue
+            count = min(FILL_ROWS, len(songs), end - start - len(page))
+            first = start + len(page)
+            page.extend([self.pages.formatter.make_row(songs.popleft()) for _ in range(count)])
+            self.dataChanged.emit(self.index(first, 0), self.index(first + count - 1, last_column),
+                                  [DISPLAY_ROLE])
+        if self.fill_queue:
+            self.fill_timer.start(0)
+
+    def update_playlist(self, new_playlist_data):
+        self.reset_length(len(new_playlist_data))
+
+    def reset_length(self, length):
+        """Playlist rechargée : toutes les pages sont oubliées, les lignes visibles seront redemandées."""
         self.beginResetModel()
-        self.playlist_data = new_playlist_data
+        self.fill_queue.clear()
+        self.pages.clear(length)
         self.endResetModel()
 
+    def apply_changes(self, length, changes):
+        """
+        Delta de la playlist (voir QueueSync en mode paginé) : lignes ajoutées ou retirées en fin de file,
+        pages chargées contenant une position modifiée oubliées puis signalées par dataChanged.
+        """
+        current = self.pages.length
+        if length < current:
+            self.beginRemoveRows(QModelIndex(), length, current - 1)
+            self.pages.resize(length)
+            self.endRemoveRows()
+        elif length > current:
+            self.beginInsertRows(QModelIndex(), current, length - 1)
+            self.pages.resize(length)
+            self.endInsertRows()
+        last_column = self.columnCount() - 1
+        for page_index in self.pages.invalidate(change[0] for change in changes):
+            start, end = self.pages.page_range(page_index)
+            if start < end:
+                self.dataChanged.emit(self.index(start, 0), self.index(end - 1, last_column))
+
+
 class StyledPlaylistTableView(QTableView):
-    def __init__(self, playlist_data, header=None, column_widths=None, column_modes=None):
+    def __init__(self, playlist_data, header=None, column_widths=None, column_modes=None, paged_length=None):
         super().__init__()
         print()
         playlist_mode = config_instance.data["playlist_mode"]
@@ -219,6 +526,7 @@ class StyledPlaylistTableView(QTableView):
         playlist_current_song = config_instance.data["colors"]["playlist_current_song"]
         font = config_instance.data["font"]["family"]
 
+        # Handle sur la session MPD partagée (aucune connexion supplémentaire)
         self.mpd_client = MPDClientWrapper()
         # Init le changement de music
 
@@ -259,20 +567,30 @@ class StyledPlaylistTableView(QTableView):
                 border-right: none;
             }}
         """)
-        # Initialisation du modèle de données
-        self.model = PlaylistTableModel(playlist_data, header, background_color, header_background,
-                                        text_color,selected_playlist, selected_text,
-                                        colonne_text_colors,playlist_header_line, font,playlist_current_song)
+        self.verticalHeader().setVisible(False)  # Cacher les en-têtes de lignes
+        # fixer la hauteur de toutes les lignes à 32 pixels
+        # (avant setModel : sinon l'en-tête vertical recalcule toutes les lignes d'une grande file)
+        self.verticalHeader().setDefaultSectionSize(20)
+
+        # Initialisation du modèle de données (lu par fenêtres si seule la longueur est fournie)
+        style = (background_color, header_background, text_color, selected_playlist, selected_text,
+                 colonne_text_colors, playlist_header_line, font, playlist_current_song)
+        if paged_length is not None:
+            self.model = PagedPlaylistTableModel(paged_length, header, *style, mpd_client=self.mpd_client)
+        else:
+            self.model = PlaylistTableModel(playlist_data, header, *style, self.mpd_client)
         self.setModel(self.model)
+        # Un seul délégué peint toutes les colonnes (texte élidé et couleurs mis en cache)
+        self.delegate = PlaylistRowDelegate(header, text_color, colonne_text_colors, selected_playlist,
+                                            selected_text, playlist_current_song, font, self)
+        self.setItemDelegate(self.delegate)
+        self.column_sizer = None
 
         # Configuration des en-têtes
         # Utiliser CustomHeaderView pour l'en-tête horizontal
         self.setHorizontalHeader(CustomHeaderView(Qt.Horizontal, header, background_color, header_background, text_color,
                  selected_playlist, selected_text, colonne_text_colors, font, self))
 
-        self.verticalHeader().setVisible(False)  # Cacher les en-têtes de lignes
-        # fixer la hauteur de toutes les lignes à 32 pixels
-        self.verticalHeader().setDefaultSectionSize(20)
 
         # Désactiver l'édition
         self.setEditTriggers(QTableView.NoEditTriggers)
@@ -297,22 +615,39 @@ class StyledPlaylistTableView(QTableView):
 
     def set_column_modes(self, column_modes):
         """Définit le mode de redimensionnement de chaque colonne en fonction d'une liste de modes."""
+        sized_columns = []
         for col, mode in enumerate(column_modes):
             if mode == "stretch":
                 self.horizontalHeader().setSectionResizeMode(col, QHeaderView.Stretch)
             elif mode == "fixed":
                 self.horizontalHeader().setSectionResizeMode(col, QHeaderView.Fixed)
             elif mode == "ResizeToContents":
-                self.horizontalHeader().setSectionResizeMode(col, QHeaderView.ResizeToContents)
+                sized_columns.append(col)
             elif mode == "Custom":
                 self.horizontalHeader().setSectionResizeMode(col, QHeaderView.Custom)
             elif mode == "Interactive":
                 self.horizontalHeader().setSectionResizeMode(col, QHeaderView.Interactive)
 
+        # Largeur au contenu sans mesurer chaque ligne de la file (voir ColumnSizer)
+        if self.column_sizer is not None:
+            self.column_sizer.deleteLater()
+            self.column_sizer = None
+        if sized_columns:
+            self.column_sizer = ColumnSizer(self.horizontalHeader(), self.model, sized_columns,
+                                            self.delegate.metrics, TEXT_MARGIN)
+
     def update_playlist_view(self, new_playlist_data):
         """Met à jour la vue avec de nouvelles données de playlist."""
         self.model.update_playlist(new_playlist_data)
 
+    def reset_playlist_length(self, length):
+        """Playlist paginée rechargée : seule la nouvelle longueur est connue."""
+        self.model.reset_length(length)
+
+    def apply_playlist_changes(self, length, changes):
+        """Applique un delta de la playlist active en conservant sélection et position de défilement."""
+        self.model.apply_changes(length, changes)
+
     def update_current_song_view(self):
         self.model.update_current_song()
         sid = int(self.mpd_client.get_status().get("song"))
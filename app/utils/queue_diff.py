@@ -0,0 +1,115 @@
+# app/utils/queue_diff.py
+"""
+Différence entre deux états de la playlist active, comparés par id MPD.
+
+`diff_ids` retourne la suite minimale d'opérations qui transforme l'ancienne liste d'id en la nouvelle,
+à appliquer dans l'ordre (chaque position est exprimée dans l'état laissé par l'opération précédente) :
+
+    ("remove", début, nombre)
+    ("move", début, nombre, destination)    destination : position du premier morceau après le déplacement
+    ("insert", début, nombre)               les morceaux de `new_ids[début:début + nombre]`
+
+Le début et la fin communs sont écartés par comparaison vectorisée ; seule la zone modifiée est parcourue
+en Python. Un bloc déplacé d'un seul tenant (rotation de la zone) donne un seul déplacement ; au-delà,
+les morceaux qui restent en place sont la plus longue sous-suite croissante et les autres sont déplacés.
+"""
+from bisect import bisect_left
+
+import numpy as np
+
+MOVE_LIMIT = 5000  # Morceaux réordonnés au-delà desquels la zone est réécrite plutôt que déplacée
+
+
+def _runs(mask):
+    """Plages contiguës (début, nombre) des valeurs vraies d'un tableau booléen."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    return [(int(start), int(stop - start)) for start, stop in zip(edges[::2], edges[1::2])]
+
+
+def _kept(sequence):
+    """Indices formant la plus longue sous-suite croissante de `sequence`."""
+    tails, tail_indices, previous = [], [], [-1] * len(sequence)
+    for index, value in enumerate(sequence):
+        slot = bisect_left(tails, value)
+        if slot == len(tails):
+            tails.append(value)
+            tail_indices.append(index)
+        else:
+            tails[slot] = value
+            tail_indices[slot] = index
+        previous[index] = tail_indices[slot - 1] if slot else -1
+    kept = set()
+    index = tail_indices[-1] if tail_indices else -1
+    while index >= 0:
+        kept.add(index)
+        index = previous[index]
+    return kept
+
+
+def _moves(current, target, offset):
+    """Déplacements qui remettent `current` dans l'ordre de `target` (mêmes id, ordres différents)."""
+    count = len(current)
+    shift = int(np.flatnonzero(current == target[0])[0])
+    if np.array_equal(current[shift:], target[:count - shift]) and np.array_equal(current[:shift],
+                                                                                   target[count - shift:]):
+        # Rotation : un seul bloc a changé de place ; on déplace le plus court des deux
+        if shift <= count - shift:
+            return [("move", offset, shift, offset + count - shift)]
+        return [("move", offset + shift, count - shift, offset)]
+    if count > MOVE_LIMIT:
+        return None
+
+    target = target.tolist()
+    target_index = {song_id: index for index, song_id in enumerate(target)}
+    work = current.tolist()
+    kept = {work[index] for index in _kept([target_index[song_id] for song_id in work])}
+    moves = []
+    for index, song_id in enumerate(target):
+        if song_id in kept:
+            continue
+        source = work.index(song_id)
+        del work[source]
+        destination = work.index(target[index - 1]) + 1 if index else 0
+        work.insert(destination, song_id)
+        if destination != source:
+            moves.append(("move", offset + source, 1, offset + destination))
+    return moves
+
+
+def diff_ids(old_ids, new_ids):
+    """
+    Opérations qui transforment `old_ids` en `new_ids` (tableaux d'id MPD, uniques dans chaque liste),
+    ou None si la zone réordonnée est trop grande pour être décrite par déplacements.
+    """
+    old_ids = np.asarray(old_ids, dtype=np.int64)
+    new_ids = np.asarray(new_ids, dtype=np.int64)
+    common = min(len(old_ids), len(new_ids))
+    mismatch = np.flatnonzero(old_ids[:common] != new_ids[:common])
+    start = int(mismatch[0]) if len(mismatch) else common
+    if start == len(old_ids) == len(new_ids):
+        return []
+    tail = common - start
+    mismatch = np.flatnonzero(old_ids[len(old_ids) - tail:][::-1] != new_ids[len(new_ids) - tail:][::-1])
+    tail = int(mismatch[0]) if len(mismatch) else tail
+    old_zone = old_ids[start:len(old_ids) - tail]
+    new_zone = new_ids[start:len(new_ids) - tail]
+
+    operations = []
+    # Morceaux retirés, du bas vers le haut : les positions au-dessus ne bougent pas
+    removed = ~np.isin(old_zone, new_zone)
+    for run_start, run_count in reversed(_runs(removed)):
+        operations.append(("remove", start + run_start, run_count))
+
+    # Morceaux conservés, remis dans le nouvel ordre
+    added = ~np.isin(new_zone, old_zone)
+    current, target = old_zone[~removed], new_zone[~added]
+    if not np.array_equal(current, target):
+        moves = _moves(current, target, start)
+        if moves is None:
+            return None
+        operations.extend(moves)
+
+    # Morceaux ajoutés, du haut vers le bas : tout ce qui les précède est déjà en place
+    for run_start, run_count in _runs(added):
+        operations.append(("insert", start + run_start, run_count))
+    return operations
@@ -0,0 +1,321 @@
+# app/utils/queue_store.py
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+
+def column_key(header):
+    """Clé de colonne d'un en-tête de vue (« Title » -> « title »)."""
+    return header.lower().replace(" ", "_")
+
+
+def format_duration(seconds):
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def parse_duration(value):
+    """Durée MPD (« 245 », « 245.3 ») en secondes entières ; 0 si elle est inconnue."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+POSITION_TEXTS_MAX = 65536
+_position_texts = {}  # Position -> chaîne affichée, partagée par toutes les vues
+
+
+def position_text(position):
+    """
+    Chaîne d'une position de la file (« 42 »), gardée dans une table partagée :
+    repeindre la colonne « pos » ne reformate pas le nombre. La table est vidée au-delà de `POSITION_TEXTS_MAX`.
+    """
+    text = _position_texts.get(position)
+    if text is None:
+        if len(_position_texts) >= POSITION_TEXTS_MAX:
+            _position_texts.clear()
+        text = _position_texts[int(position)] = str(position)
+    return text
+
+
+class TextTally:
+    """
+    Histogramme des textes de quelques colonnes (texte -> nombre de lignes), tenu à jour par les QueueStore
+    qui le partagent, avec les textes apparus et disparus depuis la dernière lecture (`take_changes`) :
+    qui s'en sert (voir ColumnSizer) ne reprend que ce qui a changé.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.counts = {column: {} for column in self.columns}
+        self.appeared = {column: set() for column in self.columns}
+        self.vanished = {column: set() for column in self.columns}
+
+    def add(self, column, texts):
+        counts, appeared, vanished = self.counts[column], self.appeared[column], self.vanished[column]
+        for text in texts:
+            count = counts.get(text, 0)
+            counts[text] = count + 1
+            if not count:
+                appeared.add(text)
+                vanished.discard(text)
+
+    def remove(self, column, texts):
+        counts, appeared, vanished = self.counts[column], self.appeared[column], self.vanished[column]
+        for text in texts:
+            count = counts[text] - 1
+            if count:
+                counts[text] = count
+            else:
+                del counts[text]
+                appeared.discard(text)
+                vanished.add(text)
+
+    def take_changes(self, column):
+        """Textes apparus et textes disparus depuis le dernier appel."""
+        changes = self.appeared[column], self.vanished[column]
+        self.appeared[column], self.vanished[column] = set(), set()
+        return changes
+
+
+class QueueStore:
+    """
+    File de lecture rangée par colonnes : une liste de chaînes d'affichage déjà formatées par colonne
+    (chaînes internées : un artiste ou un album répété n'est stocké qu'une fois),
+    plus les durées et les id MPD dans des tableaux numpy.
+    Lire une cellule est un simple accès indexé ; la colonne « pos » passe par la table partagée de `position_text`.
+    """
+
+    def __init__(self, headers, songs=()):
+        self.keys = [column_key(header) for header in headers]
+        # La colonne « pos » n'est pas rangée en texte : `positions` suit les lignes quand elles bougent,
+        # puis `renumber` la remet à l'indice de chaque ligne (un seul dataChanged pour la plage décalée)
+        self.position_column = self.keys.index("pos") if "pos" in self.keys else None
+        self.texts = [[] for _ in self.keys]  # Par colonne : chaîne affichée de chaque ligne
+        self.durations = np.zeros(0, dtype=np.int32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.positions = np.zeros(0, dtype=np.int32)
+        self._durations = {}  # Secondes -> chaîne « m:ss » internée
+        self.tally = None  # Histogramme des textes de certaines colonnes (voir track_texts)
+        self.reset(songs)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def text(self, row, column):
+        return position_text(self.positions[row]) if column == self.position_column else self.texts[column][row]
+
+    def _duration_text(self, seconds):
+        text = self._durations.get(seconds)
+        if text is None:
+            text = self._durations[seconds] = sys.intern(format_duration(seconds))
+        return text
+
+    def make_row(self, song):
+        """Ligne prête à ranger (chaînes par colonne, durée, id) d'un morceau formaté (voir format_playlist)."""
+        duration = parse_duration(song.get("time"))
+        texts = tuple("" if key == "pos" else self._duration_text(duration) if key == "time"
+                      else sys.intern(str(song.get(key, "N/A"))) for key in self.keys)
+        return texts, duration, parse_id(song.get("id"))
+
+    def row(self, row):
+        """Ligne rangée, réutilisable telle quelle par `set_row` / `extend`."""
+        return tuple(texts[row] for texts in self.texts), int(self.durations[row]), int(self.ids[row])
+
+    def track_texts(self, tally):
+        """Compte les textes des colonnes de `tally` ; chaque modification le met à jour au prorata des lignes touchées."""
+        self.tally = tally
+        self._tally("add", 0, len(self))
+
+    def _tally(self, operation, start, stop):
+        """Ajoute (« add ») ou retire (« remove ») les lignes [start, stop) de l'histogramme suivi."""
+        if self.tally is not None:
+            update = getattr(self.tally, operation)
+            for column in self.tally.columns:
+                update(column, self.texts[column][start:stop])
+
+    def reset(self, songs):
+        self._tally("remove", 0, len(self))
+        rows = [self.make_row(song) for song in songs]
+        self.texts = [[row[0][column] for row in rows] for column in range(len(self.keys))]
+        self.durations = np.fromiter((row[1] for row in rows), dtype=np.int32, count=len(rows))
+        self.ids = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+        self.positions = np.arange(len(rows), dtype=np.int32)
+        self._tally("add", 0, len(self))
+
+    def set_row(self, row, stored_row):
+        texts, duration, song_id = stored_row
+        self._tally("remove", row, row + 1)
+        for column, text in enumerate(texts):
+            self.texts[column][row] = text
+        self.durations[row] = duration
+        self.ids[row] = song_id
+        self._tally("add", row, row + 1)
+
+    def truncate(self, length):
+        self._tally("remove", length, len(self))
+        for texts in self.texts:
+            del texts[length:]
+        self.durations = self.durations[:length].copy()
+        self.ids = self.ids[:length].copy()
+        self.positions = self.positions[:length].copy()
+
+    def extend(self, stored_rows):
+        first = len(self)
+        for column, texts in enumerate(self.texts):
+            texts.extend(row[0][column] for row in stored_rows)
+        self.durations = np.concatenate((self.durations, [row[1] for row in stored_rows])).astype(np.int32)
+        self.ids = np.concatenate((self.ids, [row[2] for row in stored_rows])).astype(np.int64)
+        self.positions = np.concatenate((self.positions, np.arange(first, len(self.ids), dtype=np.int32)))
+        self._tally("add", first, len(self))
+
+    def insert(self, row, stored_rows):
+        for column, texts in enumerate(self.texts):
+            texts[row:row] = [stored_row[0][column] for stored_row in stored_rows]
+        self.durations = np.insert(self.durations, row, [stored_row[1] for stored_row in stored_rows])
+        self.ids = np.insert(self.ids, row, [stored_row[2] for stored_row in stored_rows])
+        self.positions = np.insert(self.positions, row, np.arange(row, row + len(stored_rows), dtype=np.int32))
+        self._tally("add", row, row + len(stored_rows))
+
+    def remove(self, row, count):
+        self._tally("remove", row, row + count)
+        for texts in self.texts:
+            del texts[row:row + count]
+        self.durations = np.delete(self.durations, np.s_[row:row + count])
+        self.ids = np.delete(self.ids, np.s_[row:row + count])
+        self.positions = np.delete(self.positions, np.s_[row:row + count])
+
+    def move(self, row, count, destination):
+        """Déplace `count` lignes de `row` en `destination` (position de la première après le déplacement)."""
+        for texts in self.texts:
+            block = texts[row:row + count]
+            del texts[row:row + count]
+            texts[destination:destination] = block
+        for name in ("durations", "ids", "positions"):
+            values = getattr(self, name)
+            block = values[row:row + count].copy()
+            setattr(self, name, np.insert(np.delete(values, np.s_[row:row + count]), destination, block))
+
+    def renumber(self):
+        """Remet la position de chaque ligne à son indice ; retourne la plage (première, dernière) modifiée ou None."""
+        shifted = np.flatnonzero(self.positions != np.arange(len(self.positions), dtype=np.int32))
+        if not len(shifted):
+            return None
+        first, last = int(shifted[0]), int(shifted[-1])
+        self.positions[first:last + 1] = np.arange(first, last + 1, dtype=np.int32)
+        return first, last
+
+    def as_dicts(self, first=0):
+        """Lignes sous forme de dictionnaires (clé de colonne -> texte affiché, plus l'id) ; `first` : position de la première."""
+        rows = [dict(zip(self.keys, texts), id=str(song_id))
+                for *texts, song_id in zip(*self.texts, self.ids.tolist())]
+        if self.position_column is not None:
+            for pos, row in enumerate(rows):
+                row["pos"] = str(first + pos)
+        return rows
+
+
+class PagedQueueStore:
+    """
+    File de lecture lue par fenêtres : seule la longueur est connue d'avance, les lignes arrivent par pages
+    de `page_rows` (chacune rangée dans un QueueStore). Les pages sont gardées dans un cache LRU
+    d'au plus `max_rows` lignes ; une page évincée ou invalidée sera simplement redemandée.
+    """
+
+    def __init__(self, headers, length=0, page_rows=500, max_rows=100000):
+        self.headers = headers
+        self.length = length
+        self.page_rows = max(1, page_rows)
+        self.max_pages = max(2, max_rows // self.page_rows)
+        self.formatter = QueueStore(headers)  # Formatage des lignes (et chaînes de durée partagées)
+        self.pages = OrderedDict()  # Indice de page -> QueueStore, du moins au plus récemment utilisé
+        self.requests = {}  # Indice de page -> jeton de la demande en cours ou servie
+        self._tokens = 0
+        self.tally = None  # Histogramme partagé par les pages en cache (voir QueueStore.track_texts)
+
+    def track_texts(self, tally):
+        self.tally = tally
+        for page in self.pages.values():
+            page.track_texts(tally)
+
+    def _forget(self, page):
+        if page is not None and self.tally is not None:
+            page.truncate(0)  # Retire ses textes de l'histogramme partagé
+
+    def text(self, row, column):
+        """Texte d'une cellule, ou None si sa page n'est pas (encore) chargée."""
+        page_index = row // self.page_rows
+        page = self.pages.get(page_index)
+        if page is None:
+            return None
+        self.pages.move_to_end(page_index)  # Page affichée : la plus récemment utilisée
+        offset = row % self.page_rows
+        return page.texts[column][offset] if offset < len(page) else None
+
+    def page_range(self, page_index):
+        start = page_index * self.page_rows
+        return start, min(self.length, start + self.page_rows)
+
+    def request(self, page_index):
+        """Jeton d'une nouvelle demande de page, ou None si elle est déjà demandée ou hors de la file."""
+        if page_index in self.requests or page_index * self.page_rows >= self.length:
+            return None
+        self._tokens += 1
+        self.requests[page_index] = self._tokens
+        return self._tokens
+
+    def begin(self, page_index, token):
+        """Page vide prête à être remplie, ou None si la réponse est périmée (page invalidée entre-temps)."""
+        if self.requests.get(page_index) != token:
+            return None
+        self._forget(self.pages.get(page_index))
+        page = self.pages[page_index] = QueueStore(self.headers)
+        if self.tally is not None:
+            page.track_texts(self.tally)
+        while len(self.pages) > self.max_pages:
+            evicted, evicted_page = self.pages.popitem(last=False)
+            self.requests.pop(evicted, None)
+            self._forget(evicted_page)
+        return page
+
+    def is_current(self, page_index, page):
+        return self.pages.get(page_index) is page
+
+    def invalidate(self, rows):
+        """Oublie les pages contenant `rows` ; retourne les indices des pages qui étaient chargées ou demandées."""
+        dropped = []
+        for page_index in sorted({row // self.page_rows for row in rows}):
+            if page_index in self.requests or page_index in self.pages:
+                self.requests.pop(page_index, None)
+                self._forget(self.pages.pop(page_index, None))
+                dropped.append(page_index)
+        return dropped
+
+    def resize(self, length):
+        """Nouvelle longueur : les pages au-delà sont oubliées, la dernière page est raccourcie."""
+        if length < self.length:
+            last = length // self.page_rows
+            self.invalidate([page_index * self.page_rows for page_index in list(self.requests) + list(self.pages)
+                             if page_index > last])
+            page = self.pages.get(last)
+            if page is not None and len(page) > length % self.page_rows:
+                page.truncate(length % self.page_rows)
+        elif self.length % self.page_rows:
+            # La dernière page incomplète recevra de nouvelles lignes : elle sera redemandée
+            self.invalidate([self.length - 1])
+        self.length = length
+
+    def clear(self, length):
+        for page in self.pages.values():
+            self._forget(page)
+        self.pages.clear()
+        self.requests.clear()
+        self.length = length
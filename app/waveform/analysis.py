@@ -0,0 +1,459 @@
+# app/waveform/analysis.py
+"""
+Analyse audio en une seule passe : un seul flux décodé, partagé par plusieurs analyseurs.
+
+Chaque analyseur enregistré (`register_analyzer`) indique la fréquence et le nombre de voies dont il a besoin ;
+le flux est décodé une fois, au plus exigeant, et chaque bloc est transmis à tous les analyseurs.
+Les résultats sont rangés avec la pyramide (`WaveformPyramid.analysis`) et écrits ensemble dans le cache.
+
+Analyseurs disponibles (clé `waveform.analyzers` de la configuration) :
+    envelope  crêtes minimum / maximum et RMS (accumulation float64) : la forme d'onde, toujours calculée
+    loudness  intensité intégrée EBU R128 (LUFS) et crête vraie (dBTP) ; filtres scipy (requirements.txt)
+    onsets    force des attaques (flux spectral), pour repérer les temps forts
+    spectrogram  spectrogramme log-magnitude uint8, affichable à la place des barres (`waveform.view`)
+"""
+import abc
+import time
+
+import numpy as np
+
+from app.utils.config_loader import config_instance
+from app.waveform.decoder import EnvelopeAccumulator, probe_audio, stream_pcm, DECODE_RATE, FULL_SCALE
+from app.waveform.pcm_file import open_pcm_file
+from app.waveform.pyramid import WaveformPyramid, BASE_POINTS
+
+try:
+    from scipy import signal
+except ImportError:
+    signal = None
+
+ANALYZERS = {}  # nom -> classe d'analyseur
+
+# Détection des attaques (voir onset_times)
+ONSET_FLOOR = 0.1  # Hausse minimale du flux moyen par point de spectre au-dessus de sa médiane (log-magnitude)
+ONSET_MIN_GAP = 0.1  # Secondes au moins entre deux attaques
+ONSET_SPAN = 0.5  # Secondes de la médiane glissante
+
+
+def register_analyzer(cls):
+    """Décorateur : rend un analyseur utilisable par son nom dans la configuration."""
+    ANALYZERS[cls.name] = cls
+    return cls
+
+
+class Analyzer(abc.ABC):
+    """
+    Analyseur d'un flux décodé. `start()` est appelé une fois la fréquence connue,
+    puis `add()` pour chaque bloc et enfin `result()`, qui retourne les tableaux à mettre en cache.
+    """
+    name = None
+    sample_rate = DECODE_RATE  # Fréquence minimale nécessaire
+    channels = 1  # Voies nécessaires (1 : mono suffit)
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def start(self, sample_rate, channels):
+        self.rate = sample_rate
+        self.decoded_channels = channels
+
+    @abc.abstractmethod
+    def add(self, mono, frames):
+        """`mono` : float32 (trames,) ; `frames` : float32 (trames, voies), tous deux en -1..1."""
+
+    def result(self):
+        return {}
+
+
+@register_analyzer
+class EnvelopeAnalyzer(Analyzer):
+    """Crêtes et RMS par point (la forme d'onde affichée)."""
+    name = "envelope"
+
+    def __init__(self, points=BASE_POINTS, sample_rate=DECODE_RATE):
+        self.points = points
+        self.sample_rate = sample_rate
+        self.accumulator = EnvelopeAccumulator(points)
+
+    def add(self, mono, frames):
+        self.accumulator.add(mono, 1.0)
+
+    def envelope(self, points=None):
+        """(rms, minimum, maximum) ; voir EnvelopeAccumulator.finish."""
+        return self.accumulator.finish(points)
+
+    def result(self):
+        return {}  # Rangée dans la pyramide elle-même
+
+
+@register_analyzer
+class LoudnessAnalyzer(Analyzer):
+    """
+    Intensité intégrée EBU R128 (ITU-R BS.1770-4) : pondération K, blocs de 400 ms avec 75 % de recouvrement,
+    porte absolue à -70 LUFS puis porte relative à -10 LU. Crête vraie : signal suréchantillonné x4.
+    """
+    name = "loudness"
+    sample_rate = 48000
+    channels = 2
+    STEP = 0.1  # Pas des blocs de mesure (secondes) : un bloc de 400 ms = 4 pas
+    TRUE_PEAK_CONTEXT = 32  # Trames gardées d'un bloc à l'autre pour le suréchantillonnage
+
+    @classmethod
+    def available(cls):
+        return signal is not None
+
+    def start(self, sample_rate, channels):
+        super().start(sample_rate, channels)
+        self.sos = np.vstack([_high_shelf(4.0, 1 / np.sqrt(2), 1500.0, sample_rate),
+                              _high_pass(0.5, 38.0, sample_rate)])
+        self.zi = np.zeros((len(self.sos), 2, channels))
+        self.step = max(1, int(round(sample_rate * self.STEP)))
+        self.energies = []  # Somme des carrés pondérés K par pas et par voie
+        self.tail = np.zeros((0, channels))
+        self.context = np.zeros((self.TRUE_PEAK_CONTEXT // 2, channels), dtype=np.float32)  # Silence avant le début
+        self.true_peak = 0.0
+
+    def add(self, mono, frames):
+        weighted, self.zi = signal.sosfilt(self.sos, frames, axis=0, zi=self.zi)
+        squares = np.concatenate((self.tail, np.square(weighted, dtype=np.float64)))
+        full = len(squares) // self.step * self.step
+        if full:
+            self.energies.append(squares[:full].reshape(-1, self.step, self.decoded_channels).sum(axis=1))
+        self.tail = squares[full:]
+
+        # Le début et la fin de chaque bloc suréchantillonné sont faussés par les bords :
+        # seule la partie centrale compte, le reste est repris avec le bloc suivant
+        samples = np.concatenate((self.context, frames))
+        margin = self.TRUE_PEAK_CONTEXT // 2
+        if len(samples) > 2 * margin:
+            upsampled = signal.resample_poly(samples, 4, 1, axis=0)
+            self.true_peak = max(self.true_peak, float(np.abs(upsampled[4 * margin:-4 * margin]).max()))
+        self.context = samples[-self.TRUE_PEAK_CONTEXT:]
+
+    def result(self):
+        if len(self.context):
+            self.true_peak = max(self.true_peak, float(np.abs(self.context).max()))
+        integrated = -70.0
+        if self.energies:
+            energies = np.concatenate(self.energies)
+            if len(energies) >= 4:
+                # Blocs de 400 ms (4 pas consécutifs), moyenne quadratique par voie, somme des voies (poids 1)
+                windows = np.lib.stride_tricks.sliding_window_view(energies, 4, axis=0).sum(axis=2)
+                power = (windows / (4 * self.step)).sum(axis=1)
+                loudness = -0.691 + 10 * np.log10(np.maximum(power, 1e-20))
+                gated = power[loudness > -70.0]
+                if len(gated):
+                    relative = -0.691 + 10 * np.log10(gated.mean()) - 10.0
+                    gated = power[(loudness > -70.0) & (loudness > relative)]
+                    integrated = -0.691 + 10 * np.log10(gated.mean())
+        true_peak = 20 * np.log10(max(self.true_peak, 1e-10))
+        return {"loudness": np.array([integrated, true_peak], dtype=np.float32)}
+
+
+def _high_shelf(gain, q, frequency, rate):
+    """Biquad (forme sos) du filtre en plateau de la pondération K, recalculé pour `rate`."""
+    a = 10 ** (gain / 40)
+    w0 = 2 * np.pi * frequency / rate
+    alpha = np.sin(w0) / (2 * q)
+    cos = np.cos(w0)
+    b = [a * ((a + 1) + (a - 1) * cos + 2 * np.sqrt(a) * alpha),
+         -2 * a * ((a - 1) + (a + 1) * cos),
+         a * ((a + 1) + (a - 1) * cos - 2 * np.sqrt(a) * alpha)]
+    den = [(a + 1) - (a - 1) * cos + 2 * np.sqrt(a) * alpha,
+           2 * ((a - 1) - (a + 1) * cos),
+           (a + 1) - (a - 1) * cos - 2 * np.sqrt(a) * alpha]
+    return np.array(b + den) / den[0]
+
+
+def _high_pass(q, frequency, rate):
+    """Biquad (forme sos) du passe-haut de la pondération K."""
+    w0 = 2 * np.pi * frequency / rate
+    alpha = np.sin(w0) / (2 * q)
+    cos = np.cos(w0)
+    b = [(1 + cos) / 2, -(1 + cos), (1 + cos) / 2]
+    den = [1 + alpha, -2 * cos, 1 - alpha]
+    return np.array(b + den) / den[0]
+
+
+@register_analyzer
+class OnsetAnalyzer(Analyzer):
+    """Force des attaques : flux spectral positif (log-magnitude) sur des trames d'environ 64 ms."""
+    name = "onsets"
+    WINDOW_SECONDS = 0.064
+
+    def start(self, sample_rate, channels):
+        super().start(sample_rate, channels)
+        self.window = 1 << int(round(np.log2(sample_rate * self.WINDOW_SECONDS)))
+        self.hop = self.window // 2
+        self.hann = np.hanning(self.window).astype(np.float32)
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.previous = None  # Spectre de la dernière trame
+        self.strength = []
+
+    def add(self, mono, frames):
+        buffer = np.concatenate((self.buffer, mono))
+        count = (len(buffer) - self.window) // self.hop + 1 if len(buffer) >= self.window else 0
+        if count:
+            windows = np.lib.stride_tricks.sliding_window_view(buffer, self.window)[::self.hop][:count]
+            spectrum = np.log1p(100.0 * np.abs(np.fft.rfft(windows * self.hann, axis=1)))
+            previous = spectrum[:1] if self.previous is None else self.previous[None, :]
+            flux = np.maximum(np.diff(spectrum, axis=0, prepend=previous), 0.0).sum(axis=1)
+            self.strength.append(flux.astype(np.float32))
+            self.previous = spectrum[-1]
+        self.buffer = buffer[count * self.hop:]
+
+    def result(self):
+        strength = np.concatenate(self.strength) if self.strength else np.zeros(0, dtype=np.float32)
+        scale = float(strength.max()) if len(strength) else 0.0
+        quantized = np.rint(strength / (scale or 1.0) * 255.0).astype(np.uint8)
+        # Échelle absolue et nombre de points du spectre gardés : les seuils de `onset_times` ne dépendent pas
+        # du morceau (un son tenu n'a que des variations minimes, que la normalisation grossirait)
+        return {"onsets": quantized,
+                "onsets_info": np.array([scale, self.rate / self.hop, self.window // 2 + 1], dtype=np.float32)}
+
+
+@register_analyzer
+class SpectrogramAnalyzer(Analyzer):
+    """
+    Spectrogramme du morceau : TFCT par lots (toutes les trames d'un bloc décodé en une FFT), puissance regroupée
+    en `ROWS` bandes logarithmiques. Les colonnes sont moyennées par deux dès qu'elles dépassent `COLUMNS` :
+    mémoire constante quelle que soit la durée, et au plus COLUMNS x ROWS octets dans le cache (64 Kio, de l'ordre
+    de la largeur du widget en pixels). Résultat en log-magnitude quantifiée en uint8 (FLOOR_DB..0 dBFS).
+    """
+    name = "spectrogram"
+    sample_rate = 22050
+    WINDOW = 1024  # Échantillons par trame (46 ms à 22 050 Hz)
+    ROWS = 64  # Bandes de fréquence
+    COLUMNS = 1024  # Colonnes gardées au plus (et au moins la moitié dès que le morceau est assez long)
+    MIN_FREQUENCY = 40.0
+    FLOOR_DB = -90.0
+
+    def start(self, sample_rate, channels):
+        super().start(sample_rate, channels)
+        self.hop = self.WINDOW // 2
+        self.hann = np.hanning(self.WINDOW).astype(np.float32)
+        # Un sinus pleine échelle donne 0 dB dans sa bande
+        self.reference = (self.hann.sum() / 2.0) ** 2
+        frequencies = np.fft.rfftfreq(self.WINDOW, 1.0 / sample_rate)
+        self.max_frequency = sample_rate / 2
+        edges = np.searchsorted(frequencies, np.geomspace(self.MIN_FREQUENCY, self.max_frequency, self.ROWS + 1))
+        self.band_starts = np.minimum(edges[:-1], len(frequencies) - 1)
+        self.band_stops = np.maximum(edges[1:], self.band_starts + 1)  # Au moins un point par bande
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.group = 1  # Trames TFCT moyennées par colonne (double à chaque regroupement)
+        self.pending = np.zeros((0, self.ROWS), dtype=np.float32)  # Trames pas encore regroupées
+        self.columns = []  # Colonnes de puissance (tableaux (n, ROWS))
+        self.column_count = 0
+
+    def add(self, mono, frames):
+        buffer = np.concatenate((self.buffer, mono))
+        count = (len(buffer) - self.WINDOW) // self.hop + 1 if len(buffer) >= self.WINDOW else 0
+        if count:
+            windows = np.lib.stride_tricks.sliding_window_view(buffer, self.WINDOW)[::self.hop][:count]
+            spectrum = np.fft.rfft(windows * self.hann, axis=1)
+            power = spectrum.real ** 2 + spectrum.imag ** 2
+            cumulative = np.concatenate((np.zeros((count, 1)), np.cumsum(power, axis=1)), axis=1)
+            bands = (cumulative[:, self.band_stops] - cumulative[:, self.band_starts]) / \
+                (self.band_stops - self.band_starts)
+            self._append(bands.astype(np.float32))
+        self.buffer = buffer[count * self.hop:]
+
+    def _append(self, bands):
+        bands = np.concatenate((self.pending, bands))
+        full = len(bands) // self.group * self.group
+        if full:
+            self.columns.append(bands[:full].reshape(-1, self.group, self.ROWS).mean(axis=1))
+            self.column_count += full // self.group
+        self.pending = bands[full:]
+        if self.column_count > self.COLUMNS:
+            # Regroupement par deux : la résolution temporelle s'adapte à la durée, au fil du décodage
+            columns = np.concatenate(self.columns)
+            even = len(columns) // 2 * 2
+            self.pending = np.concatenate((columns[even:].repeat(self.group, axis=0), self.pending))
+            self.columns = [columns[:even].reshape(-1, 2, self.ROWS).mean(axis=1)]
+            self.column_count = even // 2
+            self.group *= 2
+
+    def result(self):
+        columns = self.columns + ([self.pending.mean(axis=0, keepdims=True)] if len(self.pending) else [])
+        if not columns:
+            return {}
+        power = np.concatenate(columns)
+        db = 10.0 * np.log10(power / self.reference + 1e-12)
+        quantized = np.rint(np.clip(1.0 - db / self.FLOOR_DB, 0.0, 1.0) * 255.0).astype(np.uint8)
+        columns_per_second = self.rate / (self.hop * self.group)
+        return {"spectrogram": quantized,
+                "spectrogram_info": np.array([columns_per_second, self.MIN_FREQUENCY, self.max_frequency],
+                                             dtype=np.float32)}
+
+
+def create_analyzers(names=None, points=BASE_POINTS):
+    """
+    Analyseurs demandés (par défaut : clé `waveform.analyzers`) ; l'enveloppe est toujours le premier.
+    Les analyseurs inconnus ou indisponibles sont ignorés avec un message.
+    """
+    if names is None:
+        settings = config_instance.data.get("waveform", {}) or {}
+        names = settings.get("analyzers") or ["envelope"]
+    analyzers = [EnvelopeAnalyzer(points)]
+    for name in names:
+        cls = ANALYZERS.get(name)
+        if cls is None:
+            print(f"Analyseur inconnu : {name}")
+        elif cls is EnvelopeAnalyzer:
+            continue
+        elif not cls.available():
+            print(f"Analyseur {name} indisponible (scipy n'est pas installé)")
+        else:
+            analyzers.append(cls())
+    return analyzers
+
+
+def analyze(audio_file, analyzers, should_stop=None, on_progress=None, duration=None, progress_interval=0.25):
+    """
+    Décode `audio_file` une seule fois et transmet chaque bloc à tous les `analyzers`.
+    Les fichiers PCM non compressés (WAV, AIFF, W64) sont lus directement par memmap, sans ffmpeg.
+    `on_progress(fraction)` est appelé au plus toutes les `progress_interval` secondes quand la longueur est connue
+    (`duration` en secondes, ou en-tête PCM). Retourne False si le décodage a été interrompu, True sinon.
+    """
+    sample_rate = max(analyzer.sample_rate for analyzer in analyzers)
+    channels = max(analyzer.channels for analyzer in analyzers)
+    pcm = open_pcm_file(audio_file)
+    if pcm is not None:
+        # Une trame sur `stride` : même densité d'échantillons que le décodage ffmpeg
+        stride = max(1, pcm.sample_rate // sample_rate)
+        sample_rate = pcm.sample_rate / stride
+        channels = 1 if channels == 1 else pcm.channels
+        chunks = pcm.chunks(stride, should_stop=should_stop, mono=channels == 1)
+        total_samples = pcm.sample_count(stride)
+    else:
+        if channels > 1:
+            channels = min(channels, probe_audio(audio_file)[2])  # Pas de voies dupliquées pour une source mono
+        chunks = stream_pcm(audio_file, sample_rate, should_stop=should_stop, channels=channels)
+        total_samples = duration * sample_rate if duration else None
+
+    for analyzer in analyzers:
+        analyzer.start(sample_rate, channels)
+    decoded = 0
+    last_progress = time.monotonic()
+    for chunk in chunks:
+        if chunk.dtype == np.int16:
+            chunk = chunk.astype(np.float32) * (1.0 / FULL_SCALE)
+        if chunk.ndim == 1:
+            mono, frames = chunk, chunk[:, None]
+        else:
+            frames, mono = chunk, chunk[:, 0].copy()
+            for channel in range(1, channels):
+                mono += chunk[:, channel]
+            mono *= 1.0 / channels
+        for analyzer in analyzers:
+            analyzer.add(mono, frames)
+        decoded += len(mono)
+        if on_progress is not None and total_samples and time.monotonic() - last_progress >= progress_interval:
+            on_progress(min(1.0, decoded / total_samples))
+            last_progress = time.monotonic()
+    return not (should_stop is not None and should_stop())
+
+
+def decode_envelope(audio_file, points=1024, sample_rate=DECODE_RATE, should_stop=None,
+                    on_progress=None, duration=None, progress_interval=0.25):
+    """
+    Calcule l'enveloppe d'un fichier audio en flux : mémoire constante quelle que soit la durée.
+    Retourne (rms, minimum, maximum) sur `points` valeurs en pleine échelle, ou None si le décodage a été interrompu.
+    Si `on_progress` est fourni et que la longueur est connue, `on_progress((rms, minimum, maximum), fraction)`
+    reçoit au plus toutes les `progress_interval` secondes l'enveloppe de la partie déjà lue.
+    """
+    analysis = analyze_track(audio_file, points, [EnvelopeAnalyzer(points, sample_rate)], should_stop,
+                             on_progress, duration, progress_interval)
+    return None if analysis is None else analysis[0]
+
+
+def analyze_track(audio_file, points=BASE_POINTS, analyzers=None, should_stop=None, on_progress=None,
+                  duration=None, progress_interval=0.25):
+    """
+    Analyse complète d'un morceau en une passe : ((rms, minimum, maximum), {type: tableau}) ;
+    None si le décodage a été interrompu. `analyzers` : voir `create_analyzers` (le premier est l'enveloppe).
+    `on_progress((rms, minimum, maximum), fraction)` : comme pour `decode_envelope`.
+    """
+    analyzers = analyzers or create_analyzers(points=points)
+    envelope = analyzers[0]
+
+    def progress(fraction):
+        # Résolution proportionnelle à la partie décodée : densité identique au résultat final
+        on_progress(envelope.envelope(max(1, int(points * fraction))), fraction)
+
+    if not analyze(audio_file, analyzers, should_stop, progress if on_progress else None, duration,
+                   progress_interval):
+        return None
+    results = {}
+    for analyzer in analyzers:
+        results.update(analyzer.result())
+    return envelope.envelope(), results
+
+
+def analysis_pyramid(analysis, points=BASE_POINTS):
+    """WaveformPyramid d'un résultat de `analyze_track` (enveloppe plate si le morceau est vide)."""
+    (rms, minimum, maximum), results = analysis
+    if len(rms) == 0:
+        rms = minimum = maximum = np.zeros(points, dtype=np.float32)
+    return WaveformPyramid(minimum, maximum, rms, results)
+
+
+def loudness(pyramid):
+    """(intensité intégrée en LUFS, crête vraie en dBTP), ou None si elle n'a pas été mesurée."""
+    values = pyramid.analysis.get("loudness") if pyramid is not None else None
+    return None if values is None else (float(values[0]), float(values[1]))
+
+
+def onset_strength(pyramid):
+    """(force des attaques 0..1 par trame, trames par seconde), ou None si elle n'a pas été calculée."""
+    if pyramid is None or pyramid.analysis.get("onsets") is None or pyramid.analysis.get("onsets_info") is None:
+        return None
+    return pyramid.analysis["onsets"].astype(np.float32) / 255.0, float(pyramid.analysis["onsets_info"][1])
+
+
+def onset_times(pyramid, floor=ONSET_FLOOR, min_gap=ONSET_MIN_GAP, span=ONSET_SPAN):
+    """
+    Instants (secondes) des attaques : maxima locaux du flux spectral moyen par point de spectre qui dépassent
+    d'au moins `floor` sa médiane glissante sur `span` secondes, espacés d'au moins `min_gap` secondes.
+    None si les attaques n'ont pas été calculées (ou l'ont été sans leur échelle absolue).
+    """
+    info = pyramid.analysis.get("onsets_info") if pyramid is not None else None
+    onsets = onset_strength(pyramid)
+    if onsets is None or len(info) < 3:
+        return None
+    strength, rate = onsets
+    strength = strength * (float(info[0]) / float(info[2]))
+    if len(strength) < 3:
+        return np.zeros(0, dtype=np.float32)
+    width = max(3, int(rate * span) | 1)
+    padded = np.pad(strength, width // 2, mode="edge")
+    novelty = strength - np.median(np.lib.stride_tricks.sliding_window_view(padded, width), axis=1)
+    peaks = np.flatnonzero((novelty[1:-1] > novelty[:-2]) & (novelty[1:-1] >= novelty[2:]) &
+                           (novelty[1:-1] > floor)) + 1
+    gap = max(1, int(round(min_gap * rate)))
+    kept = []
+    for peak in peaks.tolist():
+        if not kept or peak - kept[-1] >= gap:
+            kept.append(peak)
+    return np.array(kept, dtype=np.float32) / rate
+
+
+def spectrogram(pyramid):
+    """Spectrogramme uint8 (colonnes, bandes des graves aux aigus) couvrant tout le morceau, ou None."""
+    values = pyramid.analysis.get("spectrogram") if pyramid is not None else None
+    return None if values is None or values.ndim != 2 or len(values) == 0 else values
+
+
+def describe_analysis(pyramid):
+    """Résumé des analyses d'un morceau, pour une infobulle (chaîne vide si aucune)."""
+    lines = []
+    measured = loudness(pyramid)
+    if measured is not None:
+        lines.append(f"Intensité intégrée : {measured[0]:.1f} LUFS, crête vraie : {measured[1]:.1f} dBTP")
+    onsets = onset_strength(pyramid)
+    times = onset_times(pyramid)
+    if times is not None and len(onsets[0]):
+        lines.append(f"Attaques : {int(len(times) / (len(onsets[0]) / onsets[1]) * 60)} par minute")
+    return "\n".join(lines)
@@ -0,0 +1,67 @@
+# app/waveform/cache.py
+from collections import OrderedDict
+
+from app.waveform.pyramid import WaveformPyramid
+from app.waveform.store import get_waveform_store
+
+
+class PrewarmCache:
+    """
+    Caches mémoire des morceaux à venir : pyramides de formes d'onde, métadonnées (infos formatées,
+    chemin local, clé de cache) et pochettes. Chaque cache est un LRU de petite taille.
+    """
+
+    def __init__(self, max_pyramids=8, max_tracks=64, max_art=8):
+        self.pyramids = OrderedDict()  # clé de fichier -> WaveformPyramid
+        self.tracks = OrderedDict()  # id MPD -> {"info", "full_path", "cache_key"}
+        self.art = OrderedDict()  # chemin MPD -> octets de l'image (None si pas de pochette)
+        self.limits = {id(self.pyramids): max_pyramids, id(self.tracks): max_tracks, id(self.art): max_art}
+
+    def _remember(self, cache, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.limits[id(cache)]:
+            cache.popitem(last=False)
+
+    def pyramid(self, cache_key):
+        """Pyramide d'un fichier : mémoire, sinon cache disque (None si jamais calculée)."""
+        if cache_key is None:
+            return None
+        pyramid = self.pyramids.get(cache_key)
+        if pyramid is None:
+            pyramid = WaveformPyramid.from_arrays(get_waveform_store().get_all(cache_key))
+            if pyramid is None:
+                return None
+        self._remember(self.pyramids, cache_key, pyramid)
+        return pyramid
+
+    def has_pyramid(self, cache_key):
+        return cache_key in self.pyramids or get_waveform_store().contains(cache_key, "rms")
+
+    def remember_pyramid(self, cache_key, pyramid):
+        """Garde la pyramide en mémoire et l'écrit dans le cache disque (dans le thread d'écriture du cache)."""
+        self._remember(self.pyramids, cache_key, pyramid)
+        get_waveform_store().put_all_async(cache_key, pyramid.to_arrays())
+
+    def track(self, song_id):
+        return self.tracks.get(song_id)
+
+    def remember_track(self, song_id, track):
+        self._remember(self.tracks, song_id, track)
+
+    def cover(self, file_path):
+        return self.art.get(file_path)
+
+    def remember_cover(self, file_path, data):
+        self._remember(self.art, file_path, data)
+
+
+_cache_instance = None
+
+
+def get_prewarm_cache():
+    """Instance partagée des caches de préchargement."""
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = PrewarmCache()
+    return _cache_instance
@@ -0,0 +1,248 @@
+# app/waveform/decoder.py
+import re
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.utils.config_loader import config_instance
+from app.waveform.pcm_file import open_pcm_file
+
+DECODE_RATE = 8000  # Fréquence de décodage (mono) : largement suffisante pour une enveloppe
+CHUNK_FRAMES = 65536  # Échantillons lus par bloc dans le tube (128 Ko en s16le)
+FULL_SCALE = 32768.0
+QUICK_LOOK_WINDOWS = 32  # Passages décodés par l'aperçu rapide
+QUICK_LOOK_WINDOW = 0.2  # Durée de chaque passage (secondes)
+QUICK_LOOK_PROCESSES = 8  # Décodages ffmpeg simultanés de l'aperçu
+
+
+def ffmpeg_executable():
+    """Chemin de ffmpeg (clé `waveform.ffmpeg` de la configuration, sinon celui du PATH)."""
+    settings = config_instance.data.get("waveform", {}) or {}
+    executable = settings.get("ffmpeg") or shutil.which("ffmpeg")
+    if not executable:
+        raise RuntimeError("ffmpeg est introuvable : impossible de décoder le fichier audio")
+    return executable
+
+
+def probe_audio(audio_file):
+    """
+    (fréquence d'échantillonnage, durée en secondes, nombre de voies, horodatage de départ en secondes)
+    du premier flux audio, d'après `ffmpeg -i`. Durée None quand le conteneur ne l'indique pas (« Duration: N/A »).
+    """
+    result = subprocess.run([ffmpeg_executable(), "-nostdin", "-hide_banner", "-i", audio_file],
+                            stdin=subprocess.DEVNULL, capture_output=True)
+    info = result.stderr.decode(errors="replace")
+    duration = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", info)
+    start = re.search(r"Duration: [^,]*, start: (-?\d+(?:\.\d+)?)", info)
+    stream = re.search(r"Stream #\S+.*?: Audio: .*?(\d+) Hz, ([^,]+)", info)
+    if stream is None:
+        raise RuntimeError(f"ffmpeg ne trouve pas de flux audio dans {audio_file}")
+    if duration is not None:
+        hours, minutes, seconds = duration.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    layout = stream.group(2).strip()
+    channels = {"mono": 1, "stereo": 2}.get(layout)
+    if channels is None:
+        count = re.match(r"(\d+) channels", layout)
+        channels = int(count.group(1)) if count else 2  # Disposition multicanal nommée (5.1, 7.1...)
+    return int(stream.group(1)), duration, channels, float(start.group(1)) if start else 0.0
+
+
+def stream_pcm(audio_file, sample_rate=DECODE_RATE, chunk_frames=CHUNK_FRAMES, should_stop=None, channels=1):
+    """
+    Décode `audio_file` en PCM 16 bits à `sample_rate` Hz et le produit bloc par bloc
+    (int16, forme (trames,) en mono, (trames, canaux) sinon).
+    Le décodage et le rééchantillonnage sont faits par ffmpeg ; seul un bloc est en mémoire à la fois.
+    `should_stop` (optionnel) est appelé entre deux blocs pour interrompre le décodage.
+    """
+    command = [ffmpeg_executable(), "-nostdin", "-v", "error", "-i", audio_file,
+               "-map", "0:a:0", "-ac", str(channels), "-ar", str(sample_rate), "-f", "s16le", "-"]
+    return pipe_pcm(command, audio_file, chunk_frames, should_stop, channels)
+
+
+def pipe_pcm(command, audio_file, chunk_frames=CHUNK_FRAMES, should_stop=None, channels=1):
+    """Lance `command` (ffmpeg écrivant du s16le sur sa sortie) et produit sa sortie bloc par bloc (int16)."""
+    process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+    frame_bytes = 2 * channels
+    try:
+        while True:
+            if should_stop is not None and should_stop():
+                return
+            data = process.stdout.read(chunk_frames * frame_bytes)
+            if not data:
+                break
+            samples = np.frombuffer(data[:len(data) // frame_bytes * frame_bytes], dtype="<i2")
+            yield samples if channels == 1 else samples.reshape(-1, channels)
+        if process.wait() != 0:
+            error = process.stderr.read().decode(errors="replace").strip()
+            raise RuntimeError(f"ffmpeg n'a pas pu décoder {audio_file} : {error}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def decode_window(audio_file, start, length, sample_rate=DECODE_RATE):
+    """
+    Décode `length` secondes à partir de `start` en mono float32 (-1..1).
+    `-ss` placé avant `-i` : ffmpeg se positionne dans le fichier et ne décode que ce passage.
+    """
+    command = [ffmpeg_executable(), "-nostdin", "-v", "error", "-ss", f"{start:.3f}", "-t", f"{length:.3f}",
+               "-i", audio_file, "-map", "0:a:0", "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "-"]
+    result = subprocess.run(command, stdin=subprocess.DEVNULL, capture_output=True)
+    if result.returncode != 0:
+        error = result.stderr.decode(errors="replace").strip()
+        raise RuntimeError(f"ffmpeg n'a pas pu décoder {audio_file} à {start:.1f} s : {error}")
+    data = result.stdout[:len(result.stdout) // 2 * 2]
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / FULL_SCALE
+
+
+def sparse_envelope(audio_file, duration=None, windows=QUICK_LOOK_WINDOWS, window=QUICK_LOOK_WINDOW,
+                    sample_rate=DECODE_RATE, should_stop=None):
+    """
+    Aperçu rapide d'un long fichier : `windows` passages de `window` secondes régulièrement espacés
+    sont décodés (en parallèle) et donnent chacun un point (rms, minimum, maximum).
+    Le coût ne dépend pas de la durée du morceau. Retourne None si la durée est inconnue ou si l'aperçu est interrompu.
+    """
+    pcm = open_pcm_file(audio_file)
+    if pcm is not None:
+        duration = pcm.duration()
+    if not duration or windows <= 0:
+        return None
+    window = min(window, duration / windows)
+    starts = np.maximum(0.0, (np.arange(windows) + 0.5) * duration / windows - window / 2)
+
+    def reduce(start):
+        if should_stop is not None and should_stop():
+            return None
+        if pcm is not None:
+            stride = max(1, pcm.sample_rate // sample_rate)
+            samples = pcm.mono(int(start * pcm.sample_rate), int(window * pcm.sample_rate), stride)
+        else:
+            samples = decode_window(audio_file, start, window, sample_rate)
+        if len(samples) == 0:
+            return 0.0, 0.0, 0.0
+        return float(np.sqrt(np.dot(samples, samples) / len(samples))), float(samples.min()), float(samples.max())
+
+    with ThreadPoolExecutor(min(windows, QUICK_LOOK_PROCESSES)) as pool:
+        results = list(pool.map(reduce, starts))
+    if should_stop is not None and should_stop() or any(result is None for result in results):
+        return None
+    rms, minimum, maximum = (np.array(values, dtype=np.float32) for values in zip(*results))
+    return rms, minimum, maximum
+
+
+class EnvelopeAccumulator:
+    """
+    Réduit un flux d'échantillons en blocs (somme des carrés, minimum, maximum, nombre d'échantillons).
+    Quand le nombre de blocs dépasse `max_blocks`, les blocs sont fusionnés deux à deux et leur taille double :
+    la mémoire reste bornée quelle que soit la durée du morceau, sans connaître cette durée à l'avance.
+    """
+
+    def __init__(self, points=1024, hop=64, oversampling=8):
+        self.points = points
+        self.hop = hop
+        self.max_blocks = points * oversampling
+        self.sum_sq = np.zeros(0, dtype=np.float64)
+        self.minimum = np.zeros(0, dtype=np.float64)
+        self.maximum = np.zeros(0, dtype=np.float64)
+        # Bloc incomplet en fin de flux (échantillons qui suivent le dernier bloc complet)
+        self._reset_pending()
+        self.samples = 0
+
+    def add(self, chunk, full_scale=FULL_SCALE):
+        """Ajoute un bloc d'échantillons (entiers 16 bits, ou flottants avec `full_scale=1.0`)."""
+        samples = np.asarray(chunk, dtype=np.float64)
+        if full_scale != 1.0:
+            samples = samples / full_scale
+        self.samples += len(samples)
+        if self.pending_count:
+            head = samples[:self.hop - self.pending_count]
+            samples = samples[len(head):]
+            self._add_pending(head)
+            if self.pending_count < self.hop:
+                return
+            self._append(np.array([self.pending_sum]), np.array([self.pending_min]), np.array([self.pending_max]))
+            self._reset_pending()
+
+        full = len(samples) // self.hop * self.hop
+        if full:
+            blocks = samples[:full].reshape(-1, self.hop)
+            self._append(np.einsum("ij,ij->i", blocks, blocks), blocks.min(axis=1), blocks.max(axis=1))
+        self._add_pending(samples[full:])
+
+        while len(self.sum_sq) > self.max_blocks:
+            self._merge()
+
+    def _reset_pending(self):
+        # Extrêmes neutres : un bloc positif (ou négatif) garde son vrai minimum (ou maximum).
+        # Ils ne sont lus que si `pending_count` est non nul.
+        self.pending_sum = 0.0
+        self.pending_min = np.inf
+        self.pending_max = -np.inf
+        self.pending_count = 0
+
+    def _add_pending(self, samples):
+        if len(samples):
+            self.pending_sum += float(np.dot(samples, samples))
+            self.pending_min = min(self.pending_min, float(samples.min()))
+            self.pending_max = max(self.pending_max, float(samples.max()))
+            self.pending_count += len(samples)
+
+    def _append(self, sum_sq, minimum, maximum):
+        self.sum_sq = np.concatenate((self.sum_sq, sum_sq))
+        self.minimum = np.concatenate((self.minimum, minimum))
+        self.maximum = np.concatenate((self.maximum, maximum))
+
+    def _merge(self):
+        """Double la taille des blocs ; un bloc impair rejoint le bloc incomplet de fin."""
+        if len(self.sum_sq) % 2:
+            self.pending_sum += self.sum_sq[-1]
+            self.pending_min = min(self.pending_min, self.minimum[-1])
+            self.pending_max = max(self.pending_max, self.maximum[-1])
+            self.pending_count += self.hop
+            self.sum_sq = self.sum_sq[:-1]
+            self.minimum = self.minimum[:-1]
+            self.maximum = self.maximum[:-1]
+        self.sum_sq = self.sum_sq.reshape(-1, 2).sum(axis=1)
+        self.minimum = self.minimum.reshape(-1, 2).min(axis=1)
+        self.maximum = self.maximum.reshape(-1, 2).max(axis=1)
+        self.hop *= 2
+
+    def finish(self, points=None):
+        """
+        Retourne (rms, minimum, maximum) sur `points` valeurs (par défaut celles du constructeur),
+        en pleine échelle (-1..1). Tableaux vides si aucun échantillon n'a été reçu.
+        Ne modifie pas l'accumulateur : peut être appelé en cours de flux pour un résultat partiel.
+        """
+        points = points or self.points
+        sum_sq, minimum, maximum = self.sum_sq, self.minimum, self.maximum
+        counts = np.full(len(sum_sq), self.hop, dtype=np.float64)
+        if self.pending_count:
+            sum_sq = np.append(sum_sq, self.pending_sum)
+            minimum = np.append(minimum, self.pending_min)
+            maximum = np.append(maximum, self.pending_max)
+            counts = np.append(counts, self.pending_count)
+        if len(sum_sq) == 0:
+            empty = np.zeros(0, dtype=np.float32)
+            return empty, empty, empty
+
+        if len(sum_sq) >= points:
+            # Regroupement des blocs consécutifs : RMS exacte et vrais extrêmes de chaque point
+            starts = np.linspace(0, len(sum_sq), points, endpoint=False).astype(np.int64)
+            rms = np.sqrt(np.add.reduceat(sum_sq, starts) / np.add.reduceat(counts, starts))
+            minimum = np.minimum.reduceat(minimum, starts)
+            maximum = np.maximum.reduceat(maximum, starts)
+        else:
+            # Morceau très court : moins de blocs que de points, on interpole
+            positions = np.linspace(0, len(sum_sq) - 1, points)
+            blocks = np.arange(len(sum_sq))
+            rms = np.interp(positions, blocks, np.sqrt(sum_sq / counts))
+            minimum = np.interp(positions, blocks, minimum)
+            maximum = np.interp(positions, blocks, maximum)
+        return rms.astype(np.float32), minimum.astype(np.float32), maximum.astype(np.float32)
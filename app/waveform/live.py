@@ -0,0 +1,192 @@
+# app/waveform/live.py
+"""
+Visualiseur temps réel alimenté par une sortie `fifo` de MPD.
+
+Un thread lit le tube nommé et recopie les trames dans un tampon circulaire sans verrou
+(un seul écrivain, un seul lecteur) : quand l'interface prend du retard, les trames les plus anciennes
+sont simplement écrasées. À chaque image, l'interface ne lit que la dernière fenêtre du tampon
+et en calcule les bandes du spectre et les niveaux VU, en NumPy vectorisé.
+
+Côté MPD (mpd.conf) :
+
+    audio_output {
+        type   "fifo"
+        name   "visualiseur"
+        path   "/tmp/mpd.fifo"
+        format "44100:16:2"
+    }
+"""
+import os
+import select
+import threading
+
+import numpy as np
+
+# Formats d'échantillon de la sortie fifo de MPD : dtype et pleine échelle (le 24 bits est dans 32 bits)
+SAMPLE_FORMATS = {"16": ("<i2", 32768.0), "24": ("<i4", 8388608.0), "32": ("<i4", 2147483648.0),
+                  "f": ("<f4", 1.0)}
+READ_BYTES = 65536  # Octets lus au plus par appel à os.read
+REOPEN_DELAY = 1.0  # Secondes avant de rouvrir un tube absent ou fermé par MPD
+
+
+def parse_format(audio_format):
+    """Format MPD « fréquence:bits:canaux » (ex. "44100:16:2") -> (fréquence, dtype, pleine échelle, canaux)."""
+    rate, bits, channels = str(audio_format).split(":")
+    if bits not in SAMPLE_FORMATS:
+        raise ValueError(f"Format d'échantillon non géré : {bits}")
+    dtype, full_scale = SAMPLE_FORMATS[bits]
+    return int(rate), dtype, full_scale, int(channels)
+
+
+class RingBuffer:
+    """
+    Tampon circulaire de trames float32 pour un écrivain et un lecteur, sans verrou.
+    L'écrivain copie les trames puis publie le compteur `written` (une seule affectation) ;
+    le lecteur ne copie que des trames antérieures au compteur lu. La capacité étant bien plus grande
+    qu'une fenêtre d'analyse, l'écrivain ne peut pas rattraper la zone en cours de copie.
+    """
+
+    def __init__(self, frames, channels):
+        self.capacity = 1 << max(1, int(frames) - 1).bit_length()  # Puissance de deux : modulo par masque
+        self.mask = self.capacity - 1
+        self.data = np.zeros((self.capacity, channels), dtype=np.float32)
+        self.written = 0  # Trames écrites depuis le début (jamais remis à zéro)
+
+    def write(self, frames):
+        total = len(frames)
+        if total > self.capacity:
+            frames = frames[-self.capacity:]  # Trames déjà perdues : on ne garde que la fin
+        count = len(frames)
+        start = (self.written + total - count) & self.mask
+        first = min(count, self.capacity - start)
+        self.data[start:start + first] = frames[:first]
+        self.data[:count - first] = frames[first:]
+        self.written += total
+
+    def latest(self, count):
+        """Copie des `count` dernières trames (précédées de silence s'il n'y en a pas encore autant)."""
+        end = self.written
+        available = min(count, end, self.capacity)
+        out = np.zeros((count, self.data.shape[1]), dtype=np.float32)
+        start = (end - available) & self.mask
+        first = min(available, self.capacity - start)
+        out[count - available:count - available + first] = self.data[start:start + first]
+        out[count - available + first:] = self.data[:available - first]
+        return out
+
+
+class FifoReader(threading.Thread):
+    """
+    Lit en continu le tube nommé de la sortie fifo de MPD et remplit un RingBuffer.
+    Le tube est ouvert en non bloquant et attendu par `select` : le thread s'arrête en moins d'un quart
+    de seconde et rouvre le tube quand MPD le ferme (arrêt de la lecture) ou qu'il n'existe pas encore.
+    """
+
+    def __init__(self, path, audio_format="44100:16:2", buffer_seconds=1.0):
+        super().__init__(name="FifoReader", daemon=True)
+        self.path = os.path.expanduser(path)
+        self.sample_rate, self.dtype, self.full_scale, self.channels = parse_format(audio_format)
+        self.frame_bytes = np.dtype(self.dtype).itemsize * self.channels
+        self.ring = RingBuffer(int(self.sample_rate * buffer_seconds), self.channels)
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=1.0)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+            except OSError:
+                self._stop_event.wait(REOPEN_DELAY)  # Tube pas encore créé par MPD
+                continue
+            try:
+                self._read(fd)
+            except OSError as e:
+                print(f"Erreur de lecture du tube {self.path} : {e}")
+            finally:
+                os.close(fd)
+            self._stop_event.wait(REOPEN_DELAY)
+
+    def _read(self, fd):
+        pending = b""
+        while not self._stop_event.is_set():
+            ready, _, _ = select.select([fd], [], [], 0.25)
+            if not ready:
+                continue
+            try:
+                data = os.read(fd, READ_BYTES)
+            except BlockingIOError:
+                continue
+            if not data:
+                return  # Plus d'écrivain : MPD a fermé la sortie
+            data = pending + data
+            usable = len(data) // self.frame_bytes * self.frame_bytes
+            pending = data[usable:]
+            if usable:
+                frames = np.frombuffer(data[:usable], dtype=self.dtype).reshape(-1, self.channels)
+                self.ring.write(frames.astype(np.float32) * (1.0 / self.full_scale))
+
+
+class LiveSpectrum:
+    """
+    Bandes de spectre (FFT fenêtrée de Hann, bandes logarithmiques) et niveaux VU (RMS et crête par canal),
+    normalisés entre 0 et 1 sur `floor_db`..0 dBFS. Montée immédiate, retombée de `fall_db` dB par seconde.
+    """
+
+    def __init__(self, sample_rate, channels, bands=32, fft_size=2048, min_freq=40.0, max_freq=16000.0,
+                 floor_db=-60.0, fall_db=40.0):
+        self.sample_rate = sample_rate
+        self.fft_size = fft_size
+        self.floor_db = floor_db
+        self.fall = fall_db / -floor_db  # Retombée en fraction de la hauteur par seconde
+        self.window = np.hanning(fft_size).astype(np.float32)
+        self.mix = np.full(channels, 1.0 / channels, dtype=np.float32)  # Moyenne des canaux par produit matriciel
+        # Un sinus pleine échelle donne 0 dB dans sa bande
+        self.reference_db = 20.0 * np.log10(self.window.sum() / 2.0)
+        frequencies = np.fft.rfftfreq(fft_size, 1.0 / sample_rate)
+        edges = np.searchsorted(frequencies, np.geomspace(min_freq, min(max_freq, sample_rate / 2), bands + 1))
+        self.band_starts = np.minimum(edges[:-1], len(frequencies) - 1)
+        self.band_stops = np.maximum(edges[1:], self.band_starts + 1)  # Au moins un point par bande
+        self.bands = np.zeros(bands, dtype=np.float32)
+        self.rms = np.zeros(channels, dtype=np.float32)
+        self.peak = np.zeros(channels, dtype=np.float32)
+
+    def _normalize(self, db):
+        return np.clip((db - self.floor_db) / -self.floor_db, 0.0, 1.0).astype(np.float32)
+
+    def update(self, frames, vu_frames, elapsed):
+        """
+        Analyse les `fft_size` dernières trames (forme (trames, canaux)) ; le VU porte sur les `vu_frames`
+        dernières. `elapsed` : secondes depuis l'image précédente, pour la retombée.
+        """
+        spectrum = np.fft.rfft((frames @ self.mix) * self.window)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        cumulative = np.concatenate(([0.0], np.cumsum(power)))
+        band_power = (cumulative[self.band_stops] - cumulative[self.band_starts]) / (self.band_stops - self.band_starts)
+        bands = self._normalize(10.0 * np.log10(band_power + 1e-12) - self.reference_db)
+
+        # Canaux en lignes contiguës : les réductions par canal sont bien plus rapides que sur l'axe 0
+        recent = np.ascontiguousarray(frames[-vu_frames:].T)
+        mean_square = np.einsum("ij,ij->i", recent, recent) / recent.shape[1]
+        rms = self._normalize(10.0 * np.log10(mean_square * 2.0 + 1e-12))  # +3 dB : un sinus affiche son niveau crête
+        peak = self._normalize(20.0 * np.log10(np.abs(recent).max(axis=1) + 1e-6))
+        self._apply(bands, rms, peak, elapsed)
+
+    def decay(self, elapsed):
+        """Retombée sans nouveau signal (lecture en pause ou arrêtée)."""
+        self._apply(0.0, 0.0, 0.0, elapsed)
+
+    def _apply(self, bands, rms, peak, elapsed):
+        drop = self.fall * elapsed
+        self.bands = np.maximum(bands, self.bands - drop)
+        self.rms = np.maximum(rms, self.rms - drop)
+        self.peak = np.maximum(peak, self.peak - drop)
+        np.maximum(self.bands, 0.0, out=self.bands)
+        np.maximum(self.rms, 0.0, out=self.rms)
+        np.maximum(self.peak, 0.0, out=self.peak)
+
+    def is_silent(self):
+        return not (self.bands.any() or self.rms.any() or self.peak.any())
@@ -0,0 +1,241 @@
+# app/waveform/pcm_file.py
+import os
+import struct
+
+import numpy as np
+
+CHUNK_FRAMES = 65536  # Trames (après sous-échantillonnage) réduites par bloc
+
+# Identifiants GUID des blocs Sony Wave64
+W64_RIFF = b"riff\x2e\x91\xcf\x11\xa5\xd6\x28\xdb\x04\xc1\x00\x00"
+W64_WAVE = b"wave\xf3\xac\xd3\x11\x8c\xd1\x00\xc0\x4f\x8e\xdb\x8a"
+W64_FMT = b"fmt \xf3\xac\xd3\x11\x8c\xd1\x00\xc0\x4f\x8e\xdb\x8a"
+W64_DATA = b"data\xf3\xac\xd3\x11\x8c\xd1\x00\xc0\x4f\x8e\xdb\x8a"
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class PcmFile:
+    """
+    Données PCM non compressées d'un fichier, lues par projection mémoire (numpy.memmap) :
+    seuls les blocs en cours de réduction sont copiés, jamais le signal entier.
+    """
+
+    def __init__(self, path, offset, frames, channels, sample_rate, dtype, full_scale, zero=0.0):
+        self.path = path
+        self.offset = offset
+        self.frames = frames
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.dtype = dtype  # dtype numpy, ou "<i3" / ">i3" pour le 24 bits
+        self.full_scale = full_scale
+        self.zero = zero  # Valeur du silence (128 pour le 8 bits non signé du WAV)
+
+    def frame_bytes(self):
+        return self.channels * (3 if self.dtype in ("<i3", ">i3") else np.dtype(self.dtype).itemsize)
+
+    def _map(self, start, count):
+        """Projette seulement les trames [start, start + count) : les pages lues sont libérées bloc après bloc."""
+        offset = self.offset + start * self.frame_bytes()
+        if self.dtype in ("<i3", ">i3"):
+            return np.memmap(self.path, dtype=np.uint8, mode="r", offset=offset, shape=(count, self.channels, 3))
+        return np.memmap(self.path, dtype=np.dtype(self.dtype), mode="r", offset=offset,
+                         shape=(count, self.channels))
+
+    def _channel(self, frames, channel):
+        """Un canal d'un bloc (vue strided) converti en float32, sans mise à l'échelle."""
+        if self.dtype in ("<i3", ">i3"):
+            raw = frames[:, channel, :].astype(np.int32)
+            low, high = (0, 2) if self.dtype == "<i3" else (2, 0)
+            return ((raw[:, high] << 24 | raw[:, 1] << 16 | raw[:, low] << 8) >> 8).astype(np.float32)
+        return frames[:, channel].astype(np.float32)
+
+    def mono(self, start, count, stride=1):
+        """Signal mono (moyenne des canaux) en float32 -1..1 des trames [start, start + count), une sur `stride`."""
+        count = max(0, min(count, self.frames - start))
+        if count == 0:
+            return np.zeros(0, dtype=np.float32)
+        frames = self._map(start, count)
+        strided = frames[::stride]
+        mono = self._channel(strided, 0)
+        for channel in range(1, self.channels):
+            mono += self._channel(strided, channel)
+        del strided, frames
+        mono *= 1.0 / (self.full_scale * self.channels)
+        if self.zero:
+            mono -= self.zero / self.full_scale
+        return mono
+
+    def samples(self, start, count, stride=1):
+        """Trames [start, start + count) en float32 -1..1, forme (trames, canaux), une sur `stride`."""
+        count = max(0, min(count, self.frames - start))
+        frames = self._map(start, count)[::stride] if count else np.zeros((0, self.channels), dtype=np.float32)
+        block = np.empty((len(frames), self.channels), dtype=np.float32)
+        for channel in range(self.channels):
+            block[:, channel] = self._channel(frames, channel)
+        del frames
+        block *= 1.0 / self.full_scale
+        if self.zero:
+            block -= self.zero / self.full_scale
+        return block
+
+    def chunks(self, stride=1, chunk_frames=CHUNK_FRAMES, should_stop=None, mono=True):
+        """
+        Produit le signal bloc par bloc, mono (voir `mono`) ou toutes voies (voir `samples`),
+        en ne lisant qu'une trame sur `stride` (vue strided du memmap, sans copie intermédiaire).
+        """
+        read = self.mono if mono else self.samples
+        step = chunk_frames * stride
+        for start in range(0, self.frames, step):
+            if should_stop is not None and should_stop():
+                return
+            yield read(start, step, stride)
+
+    def duration(self):
+        return self.frames / self.sample_rate
+
+    def sample_count(self, stride=1):
+        return (self.frames + stride - 1) // stride
+
+
+def open_pcm_file(path):
+    """Analyse l'en-tête d'un fichier WAV (RIFF/RF64), AIFF/AIFC ou Wave64 ; None si ce n'est pas du PCM lisible."""
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as file:
+            header = file.read(40)
+            if header[:4] in (b"RIFF", b"RF64") and header[8:12] == b"WAVE":
+                pcm = _parse_wav(path, file, header[:4] == b"RF64")
+            elif header[:4] == b"FORM" and header[8:12] in (b"AIFF", b"AIFC"):
+                pcm = _parse_aiff(path, file, header[8:12] == b"AIFC")
+            elif header[:16] == W64_RIFF and header[24:40] == W64_WAVE:
+                pcm = _parse_w64(path, file)
+            else:
+                return None
+    except (OSError, struct.error, ValueError):
+        return None
+    if pcm is None or pcm.frames <= 0 or pcm.channels <= 0 or pcm.sample_rate <= 0:
+        return None
+    # Fichier tronqué ou taille de données non renseignée (enregistrement en cours) : on s'en tient au disque
+    pcm.frames = min(pcm.frames, (file_size - pcm.offset) // pcm.frame_bytes())
+    return pcm if pcm.frames > 0 else None
+
+
+def _wave_format(format_tag, bits):
+    """dtype, pleine échelle et zéro d'un format WAV/W64 (None si non géré)."""
+    if format_tag == WAVE_FORMAT_PCM:
+        return {8: ("u1", 128.0, 128.0), 16: ("<i2", 32768.0, 0.0), 24: ("<i3", 8388608.0, 0.0),
+                32: ("<i4", 2147483648.0, 0.0)}.get(bits)
+    if format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        return {32: ("<f4", 1.0, 0.0), 64: ("<f8", 1.0, 0.0)}.get(bits)
+    return None
+
+
+def _parse_fmt(body):
+    format_tag, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+    if format_tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+        format_tag = struct.unpack("<H", body[24:26])[0]  # Deux premiers octets du GUID de sous-format
+    return format_tag, channels, sample_rate, bits
+
+
+def _make_pcm(path, offset, data_size, fmt):
+    if fmt is None:
+        return None
+    format_tag, channels, sample_rate, bits = fmt
+    layout = _wave_format(format_tag, bits)
+    if layout is None or channels <= 0:
+        return None
+    dtype, full_scale, zero = layout
+    frames = data_size // (channels * bits // 8)
+    return PcmFile(path, offset, frames, channels, sample_rate, dtype, full_scale, zero)
+
+
+def _parse_wav(path, file, rf64):
+    position = 12
+    fmt = None
+    data_size_64 = None
+    while True:
+        file.seek(position)
+        chunk = file.read(8)
+        if len(chunk) < 8:
+            return None
+        chunk_id, size = struct.unpack("<4sI", chunk)
+        if chunk_id == b"ds64":
+            data_size_64 = struct.unpack("<Q", file.read(16)[8:16])[0]
+        elif chunk_id == b"fmt ":
+            fmt = _parse_fmt(file.read(size))
+        elif chunk_id == b"data":
+            if rf64 and size == 0xFFFFFFFF and data_size_64 is not None:
+                size = data_size_64
+            return _make_pcm(path, position + 8, size, fmt)
+        position += 8 + size + (size & 1)
+
+
+def _parse_w64(path, file):
+    position = 40
+    fmt = None
+    while True:
+        file.seek(position)
+        chunk = file.read(24)
+        if len(chunk) < 24:
+            return None
+        guid, size = chunk[:16], struct.unpack("<Q", chunk[16:24])[0]  # Taille en-tête de 24 octets comprise
+        if size < 24:
+            return None
+        if guid == W64_FMT:
+            fmt = _parse_fmt(file.read(size - 24))
+        elif guid == W64_DATA:
+            return _make_pcm(path, position + 24, size - 24, fmt)
+        position += (size + 7) & ~7
+
+
+def _extended_to_float(raw):
+    """Nombre flottant IEEE 754 80 bits (fréquence d'échantillonnage AIFF)."""
+    exponent = ((raw[0] & 0x7F) << 8) | raw[1]
+    mantissa = int.from_bytes(raw[2:10], "big")
+    if exponent == 0 and mantissa == 0:
+        return 0.0
+    return mantissa * 2.0 ** (exponent - 16383 - 63)
+
+
+def _parse_aiff(path, file, aifc):
+    position = 12
+    comm = None
+    while True:
+        file.seek(position)
+        chunk = file.read(8)
+        if len(chunk) < 8:
+            return None
+        chunk_id, size = struct.unpack(">4sI", chunk)
+        if chunk_id == b"COMM":
+            body = file.read(size)
+            channels, frames, bits = struct.unpack(">hIh", body[:8])
+            compression = body[18:22] if aifc else b"NONE"
+            comm = (channels, frames, bits, int(_extended_to_float(body[8:18])), compression)
+        elif chunk_id == b"SSND":
+            if comm is None:
+                return None
+            data_offset = struct.unpack(">I", file.read(4))[0]
+            channels, frames, bits, sample_rate, compression = comm
+            layout = _aiff_format(compression, bits)
+            if layout is None:
+                return None
+            dtype, full_scale = layout
+            return PcmFile(path, position + 16 + data_offset, frames, channels, sample_rate, dtype, full_scale)
+        position += 8 + size + (size & 1)
+
+
+def _aiff_format(compression, bits):
+    """dtype et pleine échelle d'un format AIFF/AIFC (None si compressé ou non géré)."""
+    if compression in (b"NONE", b"twos"):
+        return {8: ("i1", 128.0), 16: (">i2", 32768.0), 24: (">i3", 8388608.0),
+                32: (">i4", 2147483648.0)}.get(bits)
+    if compression == b"sowt":
+        return {16: ("<i2", 32768.0), 24: ("<i3", 8388608.0), 32: ("<i4", 2147483648.0)}.get(bits)
+    if compression in (b"fl32", b"FL32"):
+        return (">f4", 1.0)
+    if compression in (b"fl64", b"FL64"):
+        return (">f8", 1.0)
+    return None
@@ -0,0 +1,259 @@
+# app/waveform/precompute.py
+"""
+Précalcul des formes d'onde de toute la bibliothèque MPD.
+
+En ligne de commande :
+    python -m app.waveform.precompute [--host localhost] [--port 6600] [--workers N]
+
+Dans l'application : LibraryPrecomputeService (activé par `waveform.precompute_library`).
+Les fichiers déjà présents dans le cache (même chemin, taille et date) sont ignorés :
+un précalcul interrompu reprend là où il s'était arrêté. Les formes d'onde de la bibliothèque sont épinglées
+dans le cache (jamais évincées) ; le précalcul refuse de démarrer si elles ne tiennent pas dans `cache_max_mb`.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+from mpd import ConnectionError as MPDConnectionError
+from PySide6.QtCore import QObject, Signal
+
+from app.mpd.mpd_client import MPDClientWrapper
+from app.utils.config_loader import config_instance
+from app.waveform.analysis import analyze_track, analysis_pyramid
+from app.waveform.pyramid import BASE_POINTS
+from app.waveform.store import get_waveform_store, local_file_key
+
+EVICT_TARGET = 0.8  # Part de `cache_max_mb` que la bibliothèque peut occuper (voir WaveformStore.evict)
+
+_cancel = None  # Dans les processus du pool : événement d'abandon des calculs en cours (voir _start_worker)
+
+
+def compute_pyramid_arrays(audio_file, points=BASE_POINTS):
+    """
+    Exécuté dans un processus du pool : retourne la pyramide sérialisable (voir WaveformPyramid.to_arrays),
+    avec les résultats des analyseurs configurés.
+    """
+    analysis = analyze_track(audio_file, points, should_stop=_cancel.is_set if _cancel is not None else None)
+    if analysis is None or len(analysis[0][0]) == 0:
+        return None
+    return analysis_pyramid(analysis, points).to_arrays()
+
+
+def _start_worker(cancel):
+    """
+    Initialisation des processus du pool : priorité basse pour ne pas gêner la lecture ;
+    `cancel` interrompt le décodage en cours (ffmpeg arrêté entre deux blocs).
+    """
+    global _cancel
+    _cancel = cancel
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+
+class LibraryPrecomputer:
+    """
+    Calcule les formes d'onde manquantes de la bibliothèque avec un pool de processus.
+    Pendant la lecture, le nombre de calculs simultanés est réduit à `playing_workers`.
+    """
+
+    def __init__(self, mpd_client, workers=None, playing_workers=None):
+        settings = config_instance.data.get("waveform", {}) or {}
+        self.mpd_client = mpd_client
+        self.store = get_waveform_store()
+        self.workers = max(1, int(workers or settings.get("precompute_workers") or os.cpu_count() or 1))
+        self.playing_workers = max(1, int(playing_workers or settings.get("precompute_playing_workers", 1)))
+        self._limit = self.workers
+        self._limit_checked = 0.0
+        self._context = multiprocessing.get_context("spawn")  # Pas de fork d'un processus qui a des threads Qt
+        # Un seul événement, gardé tant que le précalcul existe : un processus encore en démarrage après l'abandon
+        # d'un passage doit pouvoir le relire
+        self._cancel = self._context.Event()
+
+    def list_library(self):
+        """Chemins MPD de tous les fichiers de la bibliothèque (`listall`)."""
+        return [entry["file"] for entry in self.mpd_client.client.listall() if "file" in entry]
+
+    def entry_bytes(self):
+        """Taille estimée d'une forme d'onde en cache : moyenne des entrées, au moins une pyramide sans analyse."""
+        flat = analysis_pyramid(((np.zeros(0),) * 3, {}), BASE_POINTS).to_arrays()
+        return max(self.store.average_entry_bytes(), sum(array.nbytes for array in flat.values()))
+
+    def pending_files(self, files=None):
+        """
+        (clé de cache, chemin local) des fichiers absents du cache ou modifiés depuis leur calcul, après avoir
+        épinglé les clés de toute la bibliothèque. None (avec un message) si elle ne tient pas dans le cache :
+        ses formes d'onde seraient évincées puis recalculées à chaque passage.
+        """
+        library = []
+        for file_path in (self.list_library() if files is None else files):
+            full_path = self.mpd_client.get_full_path(file_path)
+            cache_key = local_file_key(file_path, full_path)
+            if cache_key is not None:
+                library.append((cache_key, full_path))
+        needed = len(library) * self.entry_bytes()
+        if needed > self.store.max_bytes * EVICT_TARGET:
+            print(f"Précalcul annulé : les formes d'onde de la bibliothèque ({len(library)} fichiers, "
+                  f"environ {needed / 2 ** 20:.0f} Mo) ne tiennent pas dans le cache "
+                  f"({self.store.max_bytes / 2 ** 20:.0f} Mo) ; augmentez `waveform.cache_max_mb` "
+                  f"à au moins {int(np.ceil(needed / EVICT_TARGET / 2 ** 20))}")
+            return None
+        self.store.pin(cache_key for cache_key, _ in library)
+        return [(cache_key, full_path) for cache_key, full_path in library
+                if not self.store.contains(cache_key, "rms")]
+
+    def concurrency(self):
+        """Nombre de calculs simultanés autorisés (état de lecture relu au plus toutes les 2 s)."""
+        if time.monotonic() - self._limit_checked > 2.0:
+            self._limit_checked = time.monotonic()
+            try:
+                playing = self.mpd_client.player_status.get().state == "play"
+            except Exception:
+                playing = False
+            self._limit = min(self.playing_workers, self.workers) if playing else self.workers
+        return self._limit
+
+    def run(self, pending, should_stop=None, on_progress=None):
+        """
+        Calcule les formes d'onde de `pending` ([(clé, chemin local)]) et les écrit dans le cache.
+        Quand `should_stop()` devient vrai (ou sur exception), les calculs en cours sont abandonnés sans attendre
+        la fin de leur décodage. Retourne le nombre de formes d'onde calculées.
+        """
+        total = len(pending)
+        if not total:
+            return 0
+        computed = done = 0
+        queue = list(reversed(pending))
+        in_flight = {}
+        self._cancel.clear()
+        pool = ProcessPoolExecutor(self.workers, mp_context=self._context, initializer=_start_worker,
+                                   initargs=(self._cancel,))
+        abandoned = True
+        try:
+            while queue or in_flight:
+                if should_stop is not None and should_stop():
+                    break
+                while queue and len(in_flight) < self.concurrency():
+                    cache_key, full_path = queue.pop()
+                    in_flight[pool.submit(compute_pyramid_arrays, full_path)] = (cache_key, full_path)
+                finished, _ = wait(in_flight, timeout=0.25, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    cache_key, full_path = in_flight.pop(future)
+                    done += 1
+                    try:
+                        arrays = future.result()
+                    except Exception as e:
+                        print(f"Erreur lors du précalcul de {full_path} : {e}")
+                        continue
+                    if arrays is not None:
+                        self.store.put_all(cache_key, arrays)
+                        computed += 1
+                    if on_progress is not None:
+                        on_progress(done, total)
+            else:
+                abandoned = False
+        finally:
+            if abandoned:
+                self._cancel.set()
+            pool.shutdown(wait=not abandoned, cancel_futures=abandoned)
+            self.store.flush()
+        return computed
+
+
+class LibraryPrecomputeService(QObject):
+    """
+    Précalcul en arrière-plan dans l'application : toute la bibliothèque au démarrage,
+    puis seulement les fichiers ajoutés ou modifiés à chaque événement idle `database`.
+    """
+    progress = Signal(int, int)  # fichiers traités, total
+    finished = Signal(int)  # formes d'onde calculées
+
+    def __init__(self, mpd_client, parent=None):
+        super().__init__(parent)
+        self.mpd_client = mpd_client
+        self.precomputer = LibraryPrecomputer(mpd_client)
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._rescan = False
+        self.mpd_client.idle_watcher().database_changed.connect(self.start)
+
+    def start(self, *args):
+        """Lance un passage (ou en programme un autre si un passage est déjà en cours)."""
+        if self._thread is not None and self._thread.is_alive():
+            self._rescan = True
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="LibraryPrecompute", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Arrête le précalcul en abandonnant les fichiers en cours (repris au prochain démarrage)."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)  # Thread démon : la fermeture n'attend pas au-delà
+
+    def _run(self):
+        while True:
+            self._rescan = False
+            try:
+                pending = self.precomputer.pending_files()
+                if pending is None:
+                    return
+                computed = self.precomputer.run(pending, should_stop=self._stop_event.is_set,
+                                                on_progress=self.progress.emit)
+                self.finished.emit(computed)
+            except Exception as e:
+                print(f"Erreur lors du précalcul de la bibliothèque : {e}")
+            if not self._rescan or self._stop_event.is_set():
+                return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Précalcule les formes d'onde de la bibliothèque MPD.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6600)
+    parser.add_argument("--workers", type=int, default=None, help="processus de calcul (défaut : nombre de cœurs)")
+    parser.add_argument("--music-dir", default=None, help="répertoire de musique local de MPD")
+    args = parser.parse_args(argv)
+
+    mpd_client = MPDClientWrapper(args.host, args.port)
+    if args.music_dir:
+        mpd_client.MUSIC_DIRECTORY = args.music_dir
+    precomputer = LibraryPrecomputer(mpd_client, workers=args.workers)
+    if not precomputer.store.owned:
+        print("Le cache de formes d'onde est utilisé par un autre processus (l'application est-elle ouverte ?) : "
+              "fermez l'application ou activez `waveform.precompute_library`", file=sys.stderr)
+        mpd_client.disconnect()
+        return 1
+    try:
+        try:
+            pending = precomputer.pending_files()
+        except (MPDConnectionError, OSError) as e:
+            print(f"Impossible de lire la bibliothèque de MPD ({args.host}:{args.port}) : {e}", file=sys.stderr)
+            return 1
+        if pending is None:
+            return 1
+        print(f"{len(pending)} forme(s) d'onde à calculer avec {precomputer.workers} processus")
+        started = time.monotonic()
+
+        def show_progress(done, total):
+            print(f"\r{done}/{total}", end="", flush=True)
+
+        computed = precomputer.run(pending, on_progress=show_progress)
+        print(f"\n{computed} forme(s) d'onde calculée(s) en {time.monotonic() - started:.1f} s")
+    except KeyboardInterrupt:
+        print("\nInterrompu : le prochain lancement reprendra là où celui-ci s'est arrêté")
+    finally:
+        get_waveform_store().flush()
+        mpd_client.disconnect()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# app/waveform/prewarm.py
+from PySide6.QtCore import QObject, QTimer
+
+from mpd import CommandError
+
+from app.mpd.mpd_client import format_song_info
+from app.mpd.queue_sync import fetch_songs_by_id
+from app.utils.config_loader import config_instance
+from app.waveform.cache import get_prewarm_cache
+from app.waveform.store import local_file_key
+from app.waveform.worker import get_waveform_scheduler, PRIORITY_NEXT
+
+
+class TrackPrewarmer(QObject):
+    """
+    Prépare les prochains morceaux de la file pendant la lecture du morceau courant.
+    `lead` secondes avant la fin du morceau (d'après `status`, sans requête supplémentaire),
+    les `count` entrées suivantes (`nextsong`, ou `nextsongid` en lecture aléatoire) sont lues en une requête ;
+    leurs métadonnées, leur forme d'onde et, si demandé, leur pochette sont mises en cache
+    pour que le changement de morceau s'affiche complètement dès la première image.
+    """
+
+    def __init__(self, mpd_client, parent=None):
+        super().__init__(parent)
+        settings = config_instance.data.get("waveform", {}) or {}
+        self.mpd_client = mpd_client
+        self.cache = get_prewarm_cache()
+        self.lead = float(settings.get("prewarm_lead", 20))
+        self.count = max(1, int(settings.get("prewarm_count", 1)))
+        self.fetch_art = bool(settings.get("prewarm_art", False))
+        self.scheduler = get_waveform_scheduler()
+        self.jobs = []  # Calculs de formes d'onde lancés par le dernier préchargement
+        self.prewarmed_for = None  # songid du morceau pour lequel la suite est déjà préparée
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.prewarm)
+
+        watcher = self.mpd_client.idle_watcher()
+        watcher.player_changed.connect(self.schedule)
+        watcher.playlist_changed.connect(self.on_queue_changed)
+        watcher.options_changed.connect(self.on_queue_changed)
+        self.schedule()
+
+    def on_queue_changed(self, *args):
+        """La file ou le mode de lecture ont changé : le morceau suivant n'est peut-être plus le même."""
+        self.prewarmed_for = None
+        self.schedule()
+
+    def schedule(self, *args):
+        """Programme le préchargement `lead` secondes avant la fin du morceau courant."""
+        snapshot = self.mpd_client.player_status.peek()
+        if snapshot is None:
+            self.mpd_client.player_status.get_async(lambda status: self.schedule())
+            return
+        if snapshot.state != "play" or snapshot.get("nextsongid") is None:
+            self.timer.stop()
+            return
+        if self.prewarmed_for == snapshot.songid:
+            return
+        remaining = snapshot.duration - snapshot.elapsed - snapshot.age()
+        self.timer.start(int(max(0.0, remaining - self.lead) * 1000))
+
+    def prewarm(self):
+        """Lit les prochaines entrées de la file dans le worker MPD."""
+        snapshot = self.mpd_client.player_status.peek()
+        if snapshot is None or snapshot.get("nextsongid") is None:
+            return
+        self.prewarmed_for = snapshot.songid
+        self.cancel_jobs()
+        if snapshot.get("random") == "1":
+            # Lecture aléatoire : seul le prochain morceau est connu du serveur
+            self.mpd_client.executor.call_func_async(fetch_songs_by_id, [snapshot.get("nextsongid")],
+                                                     callback=lambda songs: self.on_upcoming(list(songs.values())),
+                                                     error_callback=self.on_error, retry=True)
+        else:
+            start = int(snapshot.get("nextsong"))
+            self.mpd_client.executor.call_async("playlistinfo", f"{start}:{start + self.count}",
+                                                callback=self.on_upcoming, error_callback=self.on_error)
+
+    def on_upcoming(self, songs):
+        for song in songs:
+            file_path = song.get("file")
+            if not file_path:
+                continue
+            full_path = self.mpd_client.get_full_path(file_path)
+            cache_key = local_file_key(file_path, full_path)
+            self.cache.remember_track(song.get("id"), {"info": format_song_info(song), "full_path": full_path,
+                                                       "cache_key": cache_key})
+            if cache_key is not None and not self.cache.has_pyramid(cache_key):
+                duration = float(song.get("duration") or song.get("time") or 0) or None
+                self.jobs.append(self.scheduler.submit(cache_key, full_path, PRIORITY_NEXT, duration))
+            elif cache_key is not None:
+                self.cache.pyramid(cache_key)  # Chargement en mémoire depuis le disque
+            if self.fetch_art and self.cache.cover(file_path) is None:
+                self.mpd_client.executor.call_func_async(
+                    fetch_cover, file_path,
+                    callback=lambda data, path=file_path: self.cache.remember_cover(path, data),
+                    error_callback=self.on_error, retry=True)
+
+    def cancel_jobs(self):
+        """Annule les calculs de préchargement encore utiles à personne d'autre (la suite a changé)."""
+        for job in self.jobs:
+            if job.priority == PRIORITY_NEXT:
+                self.scheduler.cancel(job)
+        self.jobs.clear()
+
+    def on_error(self, error):
+        print(f"Erreur lors du préchargement du morceau suivant : {error}")
+
+    def stop(self):
+        """Arrête le préchargement et annule les calculs en attente."""
+        self.timer.stop()
+        self.cancel_jobs()
+
+
+def fetch_cover(client, file_path):
+    """Lit la pochette d'un fichier (image intégrée, sinon fichier cover du dossier) ; None si absente."""
+    for command in (client.readpicture, client.albumart):
+        try:
+            picture = command(file_path)
+        except CommandError:
+            continue
+        if picture and picture.get("binary"):
+            return picture["binary"]
+    return None
@@ -0,0 +1,90 @@
+# app/waveform/pyramid.py
+import numpy as np
+
+BASE_POINTS = 8192  # Résolution du niveau le plus fin (calculée une seule fois au décodage)
+MIN_LEVEL_POINTS = 64  # Le niveau le plus grossier
+ENVELOPE_KINDS = ("min", "max", "rms", "scale")  # Tableaux du cache disque propres à la pyramide
+
+
+class WaveformPyramid:
+    """
+    Pyramide d'enveloppes (min / max / RMS) : le niveau 0 est l'enveloppe décodée,
+    chaque niveau suivant divise la résolution par deux.
+    L'affichage choisit le niveau le plus grossier qui donne encore au moins un point par colonne :
+    le coût d'un rendu est proportionnel au nombre de pixels, quelle que soit la durée du morceau.
+    `analysis` : résultats des autres analyseurs du même décodage (voir app/waveform/analysis.py).
+    """
+
+    def __init__(self, minimum, maximum, rms, analysis=None):
+        self.analysis = dict(analysis or {})  # type -> tableau, mis en cache avec la pyramide
+        self.levels = [(np.asarray(minimum, dtype=np.float32),
+                        np.asarray(maximum, dtype=np.float32),
+                        np.asarray(rms, dtype=np.float32))]
+        while len(self.levels[-1][0]) > MIN_LEVEL_POINTS:
+            self.levels.append(self._halve(*self.levels[-1]))
+        self.peak = float(max(-self.levels[-1][0].min(), self.levels[-1][1].max(), 0.0))
+        self.rms_peak = float(self.levels[0][2].max()) if len(self.levels[0][2]) else 0.0
+
+    @staticmethod
+    def _halve(minimum, maximum, rms):
+        if len(minimum) % 2:
+            minimum, maximum, rms = (np.append(values, values[-1]) for values in (minimum, maximum, rms))
+        return (minimum.reshape(-1, 2).min(axis=1),
+                maximum.reshape(-1, 2).max(axis=1),
+                np.sqrt((rms.reshape(-1, 2) ** 2).mean(axis=1)))
+
+    def __len__(self):
+        return len(self.levels[0][0])
+
+    def level_for(self, columns, span=1.0):
+        """Indice du niveau le plus grossier ayant au moins `columns` points sur la fraction `span` du morceau."""
+        for index in range(len(self.levels) - 1, -1, -1):
+            if len(self.levels[index][0]) * span >= columns:
+                return index
+        return 0
+
+    def columns(self, count, start=0.0, end=1.0):
+        """
+        Retourne (minimum, maximum, rms) sur `count` colonnes pour la plage [start, end] (fractions du morceau).
+        Au-delà de la résolution du niveau 0 (fort zoom), les valeurs sont interpolées.
+        """
+        count = max(1, int(count))
+        start, end = max(0.0, start), min(1.0, end)
+        minimum, maximum, rms = self.levels[self.level_for(count, end - start)]
+        size = len(minimum)
+        first = min(int(start * size), size - 1)
+        last = max(first + 1, min(size, int(np.ceil(end * size))))
+        if last - first >= count:
+            starts = np.linspace(first, last, count, endpoint=False).astype(np.int64)
+            counts = np.diff(np.append(starts, last)).astype(np.float32)
+            return (np.minimum.reduceat(minimum[:last], starts),
+                    np.maximum.reduceat(maximum[:last], starts),
+                    np.sqrt(np.add.reduceat(rms[:last] ** 2, starts) / counts))
+        positions = np.linspace(start * size, end * size, count, endpoint=False) - 0.5
+        indices = np.arange(size)
+        return (np.interp(positions, indices, minimum).astype(np.float32),
+                np.interp(positions, indices, maximum).astype(np.float32),
+                np.interp(positions, indices, rms).astype(np.float32))
+
+    # Cache disque : niveau 0 seulement, quantifié relativement au pic du morceau, et résultats des analyses
+    def to_arrays(self):
+        minimum, maximum, rms = self.levels[0]
+        scale = self.peak or 1.0
+        return {
+            **self.analysis,
+            "min": np.clip(np.rint(minimum / scale * 127.0), -127, 127).astype(np.int8),
+            "max": np.clip(np.rint(maximum / scale * 127.0), -127, 127).astype(np.int8),
+            "rms": np.clip(np.rint(rms / scale * 255.0), 0, 255).astype(np.uint8),
+            "scale": np.array([scale], dtype=np.float32),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Reconstruit la pyramide depuis `to_arrays()` ; None si une partie manque."""
+        if not all(arrays.get(kind) is not None for kind in ENVELOPE_KINDS):
+            return None
+        scale = float(arrays["scale"][0])
+        analysis = {kind: array for kind, array in arrays.items() if kind not in ENVELOPE_KINDS}
+        return cls(arrays["min"].astype(np.float32) / 127.0 * scale,
+                   arrays["max"].astype(np.float32) / 127.0 * scale,
+                   arrays["rms"].astype(np.float32) / 255.0 * scale, analysis)
@@ -0,0 +1,178 @@
+# app/waveform/segmented.py
+"""
+Décodage exact d'un morceau en segments parallèles.
+
+La durée est découpée en K segments décodés chacun par un ffmpeg positionné (`-ss`) dans un processus du pool.
+Chaque segment est réduit en blocs de taille fixe, alignés sur l'indice absolu des échantillons :
+somme des carrés en int64, minimum et maximum en int16. Les sommes entières étant associatives,
+le résultat est identique au bit près quel que soit K (K = 1 correspond au décodage en une passe),
+pour tout décodeur déterministe (le bruit synthétisé par le PNS de l'AAC dépend du point de départ).
+Les bornes des segments sont exactes à l'échantillon : ffmpeg se positionne un peu avant,
+garde les horodatages d'origine (`-copyts`) et `atrim` coupe sur l'indice d'échantillon,
+décalé de l'horodatage de départ du flux (délai d'encodeur MP3, par exemple).
+Sans durée connue (« Duration: N/A »), le morceau est décodé en flux, sans découpage.
+Chaque calcul partage avec ses segments un événement d'annulation (processus `Manager`) : un segment déjà
+lancé arrête son ffmpeg entre deux blocs, sans occuper le pool pour un travail abandonné.
+"""
+import atexit
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from app.waveform.analysis import decode_envelope
+from app.waveform.decoder import ffmpeg_executable, pipe_pcm, probe_audio, CHUNK_FRAMES, FULL_SCALE
+
+BLOCKS_PER_POINT = 8  # Blocs par point de l'enveloppe finale
+MIN_SEGMENT_SECONDS = 30  # En dessous, découper ne fait que multiplier les lancements de ffmpeg
+SEEK_MARGIN = 1.0  # Secondes décodées avant le début d'un segment puis coupées par atrim
+
+
+def decode_segment(audio_file, sample_rate, start_sample, end_sample, block, cancel=None, first_pts=0):
+    """
+    Exécuté dans un processus du pool : décode les échantillons [start_sample, end_sample) à la fréquence native
+    (end_sample None : jusqu'à la fin) et retourne (somme des carrés, minimum, maximum, nombre d'échantillons)
+    par bloc de `block` échantillons. `start_sample` doit être un multiple de `block`.
+    `first_pts` : horodatage (en échantillons) du premier échantillon du flux, origine des indices.
+    `cancel` (événement partagé, optionnel) interrompt le décodage ; le résultat partiel est alors sans objet.
+    """
+    trim = f"atrim=start_pts={first_pts + start_sample}" + \
+        (f":end_pts={first_pts + end_sample}" if end_sample is not None else "")
+    seek = max(0.0, start_sample / sample_rate - SEEK_MARGIN)
+    command = [ffmpeg_executable(), "-nostdin", "-v", "error", "-ss", f"{seek:.6f}", "-copyts", "-i", audio_file,
+               "-map", "0:a:0", "-af", trim, "-ac", "1", "-f", "s16le", "-"]
+    sums, minimums, maximums = [], [], []
+    samples = 0
+    # Blocs lus alignés sur `block` : seul le dernier peut être incomplet
+    for chunk in pipe_pcm(command, audio_file, max(1, CHUNK_FRAMES // block) * block,
+                          should_stop=cancel.is_set if cancel is not None else None):
+        samples += len(chunk)
+        values = chunk.astype(np.int64)
+        full = len(values) // block * block
+        if full:
+            blocks = values[:full].reshape(-1, block)
+            sums.append(np.einsum("ij,ij->i", blocks, blocks))
+            minimums.append(chunk[:full].reshape(-1, block).min(axis=1))
+            maximums.append(chunk[:full].reshape(-1, block).max(axis=1))
+        if full < len(values):
+            tail = values[full:]
+            sums.append(np.array([np.dot(tail, tail)], dtype=np.int64))
+            minimums.append(chunk[full:].min(keepdims=True))
+            maximums.append(chunk[full:].max(keepdims=True))
+    if not sums:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty.astype(np.int16), empty.astype(np.int16), 0
+    return np.concatenate(sums), np.concatenate(minimums), np.concatenate(maximums), samples
+
+
+def reduce_blocks(sum_sq, minimum, maximum, counts, points):
+    """Regroupe des blocs entiers en `points` valeurs (rms, minimum, maximum) float32 pleine échelle."""
+    if len(sum_sq) == 0:
+        empty = np.zeros(0, dtype=np.float32)
+        return empty, empty, empty
+    if len(sum_sq) >= points:
+        starts = np.linspace(0, len(sum_sq), points, endpoint=False).astype(np.int64)
+        rms = np.sqrt(np.add.reduceat(sum_sq, starts).astype(np.float64) / np.add.reduceat(counts, starts))
+        minimum = np.minimum.reduceat(minimum, starts)
+        maximum = np.maximum.reduceat(maximum, starts)
+    else:
+        positions = np.linspace(0, len(sum_sq) - 1, points)
+        blocks = np.arange(len(sum_sq))
+        rms = np.interp(positions, blocks, np.sqrt(sum_sq.astype(np.float64) / counts))
+        minimum = np.interp(positions, blocks, minimum)
+        maximum = np.interp(positions, blocks, maximum)
+    return ((rms / FULL_SCALE).astype(np.float32), (minimum / FULL_SCALE).astype(np.float32),
+            (maximum / FULL_SCALE).astype(np.float32))
+
+
+def segmented_envelope(audio_file, points=1024, segments=4, pool=None, should_stop=None, on_progress=None):
+    """
+    Enveloppe exacte (tous les échantillons, fréquence native) calculée en `segments` segments parallèles.
+    Même format de retour que `decode_envelope` ; None si le calcul a été interrompu.
+    `on_progress((rms, minimum, maximum), fraction)` reçoit l'enveloppe du début du morceau
+    chaque fois que les segments terminés sans interruption depuis le début s'allongent.
+    """
+    sample_rate, duration, _, start_time = probe_audio(audio_file)
+    if not duration:
+        # Pas de découpage possible : décodage exact en flux, à la fréquence native
+        return decode_envelope(audio_file, points, sample_rate, should_stop=should_stop)
+    first_pts = int(round(start_time * sample_rate))  # -copyts : horodatages d'origine, décalés du départ du flux
+    estimated = max(1, int(duration * sample_rate))
+    # La taille des blocs ne dépend que de la durée : le découpage en segments ne change pas le résultat
+    block = max(1, math.ceil(estimated / (points * BLOCKS_PER_POINT)))
+    total_blocks = math.ceil(estimated / block)
+    segments = max(1, min(segments, int(duration // MIN_SEGMENT_SECONDS) or 1))
+    segment_blocks = math.ceil(total_blocks / segments)
+    bounds = [(index * segment_blocks * block,
+               (index + 1) * segment_blocks * block if index < segments - 1 else None)
+              for index in range(segments)]
+
+    pool = pool or get_segment_pool()
+    cancel = _cancel_event()
+    futures = {pool.submit(decode_segment, audio_file, sample_rate, start, end, block, cancel, first_pts): index
+               for index, (start, end) in enumerate(bounds)}
+    results = [None] * segments
+    prefix = 0
+    try:
+        while prefix < segments:
+            finished, _ = wait(futures, timeout=0.25, return_when=FIRST_COMPLETED)
+            if should_stop is not None and should_stop():
+                return None
+            for future in finished:
+                results[futures.pop(future)] = future.result()
+            previous = prefix
+            while prefix < segments and results[prefix] is not None:
+                prefix += 1
+            if on_progress is not None and previous < prefix < segments:
+                fraction = prefix / segments
+                on_progress(_combine(results[:prefix], block, max(1, int(points * fraction))), fraction)
+    finally:
+        if futures:
+            cancel.set()  # Segments en cours : leur ffmpeg s'arrête au bloc suivant
+        for future in futures:
+            future.cancel()
+    return _combine(results, block, points)
+
+
+def _combine(results, block, points):
+    sum_sq, minimum, maximum, counts = [], [], [], []
+    for segment_sum, segment_min, segment_max, samples in results:
+        if len(segment_sum) == 0:
+            continue
+        segment_counts = np.full(len(segment_sum), block, dtype=np.int64)
+        segment_counts[-1] = samples - (len(segment_sum) - 1) * block
+        sum_sq.append(segment_sum)
+        minimum.append(segment_min)
+        maximum.append(segment_max)
+        counts.append(segment_counts)
+    if not sum_sq:
+        return reduce_blocks(np.zeros(0, dtype=np.int64), None, None, None, points)
+    return reduce_blocks(np.concatenate(sum_sq), np.concatenate(minimum), np.concatenate(maximum),
+                         np.concatenate(counts), points)
+
+
+_pool_instance = None
+_manager_instance = None
+
+
+def get_segment_pool(workers=None):
+    """Pool de processus partagé du décodage segmenté, créé au premier appel."""
+    global _pool_instance
+    if _pool_instance is None:
+        context = multiprocessing.get_context("spawn")  # Pas de fork d'un processus qui a des threads Qt
+        _pool_instance = ProcessPoolExecutor(workers or multiprocessing.cpu_count(), mp_context=context)
+        atexit.register(_pool_instance.shutdown, wait=False, cancel_futures=True)
+    return _pool_instance
+
+
+def _cancel_event():
+    """
+    Nouvel événement d'annulation transmissible aux segments : un proxy du `Manager` partagé (créé au premier
+    appel), car les événements de multiprocessing ne passent pas dans les arguments d'une tâche du pool.
+    """
+    global _manager_instance
+    if _manager_instance is None:
+        _manager_instance = multiprocessing.get_context("spawn").Manager()
+        atexit.register(_manager_instance.shutdown)
+    return _manager_instance.Event()
@@ -0,0 +1,334 @@
+# app/waveform/store.py
+import atexit
+import json
+import mmap
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from app.utils.config_loader import config_instance
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou entre processus
+    fcntl = None
+
+INDEX_NAME = "waveforms.idx"
+DATA_NAME = "waveforms.bin"
+LOCK_NAME = "waveforms.lock"
+
+
+def file_key(mpd_path, size=None, mtime=None, last_modified=None):
+    """
+    Identité d'un fichier audio pour le cache : chemin MPD + taille/date de modification
+    (ou le tag MPD `Last-Modified` quand le fichier n'est pas accessible localement).
+    """
+    if last_modified:
+        return f"{mpd_path}|{last_modified}"
+    return f"{mpd_path}|{size}|{int(mtime or 0)}"
+
+
+def local_file_key(mpd_path, full_path):
+    """Clé de cache d'un fichier local, ou None s'il n'existe pas."""
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        return None
+    return file_key(mpd_path, stat.st_size, stat.st_mtime)
+
+
+def quantize(values):
+    """Compacte une enveloppe normalisée (0..1) en uint8."""
+    return np.clip(np.rint(np.asarray(values, dtype=np.float32) * 255.0), 0, 255).astype(np.uint8)
+
+
+def dequantize(values):
+    """Retourne une enveloppe uint8 en float32 0..1."""
+    return np.asarray(values, dtype=np.float32) / 255.0
+
+
+class WaveformStore:
+    """
+    Cache disque des formes d'onde.
+    Les tableaux sont ajoutés bout à bout dans un fichier de données projeté en mémoire (mmap) ;
+    un index JSON associe à chaque clé de fichier ses blocs (`kind` -> offset, taille, dtype, forme)
+    et sa date de dernier accès. Au-delà de `max_bytes`, les entrées les moins récemment utilisées
+    sont évincées et le fichier de données est compacté ; les clés épinglées (`pin`, bibliothèque précalculée)
+    ne le sont jamais.
+    Un seul processus à la fois utilise le répertoire (verrou `fcntl` pris à l'ouverture) : l'index et le compactage
+    réécrivent les fichiers d'après l'état en mémoire. Ailleurs, le cache reste vide et n'écrit rien (`owned` faux).
+    L'éviction (et le compactage qui la suit) s'exécute dans un thread d'écriture dédié, jamais dans l'appelant de `put` ;
+    `put_all_async` y envoie aussi l'écriture elle-même, pour les appels depuis le thread GUI.
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        settings = config_instance.data.get("waveform", {}) or {}
+        directory = directory or settings.get("cache_dir") or "~/.cache/booyahplay/waveforms"
+        self.directory = Path(os.path.expanduser(directory))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes or int(settings.get("cache_max_mb", 256)) * 1024 * 1024
+        self.index_path = self.directory / INDEX_NAME
+        self.data_path = self.directory / DATA_NAME
+        self.owned = self._lock_directory()
+        self._lock = threading.RLock()
+        self._map = None
+        self._map_size = 0
+        self._dirty = False
+        self._last_flush = 0.0
+        self.entries = {}  # clé -> {"access": float, "blobs": {kind: [offset, nbytes, dtype, shape]}}
+        self.pinned = set()  # Clés jamais évincées, présentes ou pas encore calculées
+        self.data_size = 0
+        self._evict_above = self.max_bytes  # Taille de données qui déclenche la prochaine éviction
+        self._evict_pending = False
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="waveform-store")
+        if self.owned:
+            self._load_index()
+            atexit.register(self.flush)
+
+    def _lock_directory(self):
+        """Prend le verrou exclusif du répertoire, gardé jusqu'à la fin du processus ; False s'il est déjà pris."""
+        if fcntl is None:
+            return True
+        self._lock_file = open(self.directory / LOCK_NAME, "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            print(f"Cache de formes d'onde {self.directory} utilisé par un autre processus : "
+                  f"formes d'onde gardées en mémoire seulement")
+            return False
+        return True
+
+    # Index
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r") as file:
+                index = json.load(file)
+            self.entries = index.get("entries", {})
+            self.pinned = set(index.get("pinned", []))
+            self.data_size = int(index.get("data_size", 0))
+        except FileNotFoundError:
+            self.entries = {}
+            self.pinned = set()
+            self.data_size = 0
+        except (ValueError, OSError) as e:
+            print(f"Index du cache de formes d'onde illisible, cache réinitialisé : {e}")
+            self.entries = {}
+            self.pinned = set()
+            self.data_size = 0
+        # Données tronquées (arrêt brutal) : on ne garde que ce qui est réellement sur disque
+        actual_size = self.data_path.stat().st_size if self.data_path.exists() else 0
+        if actual_size < self.data_size:
+            self.entries = {key: entry for key, entry in self.entries.items()
+                            if all(offset + nbytes <= actual_size
+                                   for offset, nbytes, _, _ in entry["blobs"].values())}
+        self.data_size = actual_size
+
+    def flush(self):
+        """Écrit l'index sur disque (écriture atomique) ; appelé au plus toutes les 2 s et à la fermeture."""
+        with self._lock:
+            if not self._dirty or not self.owned:
+                return
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as file:
+                json.dump({"data_size": self.data_size, "entries": self.entries, "pinned": sorted(self.pinned)}, file)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+            self._last_flush = time.monotonic()
+
+    # Accès aux données
+    def _mapped(self, end):
+        """Retourne la projection mémoire du fichier de données, agrandie si nécessaire."""
+        if self._map is None or end > self._map_size:
+            if self._map is not None:
+                self._map.close()
+            with open(self.data_path, "rb") as file:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._map_size = len(self._map)
+        return self._map
+
+    def contains(self, key, kind="envelope"):
+        with self._lock:
+            entry = self.entries.get(key)
+            return entry is not None and kind in entry["blobs"]
+
+    def get(self, key, kind="envelope"):
+        """Retourne le tableau `kind` de la clé (copie), ou None si absent."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or kind not in entry["blobs"]:
+                return None
+            offset, nbytes, dtype, shape = entry["blobs"][kind]
+            data = self._mapped(offset + nbytes)
+            array = np.frombuffer(data, dtype=np.dtype(dtype), count=nbytes // np.dtype(dtype).itemsize,
+                                  offset=offset).reshape(shape).copy()
+            entry["access"] = time.time()
+            self._dirty = True
+            return array
+
+    def get_all(self, key):
+        """Retourne tous les tableaux d'une clé sous forme de dictionnaire `kind` -> tableau."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return {}
+            return {kind: self.get(key, kind) for kind in list(entry["blobs"])}
+
+    def put(self, key, kind, array):
+        """Ajoute (ou remplace) le tableau `kind` de la clé."""
+        if not self.owned:
+            return
+        array = np.ascontiguousarray(array)
+        with self._lock:
+            with open(self.data_path, "ab") as file:
+                offset = file.tell()
+                file.write(array.tobytes())
+            self.data_size = offset + array.nbytes
+            entry = self.entries.setdefault(key, {"access": time.time(), "blobs": {}})
+            entry["blobs"][kind] = [offset, array.nbytes, array.dtype.str, list(array.shape)]
+            entry["access"] = time.time()
+            self._dirty = True
+            if self.data_size > self._evict_above:
+                self._schedule_evict()
+            elif time.monotonic() - self._last_flush > 2.0:
+                self.flush()
+
+    def put_all(self, key, arrays):
+        """Ajoute plusieurs tableaux d'une même clé (dictionnaire `kind` -> tableau)."""
+        with self._lock:
+            for kind, array in arrays.items():
+                self.put(key, kind, array)
+
+    def put_all_async(self, key, arrays):
+        """Comme `put_all`, exécuté dans le thread d'écriture ; retourne un `Future`."""
+        future = self._writer.submit(self.put_all, key, arrays)
+        future.add_done_callback(self._report_error)
+        return future
+
+    @staticmethod
+    def _report_error(future):
+        error = future.exception()
+        if error is not None:
+            print(f"Erreur d'écriture dans le cache de formes d'onde : {error}")
+
+    # Éviction
+    def live_bytes(self):
+        return sum(nbytes for entry in self.entries.values() for _, nbytes, _, _ in entry["blobs"].values())
+
+    def average_entry_bytes(self):
+        """Taille moyenne d'une entrée (0 si le cache est vide)."""
+        with self._lock:
+            return self.live_bytes() // len(self.entries) if self.entries else 0
+
+    def pin(self, keys):
+        """Remplace l'ensemble des clés épinglées (jamais évincées) ; les anciennes redeviennent évinçables."""
+        with self._lock:
+            pinned = set(keys)
+            if pinned != self.pinned:
+                self.pinned = pinned
+                self._dirty = True
+
+    def _schedule_evict(self):
+        """Planifie une éviction dans le thread d'écriture (une seule en attente à la fois)."""
+        if self._evict_pending:
+            return
+        self._evict_pending = True
+        self._writer.submit(self._evict_scheduled).add_done_callback(self._report_error)
+
+    def _evict_scheduled(self):
+        with self._lock:
+            self._evict_pending = False
+            if self.data_size > self._evict_above:
+                self.evict()
+
+    def evict(self, target_ratio=0.8):
+        """Supprime les entrées non épinglées les moins récemment utilisées puis compacte le fichier de données."""
+        with self._lock:
+            target = int(self.max_bytes * target_ratio)
+            live = self.live_bytes()
+            for key in sorted(self.entries, key=lambda k: self.entries[k]["access"]):
+                if live <= target:
+                    break
+                if key in self.pinned:
+                    continue
+                live -= sum(nbytes for _, nbytes, _, _ in self.entries[key]["blobs"].values())
+                del self.entries[key]
+            self.compact()
+            # Entrées épinglées au-delà de la limite : pas de nouveau compactage avant une marge de croissance
+            self._evict_above = max(self.max_bytes, self.data_size + self.max_bytes - target)
+
+    def compact(self):
+        """Réécrit le fichier de données sans les blocs orphelins."""
+        if not self.owned:
+            return
+        with self._lock:
+            tmp_path = self.data_path.with_suffix(".compact")
+            source = self._mapped(self.data_size) if self.data_size else None
+            offset = 0
+            with open(tmp_path, "wb") as out:
+                for entry in self.entries.values():
+                    for blob in entry["blobs"].values():
+                        start, nbytes = blob[0], blob[1]
+                        out.write(source[start:start + nbytes])
+                        blob[0] = offset
+                        offset += nbytes
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            os.replace(tmp_path, self.data_path)
+            self.data_size = offset
+            self._dirty = True
+            self.flush()
+
+    # Export / import (caches préchauffés)
+    def export_archive(self, archive_path):
+        """Écrit le cache compacté dans une archive zip (index + données)."""
+        if not self.owned:
+            raise RuntimeError(f"Cache de formes d'onde {self.directory} utilisé par un autre processus")
+        with self._lock:
+            self.compact()
+            with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+                archive.write(self.index_path, INDEX_NAME)
+                archive.write(self.data_path, DATA_NAME)
+
+    def import_archive(self, archive_path, overwrite=False):
+        """Ajoute au cache les entrées d'une archive exportée ; retourne le nombre d'entrées importées."""
+        imported = 0
+        with zipfile.ZipFile(archive_path, "r") as archive:
+            index = json.loads(archive.read(INDEX_NAME))
+            with archive.open(DATA_NAME) as data:
+                blob_data = data.read()
+        with self._lock:
+            for key, entry in index.get("entries", {}).items():
+                if key in self.entries and not overwrite:
+                    continue
+                for kind, (offset, nbytes, dtype, shape) in entry["blobs"].items():
+                    array = np.frombuffer(blob_data, dtype=np.dtype(dtype), count=nbytes // np.dtype(dtype).itemsize,
+                                          offset=offset).reshape(shape)
+                    self.put(key, kind, array)
+                imported += 1
+        return imported
+
+
+_store_instance = None
+_store_instance_lock = threading.Lock()
+
+
+def get_waveform_store():
+    """
+    Instance partagée du cache de formes d'onde, créée au premier appel.
+    La création est verrouillée : une seconde instance ne pourrait pas prendre le verrou du répertoire
+    et n'écrirait rien.
+    """
+    global _store_instance
+    if _store_instance is None:
+        with _store_instance_lock:
+            if _store_instance is None:
+                _store_instance = WaveformStore()
+    return _store_instance
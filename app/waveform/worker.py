@@ -0,0 +1,252 @@
+# app/waveform/worker.py
+import atexit
+import heapq
+import itertools
+import threading
+
+from PySide6.QtCore import QObject, Signal
+
+from app.utils.config_loader import config_instance
+from app.waveform.analysis import analyze_track, analysis_pyramid, create_analyzers
+from app.waveform.cache import get_prewarm_cache
+from app.waveform.decoder import sparse_envelope, QUICK_LOOK_WINDOWS
+from app.waveform.pcm_file import open_pcm_file
+from app.waveform.pyramid import WaveformPyramid, BASE_POINTS
+from app.waveform.segmented import segmented_envelope
+
+# Priorités (la plus petite passe en premier)
+PRIORITY_CURRENT = 0  # Morceau en cours de lecture
+PRIORITY_NEXT = 1  # Morceaux suivants (préchargement)
+PRIORITY_BACKGROUND = 2  # Précalcul de la bibliothèque
+
+
+class CancelToken:
+    """Jeton d'annulation coopérative, vérifié par le décodeur entre deux blocs."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def is_cancelled(self):
+        return self._event.is_set()
+
+
+class WaveformJob(QObject):
+    """
+    Calcul de la forme d'onde d'un fichier.
+    Les signaux sont émis depuis un worker du pool et livrés dans le thread GUI.
+    """
+    preview = Signal(str, object)  # clé de cache, pyramide approximative du morceau entier (aperçu rapide)
+    progress = Signal(str, object, float)  # clé de cache, pyramide de la partie décodée, fraction décodée
+    finished = Signal(str, object)  # clé de cache, WaveformPyramid (None en cas d'erreur)
+
+    def __init__(self, cache_key, audio_file, priority=PRIORITY_BACKGROUND, duration=None, points=BASE_POINTS,
+                 quick_look_windows=0, exact_segments=0, analyzers=None):
+        super().__init__()
+        self.cache_key = cache_key
+        self.audio_file = audio_file
+        self.priority = priority
+        self.duration = duration  # Durée connue (secondes) : permet les résultats partiels
+        self.points = points
+        self.quick_look_windows = quick_look_windows  # Aperçu rapide avant le décodage complet (0 : aucun)
+        self.exact_segments = exact_segments  # Décodage exact en segments parallèles (0 : décodage en flux)
+        self.analyzers = analyzers or ["envelope"]  # Analyses faites pendant le même décodage
+        self.quick_look = None  # Pyramide de l'aperçu, gardée pour un widget qui se connecte après son émission
+        self.token = CancelToken()
+        self.state = "queued"  # queued, running, done
+        self.background = False  # Compté parmi les travaux de fond en cours
+
+    def cancel(self):
+        self.token.cancel()
+
+    def is_cancelled(self):
+        return self.token.is_cancelled()
+
+    def run(self):
+        """Exécuté dans un worker du pool."""
+        try:
+            if self.quick_look_windows:
+                self._emit_preview()
+            if self.exact_segments and self.analyzers == ["envelope"] and open_pcm_file(self.audio_file) is None:
+                envelope = segmented_envelope(self.audio_file, self.points, self.exact_segments,
+                                              should_stop=self.token.is_cancelled, on_progress=self._emit_progress)
+                analysis = None if envelope is None else (envelope, {})
+            else:
+                analysis = analyze_track(self.audio_file, self.points, create_analyzers(self.analyzers, self.points),
+                                         should_stop=self.token.is_cancelled, on_progress=self._emit_progress,
+                                         duration=self.duration)
+            if analysis is None:
+                return  # Annulé : aucun résultat
+            self.finished.emit(self.cache_key, analysis_pyramid(analysis, self.points))
+        except Exception as e:
+            print(f"Erreur lors de WaveformWorker: {e}")
+            self.finished.emit(self.cache_key, None)
+
+    def _emit_preview(self):
+        """Aperçu par passages espacés, puis affiné par le décodage complet qui suit."""
+        envelope = sparse_envelope(self.audio_file, self.duration, self.quick_look_windows,
+                                   should_stop=self.token.is_cancelled)
+        if envelope is not None and not self.is_cancelled():
+            rms, minimum, maximum = envelope
+            self.quick_look = WaveformPyramid(minimum, maximum, rms)
+            self.preview.emit(self.cache_key, self.quick_look)
+
+    def _emit_progress(self, envelope, fraction):
+        if not self.is_cancelled():
+            rms, minimum, maximum = envelope
+            self.progress.emit(self.cache_key, WaveformPyramid(minimum, maximum, rms), fraction)
+
+
+class WaveformWorker(threading.Thread):
+    """Worker du pool : exécute les travaux du planificateur, du plus prioritaire au moins prioritaire."""
+
+    def __init__(self, scheduler, index):
+        super().__init__(name=f"WaveformWorker-{index}", daemon=True)
+        self.scheduler = scheduler
+
+    def run(self):
+        while True:
+            job = self.scheduler.take()
+            if job is None:
+                return
+            try:
+                job.run()
+            finally:
+                self.scheduler.done(job)
+
+
+class WaveformScheduler(QObject):
+    """
+    Planificateur des calculs de formes d'onde : pool de workers réutilisés, file à priorités,
+    dédoublonnage par clé de cache et annulation coopérative.
+    Les travaux de fond (`PRIORITY_BACKGROUND`) laissent toujours un worker libre pour le morceau courant ;
+    un travail annulé s'arrête au bloc suivant et ne retarde donc jamais le suivant.
+    Les résultats sont gardés en mémoire et écrits dans le cache disque (dans le thread GUI).
+    """
+
+    def __init__(self, workers=None, parent=None):
+        super().__init__(parent)
+        settings = config_instance.data.get("waveform", {}) or {}
+        workers = max(2, int(workers or settings.get("workers", 2)))
+        # Morceaux plus longs que ce seuil (secondes) : aperçu rapide avant le décodage complet
+        self.quick_look_duration = float(settings.get("quick_look_min_duration", 1200))
+        self.quick_look_windows = int(settings.get("quick_look_windows", QUICK_LOOK_WINDOWS))
+        self.exact_segments = int(settings.get("exact_segments", 0))
+        self.analyzers = list(settings.get("analyzers") or ["envelope"])
+        self._condition = threading.Condition(threading.RLock())
+        self._heap = []  # (priorité, ordre d'arrivée, travail)
+        self._order = itertools.count()
+        self._jobs = {}  # clé de cache -> travail en attente ou en cours
+        self._running_background = 0
+        self._stopping = False
+        self.workers = [WaveformWorker(self, index) for index in range(workers)]
+        for worker in self.workers:
+            worker.start()
+        atexit.register(self.shutdown)
+
+    def submit(self, cache_key, audio_file, priority=PRIORITY_BACKGROUND, duration=None):
+        """
+        Ajoute un calcul (à appeler depuis le thread GUI) et retourne son WaveformJob.
+        Si la clé est déjà en attente ou en cours, le travail existant est retourné (et sa priorité relevée).
+        """
+        with self._condition:
+            job = self._jobs.get(cache_key)
+            if job is not None and not job.is_cancelled():
+                if priority < job.priority:
+                    job.priority = priority
+                    if job.state == "queued":
+                        heapq.heappush(self._heap, (priority, next(self._order), job))
+                        self._condition.notify()
+                return job
+            quick_look = duration is not None and duration >= self.quick_look_duration
+            job = WaveformJob(cache_key, audio_file, priority, duration,
+                              quick_look_windows=self.quick_look_windows if quick_look else 0,
+                              exact_segments=self.exact_segments, analyzers=self.analyzers)
+            job.finished.connect(self._on_job_finished)
+            self._jobs[cache_key] = job
+            heapq.heappush(self._heap, (priority, next(self._order), job))
+            self._condition.notify()
+        return job
+
+    def cancel(self, job):
+        """Annule un travail : retiré de la file s'il attend, arrêté au prochain bloc s'il tourne."""
+        with self._condition:
+            job.cancel()
+            if self._jobs.get(job.cache_key) is job and job.state == "queued":
+                del self._jobs[job.cache_key]
+
+    def cancel_all(self, priority=None):
+        """Annule tous les travaux (ou seulement ceux de la priorité donnée)."""
+        with self._condition:
+            for job in list(self._jobs.values()):
+                if priority is None or job.priority == priority:
+                    self.cancel(job)
+
+    def pending_count(self):
+        with self._condition:
+            return len(self._jobs)
+
+    # Côté workers
+    def take(self):
+        """Bloque jusqu'au prochain travail exécutable ; None quand le planificateur s'arrête."""
+        with self._condition:
+            while True:
+                if self._stopping:
+                    return None
+                job = self._pop_runnable()
+                if job is not None:
+                    job.state = "running"
+                    job.background = job.priority >= PRIORITY_BACKGROUND
+                    if job.background:
+                        self._running_background += 1
+                    return job
+                self._condition.wait()
+
+    def _pop_runnable(self):
+        while self._heap:
+            priority, _, job = self._heap[0]
+            if job.state != "queued" or job.is_cancelled() or priority != job.priority:
+                heapq.heappop(self._heap)  # Entrée périmée (annulée, déjà prise ou priorité relevée)
+                continue
+            if priority >= PRIORITY_BACKGROUND and self._running_background >= len(self.workers) - 1:
+                return None
+            heapq.heappop(self._heap)
+            return job
+        return None
+
+    def done(self, job):
+        with self._condition:
+            if job.background:
+                self._running_background -= 1
+            job.state = "done"
+            if self._jobs.get(job.cache_key) is job:
+                del self._jobs[job.cache_key]
+            self._condition.notify_all()
+
+    def _on_job_finished(self, cache_key, pyramid):
+        if pyramid is not None and cache_key:
+            get_prewarm_cache().remember_pyramid(cache_key, pyramid)
+
+    def shutdown(self):
+        """Annule tous les travaux et arrête les workers (fermeture de l'application)."""
+        with self._condition:
+            self._stopping = True
+            for job in self._jobs.values():
+                job.cancel()
+            self._jobs.clear()
+            self._condition.notify_all()
+        for worker in self.workers:
+            worker.join(timeout=1.0)
+
+
+_scheduler_instance = None
+
+
+def get_waveform_scheduler():
+    """Planificateur partagé, créé au premier appel (depuis le thread GUI)."""
+    global _scheduler_instance
+    if _scheduler_instance is None:
+        _scheduler_instance = WaveformScheduler()
+    return _scheduler_instance